@@ -1,10 +1,44 @@
 import os
+import json
+import base64
+import queue
+import random
+import time
+import uuid
 import requests
 import logging
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+
+from metrics import UPLOAD_LATENCY
+from outbox import SightingOutbox
+from sighting_publisher import SightingPublisher
+from tracing import TRACER
+
+# Estados HTTP que justificam uma nova tentativa
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
 
 class APIClient:
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 10,
+        timeout: float = 5.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        upload_workers: int = 4,
+        upload_queue_size: int = 1000,
+        batch_max_size: int = 50,
+        batch_max_wait: float = 1.0,
+        outbox: Optional[SightingOutbox] = None,
+        replay_concurrency: int = 2,
+        replay_interval: float = 5.0,
+        publisher: Optional[SightingPublisher] = None,
+    ):
         self.base_url = base_url
         self.logger = logging.getLogger(__name__)
         self.api_key = os.getenv("ADMIN_API_KEY")
@@ -12,10 +46,85 @@ class APIClient:
             self.logger.error("A variável de ambiente ADMIN_API_KEY não está definida.")
             raise ValueError("Chave de API não encontrada.")
         self.headers = {"X-API-Key": self.api_key}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.batch_max_size = batch_max_size
+        self.batch_max_wait = batch_max_wait
+        self.outbox = outbox
+        self.replay_concurrency = replay_concurrency
+        self.replay_interval = replay_interval
+        # Com um publisher os avistamentos vão pelo RabbitMQ em vez do endpoint HTTP em lote
+        self.publisher = publisher
+        self._closing = Event()
+
+        # Sessão com pool de ligações keep-alive, partilhada por todas as threads
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Os avistamentos são enviados em lotes (por tamanho ou por tempo) por threads
+        # dedicadas, para que as câmeras nunca fiquem à espera do backend
+        self._uploads: queue.Queue = queue.Queue(maxsize=upload_queue_size)
+        self._upload_threads = [
+            Thread(target=self._upload_loop, name=f"uploader-{i}", daemon=True)
+            for i in range(upload_workers)
+        ]
+
+        # Contadores expostos para monitorização, atualizados por várias threads
+        self._counters_lock = Lock()
+        self.sightings_sent = 0
+        self.sightings_failed = 0
+        self.sightings_rejected = 0
+        self.sightings_deferred = 0
+
+        for thread in self._upload_threads:
+            thread.start()
+
+        # O que não chega ao backend fica na outbox e é reenviado quando ele recuperar
+        self._replay_thread = None
+        if self.outbox is not None:
+            self._replay_pool = ThreadPoolExecutor(max_workers=replay_concurrency, thread_name_prefix="outbox-replay")
+            self._replay_thread = Thread(target=self._replay_loop, name="outbox-replay", daemon=True)
+            self._replay_thread.start()
+
+    def _count(self, sent: int = 0, failed: int = 0, rejected: int = 0, deferred: int = 0):
+        with self._counters_lock:
+            self.sightings_sent += sent
+            self.sightings_failed += failed
+            self.sightings_rejected += rejected
+            self.sightings_deferred += deferred
+
+    def _backoff(self, attempt: int) -> float:
+        # Backoff exponencial com "full jitter" para não sincronizar as novas tentativas
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Faz o pedido com timeout e repete em falhas de rede ou erros transitórios do servidor.
+        Um POST repetido depois de o servidor o ter processado só é seguro porque cada
+        avistamento leva uma `idempotency_key`.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                response = self.session.request(method, url, **kwargs)
+                if response.status_code not in RETRYABLE_STATUS or last_attempt:
+                    return response
+                self.logger.warning(f"{method} {url} devolveu {response.status_code}. Nova tentativa.")
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if last_attempt:
+                    raise
+                self.logger.warning(f"{method} {url} falhou ({e}). Nova tentativa.")
+            time.sleep(self._backoff(attempt))
 
     def check_api_health(self) -> bool:
         try:
-            response = requests.get(f"{self.base_url}/api/health")
+            response = self.session.get(f"{self.base_url}/api/health", timeout=self.timeout)
             if response.status_code == 200:
                 self.logger.info("API do backend está disponível!")
                 return True
@@ -27,9 +136,9 @@ class APIClient:
         # ALTERAÇÃO IMPORTANTE: Apontar para a nova rota interna
         internal_cameras_url = f"{self.base_url}/api/v1/internal/cameras"
         self.logger.info(f"A buscar câmaras do endpoint interno: {internal_cameras_url}")
-        
+
         try:
-            response = requests.get(internal_cameras_url, headers=self.headers)
+            response = self._request("GET", internal_cameras_url)
             if response.status_code == 200:
                 self.logger.info(f"Encontradas {len(response.json())} câmaras para processar.")
                 return response.json()
@@ -41,21 +150,271 @@ class APIClient:
             self.logger.error(f"Erro de conexão ao buscar câmaras: {e}")
         return []
 
-    def send_sighting_to_api(self, plate: str, image_filename: str, camera_id: int):
-        # A rota de avistamentos precisa ser protegida da mesma forma (assumindo que seja interna)
-        # Se for para utilizadores, a lógica terá de ser diferente. Por agora, vamos usar a chave de API.
-        sighting_url = f"{self.base_url}/api/v1/sightings/"
-        files = {'image_file': (os.path.basename(image_filename), open(image_filename, 'rb'), 'image/jpeg')}
-        data = {"plate": plate, "camera_id": camera_id}
-        
-        try:
-            response = requests.post(sighting_url, files=files, data=data, headers=self.headers)
-            if response.status_code == 201:
-                self.logger.info(f"Avistamento da placa {plate} enviado com sucesso.")
-            else:
-                self.logger.error(f"Falha ao enviar avistamento. Status: {response.status_code}, Resposta: {response.text}")
+    def send_sighting_to_api(
+        self,
+        plate: str,
+        image_filename: Optional[str],
+        camera_id: int,
+        image_bytes: Optional[bytes] = None,
+        captured_at: Optional[float] = None,
+    ):
+        """
+        Agenda o envio de um avistamento e regressa de imediato. Se a fila de envio estiver
+        cheia (backend demasiado lento), o avistamento é rejeitado em vez de bloquear a câmera.
+        `image_filename` None indica um avistamento sem imagem.
+        """
+        sighting = {
+            "plate": plate,
+            "image_filename": image_filename,
+            "camera_id": camera_id,
+            "image_bytes": image_bytes,
+            "captured_at": captured_at if captured_at is not None else time.time(),
+            # O backend ignora reenvios com a mesma chave: as novas tentativas não duplicam
+            "idempotency_key": uuid.uuid4().hex,
+        }
+        try:
+            self._uploads.put_nowait(sighting)
+        except queue.Full:
+            if self.outbox is not None:
+                self.logger.warning(f"Fila de envio cheia. Avistamento da placa {plate} guardado na outbox.")
+                self._defer([sighting])
+                return
+            self._count(rejected=1)
+            self.logger.error(f"Fila de envio cheia. Avistamento da placa {plate} descartado.")
+
+    def _defer(self, batch: list):
+        """Guarda na outbox os avistamentos que não foi possível enviar agora."""
+        if self.outbox is None:
+            self._count(failed=len(batch))
+            return
+        try:
+            self.outbox.append(batch)
+            self._count(deferred=len(batch))
+        except Exception as e:
+            self._count(failed=len(batch))
+            self.logger.error(f"Não foi possível guardar {len(batch)} avistamentos na outbox: {e}")
+
+    def _next_batch(self) -> Optional[list]:
+        """Junta até `batch_max_size` avistamentos, esperando no máximo `batch_max_wait` segundos."""
+        first = self._uploads.get()
+        if first is None:
+            self._uploads.task_done()
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.batch_max_wait
+        while len(batch) < self.batch_max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._uploads.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Devolve o sinal de paragem para ser tratado depois deste lote
+                self._uploads.task_done()
+                self._uploads.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _upload_loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            try:
+                self._upload_batch(batch)
+            except Exception as e:
+                self._count(failed=len(batch))
+                self.logger.error(f"Erro inesperado ao enviar lote de avistamentos: {e}")
+            finally:
+                for _ in batch:
+                    self._uploads.task_done()
+
+    def _load_image(self, sighting: dict) -> Optional[bytes]:
+        if sighting["image_bytes"] is not None:
+            return sighting["image_bytes"]
+        if not sighting["image_filename"]:
+            # A imagem não chegou a ser gravada (ex.: fila de gravação cheia)
+            return None
+        try:
+            with open(sighting["image_filename"], 'rb') as image_file:
+                return image_file.read()
+        except OSError as e:
+            self.logger.warning(f"Imagem {sighting['image_filename']} indisponível ({e}). O avistamento segue sem imagem.")
+            return None
+
+    @staticmethod
+    def _sighting_payload(sighting: dict) -> dict:
+        return {
+            "license_plate": sighting["plate"],
+            "camera_id": sighting["camera_id"],
+            "image_filename": os.path.basename(sighting["image_filename"]) if sighting["image_filename"] else None,
+            "timestamp": datetime.fromtimestamp(sighting["captured_at"], tz=timezone.utc).isoformat(),
+            "idempotency_key": sighting.get("idempotency_key"),
+        }
+
+    def _post_batch(self, batch: list) -> requests.Response:
+        bulk_url = f"{self.base_url}/api/v1/sightings/bulk"
+        payload = []
+        files = []
+        for sighting in batch:
+            item = self._sighting_payload(sighting)
+            image_bytes = self._load_image(sighting)
+            if image_bytes is not None:
+                files.append(("images", (item["image_filename"], image_bytes, "image/jpeg")))
+            payload.append(item)
+        return self._request("POST", bulk_url, data={"sightings": json.dumps(payload)}, files=files)
+
+    def _rejected_by_backend(self, batch: list, response: requests.Response) -> list:
+        """Avistamentos de um lote aceite (201) que o backend recusou por a câmera não existir."""
+        try:
+            indices = response.json().get("rejected", [])
+        except ValueError:
+            return []
+        rejected = [batch[i] for i in indices if 0 <= i < len(batch)]
+        if rejected:
+            cameras = sorted({s["camera_id"] for s in rejected})
+            self.logger.warning(f"{len(rejected)} avistamentos recusados pelo backend: câmeras inexistentes {cameras}.")
+        return rejected
+
+    def _publish_batch(self, batch: list) -> list:
+        """Publica o lote no RabbitMQ e devolve os avistamentos que não foram confirmados."""
+        messages = []
+        for sighting in batch:
+            message = self._sighting_payload(sighting)
+            image_bytes = self._load_image(sighting)
+            message["image_base64"] = base64.b64encode(image_bytes).decode("ascii") if image_bytes is not None else None
+            messages.append(message)
+        failed = self.publisher.publish_batch(messages)
+        return [batch[i] for i in failed]
+
+    def _upload_batch(self, batch: list):
+        transport = "http" if self.publisher is None else "amqp"
+        with UPLOAD_LATENCY.labels(transport=transport).time():
+            with TRACER.span("upload", sightings=len(batch), transport=transport):
+                self._deliver_batch(batch)
+
+    def _deliver_batch(self, batch: list):
+        if self.publisher is not None:
+            failed = self._publish_batch(batch)
+            self._count(sent=len(batch) - len(failed))
+            if failed:
+                self._defer(failed)
+            return
+
+        try:
+            response = self._post_batch(batch)
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"Erro de conexão ao enviar avistamento: {e}")
-        finally:
-            if 'image_file' in files:
-                files['image_file'][1].close()
+            self.logger.error(f"Erro de conexão ao enviar lote de avistamentos: {e}")
+            self._defer(batch)
+            return
+
+        if response.status_code == 201:
+            rejected = self._rejected_by_backend(batch, response)
+            self._count(sent=len(batch) - len(rejected), failed=len(rejected))
+            self.logger.info(f"Lote de {len(batch) - len(rejected)} avistamentos enviado com sucesso.")
+        elif response.status_code in RETRYABLE_STATUS:
+            self.logger.error(f"Backend indisponível ao enviar lote de avistamentos. Status: {response.status_code}")
+            self._defer(batch)
+        elif len(batch) > 1:
+            # Não se sabe que avistamento causou a recusa: divide o lote para não perder os outros
+            middle = len(batch) // 2
+            self._deliver_batch(batch[:middle])
+            self._deliver_batch(batch[middle:])
+        else:
+            self._count(failed=len(batch))
+            self.logger.error(f"Falha ao enviar avistamento. Status: {response.status_code}, Resposta: {response.text}")
+
+    def _replay_batch(self, batch: list) -> bool:
+        """Reenvia um lote da outbox. Devolve False se o backend continuar indisponível."""
+        if self.publisher is not None:
+            failed = {s["outbox_id"] for s in self._publish_batch(batch)}
+            delivered = [s["outbox_id"] for s in batch if s["outbox_id"] not in failed]
+            self._count(sent=len(delivered))
+            self.outbox.remove(delivered)
+            return not failed
+
+        try:
+            response = self._post_batch(batch)
+        except requests.exceptions.RequestException:
+            return False
+        if response.status_code in RETRYABLE_STATUS:
+            return False
+        if response.status_code == 201:
+            # Os recusados (câmera apagada entretanto) nunca vão ser aceites: saem da outbox
+            # com os que foram gravados
+            rejected = self._rejected_by_backend(batch, response)
+            self._count(sent=len(batch) - len(rejected), failed=len(rejected))
+        elif len(batch) > 1:
+            # Recusa do lote inteiro sem indicar o avistamento: divide até o isolar
+            middle = len(batch) // 2
+            return self._replay_batch(batch[:middle]) and self._replay_batch(batch[middle:])
+        else:
+            self._count(failed=1)
+            self.logger.error(f"Avistamento da outbox rejeitado pelo backend. Status: {response.status_code}, Resposta: {response.text}")
+        self.outbox.remove([s["outbox_id"] for s in batch])
+        return True
+
+    def _replay_outbox(self):
+        # Cada ronda reenvia até `replay_concurrency` lotes em paralelo; para à primeira falha
+        while not self._closing.is_set():
+            pending = self.outbox.peek(self.batch_max_size * self.replay_concurrency)
+            if not pending:
+                return
+            batches = [pending[i:i + self.batch_max_size] for i in range(0, len(pending), self.batch_max_size)]
+            results = list(self._replay_pool.map(self._replay_batch, batches))
+            stats = self.outbox.stats()
+            self.logger.info(
+                f"Outbox: {stats['replayed']} avistamentos reenviados, {stats['pending']} pendentes "
+                f"({stats['pending_bytes'] / 1e6:.1f} MB, mais antigo há {stats['oldest_age_seconds']:.0f}s)."
+            )
+            if not all(results):
+                return
+
+    def _replay_loop(self):
+        while not self._closing.wait(self.replay_interval):
+            try:
+                self._replay_outbox()
+            except Exception as e:
+                self.logger.error(f"Erro inesperado ao reenviar a outbox: {e}")
+
+    def outbox_stats(self) -> Optional[dict]:
+        return self.outbox.stats() if self.outbox is not None else None
+
+    @property
+    def pending_uploads(self) -> int:
+        return self._uploads.qsize()
+
+    def close(self, timeout: float = 10.0):
+        """
+        Espera (até `timeout`) que a fila de envio esvazie e fecha a sessão. O que ainda estiver
+        na fila nessa altura vai para a outbox, se existir.
+        """
+        deadline = time.monotonic() + timeout
+        while self._uploads.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self._closing.set()
+        leftover = []
+        while True:
+            try:
+                item = self._uploads.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                leftover.append(item)
+        if leftover:
+            self._defer(leftover)
+        for _ in self._upload_threads:
+            try:
+                self._uploads.put_nowait(None)
+            except queue.Full:
+                break
+        if self._replay_thread is not None:
+            self._replay_thread.join(timeout=max(deadline - time.monotonic(), 1.0))
+            self._replay_pool.shutdown(wait=False)
+            self.outbox.close()
+        if self.publisher is not None:
+            self.publisher.close()
+        self.session.close()
@@ -0,0 +1,119 @@
+"""
+Compara os backends do detector de veículos (ultralytics/torch vs ONNX Runtime).
+
+Cada backend corre num processo próprio para que o arranque e a memória medidos não sejam
+contaminados pelo outro (o torch, uma vez importado, fica em memória). Exemplo:
+
+    python benchmark_detector.py --pt yolov8n.pt --onnx yolov8n.onnx --image frame.jpg --frames 200
+
+Com --export, o modelo ONNX é gerado a partir do .pt (lote dinâmico) antes de medir.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+
+def _load_frame(image_path: str, width: int, height: int) -> np.ndarray:
+    if image_path:
+        frame = cv2.imread(image_path)
+        if frame is None:
+            raise SystemExit(f"Não foi possível ler a imagem {image_path}.")
+        return frame
+    # Sem imagem: ruído, que mede o custo fixo do detector (pré-processamento, rede e NMS)
+    return np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def run_backend(args) -> dict:
+    """Mede um único backend neste processo e devolve as métricas."""
+    start = time.perf_counter()
+    # O import faz parte do custo de arranque (é aqui que o torch é carregado)
+    from detection import VehicleDetector
+
+    model_path = args.onnx if args.run_backend == "onnx" else args.pt
+    detector = VehicleDetector(model_path, args.run_backend, args.intra_op_threads, args.inter_op_threads)
+    frames = [_load_frame(args.image, args.width, args.height)] * args.batch
+    detector.detect(frames)
+    startup_seconds = time.perf_counter() - start
+
+    for _ in range(args.warmup):
+        detector.detect(frames)
+    latencies = []
+    vehicles = 0
+    for _ in range(args.frames):
+        t0 = time.perf_counter()
+        results = detector.detect(frames)
+        latencies.append((time.perf_counter() - t0) / args.batch)
+        vehicles += sum(len(boxes) for boxes in results)
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "backend": args.run_backend,
+        "startup_s": round(startup_seconds, 3),
+        # ru_maxrss vem em KiB no Linux
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "frame_ms_p50": round(float(np.percentile(latencies_ms, 50)), 2),
+        "frame_ms_p95": round(float(np.percentile(latencies_ms, 95)), 2),
+        "fps": round(1000 / float(latencies_ms.mean()), 1),
+        "vehicles_per_frame": round(vehicles / (args.frames * args.batch), 2),
+    }
+
+
+def export_onnx(pt_path: str, onnx_path: str):
+    from ultralytics import YOLO
+
+    exported = YOLO(pt_path).export(format="onnx", dynamic=True, simplify=True)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    print(f"Modelo exportado para {onnx_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pt", default="yolov8n.pt", help="Modelo ultralytics (.pt).")
+    parser.add_argument("--onnx", default="yolov8n.onnx", help="Modelo YOLOv8 exportado para ONNX.")
+    parser.add_argument("--export", action="store_true", help="Exporta --pt para --onnx antes de medir.")
+    parser.add_argument("--image", default="", help="Frame de teste; por omissão usa ruído.")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=100, help="Número de chamadas medidas.")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=1, help="Frames por chamada ao detector.")
+    parser.add_argument("--intra-op-threads", type=int, default=0)
+    parser.add_argument("--inter-op-threads", type=int, default=0)
+    parser.add_argument("--backends", default="ultralytics,onnx", help="Backends a comparar, separados por vírgula.")
+    parser.add_argument("--run-backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_backend:
+        print(json.dumps(run_backend(args)))
+        return
+
+    if args.export:
+        export_onnx(args.pt, args.onnx)
+
+    passthrough = [a for a in sys.argv[1:] if a != "--export"]
+    reports = []
+    for backend in args.backends.split(","):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *passthrough, "--run-backend", backend],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        reports.append(json.loads(output.strip().splitlines()[-1]))
+
+    columns = list(reports[0].keys())
+    print("  ".join(f"{c:>18}" for c in columns))
+    for report in reports:
+        print("  ".join(f"{report[c]!s:>18}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+import logging
+from threading import Event, Thread
+
+import pika
+
+from camera_manager import CameraManager
+
+# Fila onde o backend publica os comandos (backend/app/messaging.py)
+QUEUE_NAME = "camera_processing_queue"
+
+
+class CameraCommandConsumer(Thread):
+    """
+    Consome os comandos 'start', 'stop' e 'update' que o backend publica quando uma câmera é
+    criada, alterada ou apagada, e aplica-os ao `CameraManager` sem reiniciar o serviço (que
+    ignora os comandos com uma versão da câmera anterior à já aplicada).
+    Se a ligação ao RabbitMQ cair, volta a ligar-se após `reconnect_delay` segundos.
+    """
+
+    def __init__(self, host: str, username: str, password: str, manager: CameraManager, reconnect_delay: float = 5.0):
+        super().__init__(name="camera-commands", daemon=True)
+        self.parameters = pika.ConnectionParameters(
+            host=host,
+            credentials=pika.PlainCredentials(username, password),
+        )
+        self.manager = manager
+        self.reconnect_delay = reconnect_delay
+        self.logger = logging.getLogger(__name__)
+        self._stop_event = Event()
+
+    def _handle(self, body: bytes):
+        try:
+            message = json.loads(body)
+            action = message["action"]
+            camera_info = message["camera_info"]
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.error(f"Comando de câmera inválido ignorado: {e}")
+            return
+        try:
+            self.manager.handle_command(action, camera_info)
+        except Exception as e:
+            self.logger.error(f"Erro ao aplicar o comando '{action}' à câmera {camera_info.get('id')}: {e}")
+
+    def _consume(self):
+        connection = pika.BlockingConnection(self.parameters)
+        try:
+            channel = connection.channel()
+            channel.queue_declare(queue=QUEUE_NAME, durable=True)
+            # Os comandos são aplicados um a um, pela ordem em que chegam
+            channel.basic_qos(prefetch_count=1)
+            self.logger.info(f"À espera de comandos de câmeras na fila '{QUEUE_NAME}'.")
+            for method, _properties, body in channel.consume(QUEUE_NAME, inactivity_timeout=1.0):
+                if self._stop_event.is_set():
+                    break
+                if method is None:
+                    continue
+                self._handle(body)
+                channel.basic_ack(delivery_tag=method.delivery_tag)
+            channel.cancel()
+        finally:
+            if connection.is_open:
+                connection.close()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._consume()
+            except pika.exceptions.AMQPError as e:
+                self.logger.error(f"Ligação ao RabbitMQ perdida ({e!r}). Nova tentativa em {self.reconnect_delay:g}s.")
+                self._stop_event.wait(self.reconnect_delay)
+
+    def stop(self):
+        self._stop_event.set()
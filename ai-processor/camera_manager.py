@@ -0,0 +1,164 @@
+import logging
+from dataclasses import dataclass
+from threading import Lock, Thread
+from typing import Callable, Dict, Optional
+
+from frame_grabber import FrameGrabber
+
+
+@dataclass
+class CameraPipeline:
+    camera_info: dict
+    grabber: object
+    thread: Thread
+
+
+class CameraManager:
+    """
+    Arranca, para e atualiza os pipelines das câmeras com o serviço a correr.
+
+    Cada pipeline é uma thread a executar `run_pipeline(camera_info, grabber=...)` sobre o
+    seu próprio leitor de frames. O detector, o agendador e o cliente da API são partilhados,
+    por isso mexer numa câmera não recarrega modelos nem reinicia os outros streams.
+
+    O backend envia a `version` da câmera em cada comando. A última versão aplicada fica
+    registada, mesmo depois de a câmera parar, e os comandos mais antigos são ignorados: um
+    'stop' reentregue pela fila não para uma câmera entretanto reativada.
+    """
+
+    def __init__(
+        self,
+        run_pipeline: Callable[..., None],
+        readers: Optional[Dict[int, object]] = None,
+        stop_timeout: float = 10.0,
+        grabber_options: Optional[dict] = None,
+    ):
+        """
+        Args:
+            run_pipeline: Função que processa uma câmera até o leitor parar.
+            readers: Leitores de frames já criados (ex.: memória partilhada), por ID de câmera.
+                Câmeras sem leitor, incluindo as que chegam depois do arranque, usam um
+                `FrameGrabber` neste processo.
+            stop_timeout: Tempo máximo, em segundos, à espera que um pipeline termine.
+            grabber_options: Argumentos extra dos `FrameGrabber` criados aqui (fonte de frames,
+                passagem a keyframes em sobrecarga).
+        """
+        self.run_pipeline = run_pipeline
+        self.stop_timeout = stop_timeout
+        self.logger = logging.getLogger(__name__)
+        self._readers = dict(readers or {})
+        self.grabber_options = dict(grabber_options or {})
+        self._pipelines: Dict[int, CameraPipeline] = {}
+        self._versions: Dict[int, int] = {}
+        self._lock = Lock()
+
+    def _accept_version(self, camera_info: dict) -> bool:
+        """Regista a versão da câmera; False se for anterior à última já aplicada."""
+        camera_id, version = camera_info.get("id"), camera_info.get("version")
+        if version is None:
+            # Comandos sem versão (backend antigo) aplicam-se sempre
+            return True
+        with self._lock:
+            if version < self._versions.get(camera_id, version):
+                return False
+            self._versions[camera_id] = version
+            return True
+
+    def _start(self, camera_info: dict):
+        camera_id = camera_info.get("id")
+        grabber = self._readers.pop(camera_id, None)
+        if grabber is None:
+            grabber = FrameGrabber(
+                camera_info.get("rtsp_url"),
+                camera_info.get("name", f"Câmera {camera_id}"),
+                **self.grabber_options,
+            )
+        thread = Thread(
+            target=self.run_pipeline,
+            args=(camera_info,),
+            kwargs={"grabber": grabber},
+            name=f"camera-{camera_id}",
+        )
+        self._pipelines[camera_id] = CameraPipeline(camera_info, grabber, thread)
+        thread.start()
+
+    def _stop(self, camera_id: int) -> bool:
+        pipeline = self._pipelines.pop(camera_id, None)
+        if pipeline is None:
+            return False
+        pipeline.grabber.stop()
+        pipeline.thread.join(timeout=self.stop_timeout)
+        if pipeline.thread.is_alive():
+            self.logger.warning(f"Pipeline da câmera {camera_id} não terminou em {self.stop_timeout:g}s.")
+        return True
+
+    def start_camera(self, camera_info: dict):
+        camera_id = camera_info.get("id")
+        # As câmeras lidas da API no arranque também fixam a versão de partida
+        self._accept_version(camera_info)
+        with self._lock:
+            pipeline = self._pipelines.get(camera_id)
+            if pipeline is not None and pipeline.thread.is_alive():
+                self.logger.info(f"Câmera {camera_id} já está a ser processada.")
+                return
+            self._start(dict(camera_info))
+
+    def stop_camera(self, camera_id: int):
+        with self._lock:
+            if not self._stop(camera_id):
+                self.logger.info(f"Câmera {camera_id} não estava a ser processada.")
+
+    def update_camera(self, camera_info: dict):
+        """Reinicia o pipeline só se o stream mudou; caso contrário atualiza os dados no lugar."""
+        camera_id = camera_info.get("id")
+        with self._lock:
+            pipeline = self._pipelines.get(camera_id)
+            if pipeline is None or not pipeline.thread.is_alive():
+                self._stop(camera_id)
+                self._start(dict(camera_info))
+            elif pipeline.camera_info.get("rtsp_url") != camera_info.get("rtsp_url"):
+                self.logger.info(f"Stream da câmera {camera_id} alterado. A reiniciar o pipeline.")
+                self._stop(camera_id)
+                self._start(dict(camera_info))
+            else:
+                # O pipeline lê este dicionário, por isso vê os novos dados sem reiniciar
+                pipeline.camera_info.update(camera_info)
+
+    def handle_command(self, action: str, camera_info: dict):
+        camera_id = camera_info.get("id")
+        if not self._accept_version(camera_info):
+            self.logger.warning(
+                f"Comando '{action}' da câmera {camera_id} ignorado: versão {camera_info.get('version')} "
+                f"anterior à já aplicada ({self._versions.get(camera_id)})."
+            )
+            return
+        self.logger.info(f"Comando '{action}' recebido para a câmera {camera_id}.")
+        if action == "start":
+            self.start_camera(camera_info)
+        elif action == "stop":
+            self.stop_camera(camera_id)
+        elif action == "update":
+            self.update_camera(camera_info)
+        else:
+            self.logger.warning(f"Comando desconhecido '{action}' ignorado.")
+
+    @property
+    def running(self) -> Dict[int, dict]:
+        with self._lock:
+            return {cid: p.camera_info for cid, p in self._pipelines.items() if p.thread.is_alive()}
+
+    @property
+    def grabbers(self) -> Dict[int, object]:
+        """Leitores de frames dos pipelines ativos, por ID de câmera (para as métricas)."""
+        with self._lock:
+            return {cid: p.grabber for cid, p in self._pipelines.items() if p.thread.is_alive()}
+
+    def stop_all(self):
+        with self._lock:
+            pipelines = list(self._pipelines.values())
+            self._pipelines.clear()
+        # Pede a paragem a todos antes de esperar por cada um
+        for pipeline in pipelines:
+            pipeline.grabber.stop()
+        for pipeline in pipelines:
+            pipeline.thread.join(timeout=self.stop_timeout)
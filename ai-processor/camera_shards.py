@@ -0,0 +1,118 @@
+import logging
+import multiprocessing
+from threading import Thread
+from typing import Dict, List, Optional, Tuple
+
+from frame_grabber import FrameGrabber
+from shm_ring import SharedFrameReader, SharedFrameRing
+
+
+def _pump_camera(camera_info: dict, ring: SharedFrameRing, grabber_options: dict):
+    """Copia os frames descodificados de uma câmera para o seu ring de memória partilhada."""
+    camera_id = camera_info.get("id")
+    grabber = FrameGrabber(camera_info.get("rtsp_url"), camera_info.get("name", f"Câmera {camera_id}"), **grabber_options)
+    grabber.start()
+    try:
+        while not ring.stop_requested:
+            item = grabber.read(timeout=1.0)
+            if item is not None:
+                ring.write(*item)
+            elif grabber.stopped:
+                break
+            ring.update_counters(grabber.frames_decoded, grabber.frames_dropped, grabber.reconnects, grabber.keyframe_switches)
+    finally:
+        grabber.stop()
+        ring.mark_stopped()
+        ring.close()
+
+
+def _decode_worker(
+    cameras: List[dict],
+    ring_names: Dict[int, str],
+    slots: int,
+    max_shape: Tuple[int, int, int],
+    grabber_options: dict,
+):
+    """Ponto de entrada de um processo de descodificação responsável por um grupo de câmeras."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+    logger.info(f"Processo de descodificação iniciado com {len(cameras)} câmeras.")
+
+    threads = []
+    for camera in cameras:
+        ring = SharedFrameRing.attach(ring_names[camera["id"]], slots, max_shape)
+        thread = Thread(target=_pump_camera, args=(camera, ring, grabber_options), name=f"pump-{camera['id']}", daemon=True)
+        threads.append(thread)
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+
+class CameraShardPool:
+    """
+    Distribui a descodificação das câmeras por N processos, contornando o GIL.
+
+    O processo principal (inferência) cria um ring de memória partilhada por câmera e lê os
+    frames através de um `SharedFrameReader`, que tem a mesma interface do `FrameGrabber`.
+    """
+
+    def __init__(
+        self,
+        cameras: List[dict],
+        workers: int,
+        slots: int = 3,
+        max_shape: Tuple[int, int, int] = (1080, 1920, 3),
+        grabber_options: Optional[dict] = None,
+    ):
+        if workers < 1:
+            raise ValueError("É necessário pelo menos um processo de descodificação.")
+        self.cameras = cameras
+        self.workers = min(workers, len(cameras)) or 1
+        self.slots = slots
+        self.max_shape = max_shape
+        # Passadas aos `FrameGrabber` dos processos filhos, por isso têm de ser serializáveis
+        self.grabber_options = dict(grabber_options or {})
+        self.logger = logging.getLogger(__name__)
+
+        # 'spawn' evita herdar as threads e sessões de inferência do processo principal
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[multiprocessing.Process] = []
+        self._rings: Dict[int, SharedFrameRing] = {}
+
+    def start(self) -> Dict[int, SharedFrameReader]:
+        """Arranca os processos e devolve um leitor de frames por ID de câmera."""
+        for camera in self.cameras:
+            self._rings[camera["id"]] = SharedFrameRing.create(self.slots, self.max_shape)
+        total_bytes = sum(ring.shm.size for ring in self._rings.values())
+        self.logger.info(
+            f"Memória partilhada reservada para {len(self._rings)} câmeras: {total_bytes / 2**20:.0f} MiB."
+        )
+
+        readers: Dict[int, SharedFrameReader] = {}
+        for shard_idx in range(self.workers):
+            shard = self.cameras[shard_idx::self.workers]
+            ring_names = {camera["id"]: self._rings[camera["id"]].name for camera in shard}
+            process = self._context.Process(
+                target=_decode_worker,
+                args=(shard, ring_names, self.slots, self.max_shape, self.grabber_options),
+                name=f"decode-worker-{shard_idx}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+            for camera in shard:
+                readers[camera["id"]] = SharedFrameReader(self._rings[camera["id"]], process.is_alive)
+
+        self.logger.info(f"{len(self.cameras)} câmeras distribuídas por {self.workers} processos de descodificação.")
+        return readers
+
+    def stop(self):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join(timeout=5)
+        for ring in self._rings.values():
+            ring.close()
+        self._processes.clear()
+        self._rings.clear()
@@ -0,0 +1,203 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from threading import Event, Lock, Thread, get_ident
+from typing import Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    camera_id INTEGER,
+    plate TEXT,
+    last_used REAL NOT NULL
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS captures_last_used ON captures (last_used)"
+
+# Quantos ficheiros o evictor apaga por transação
+_EVICT_CHUNK = 500
+
+
+class CaptureStore:
+    """
+    Armazenamento das imagens dos avistamentos, endereçado pelo conteúdo.
+
+    Cada imagem é guardada em `root/ab/cd/<sha256>.jpg`, o que mantém as pastas pequenas mesmo
+    com milhões de ficheiros, e recortes idênticos ficam num único ficheiro. Um índice SQLite
+    guarda o tamanho e o último uso de cada imagem, para que o evictor em segundo plano possa
+    respeitar o orçamento de bytes (`max_bytes`) e a idade máxima (`max_age_seconds`) apagando
+    as mais antigas primeiro, sem percorrer o disco.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 0,
+        max_age_seconds: float = 0.0,
+        evict_interval: float = 60.0,
+    ):
+        """
+        Args:
+            root: Pasta base das imagens.
+            max_bytes: Orçamento total em bytes. 0 desativa o limite.
+            max_age_seconds: Idade máxima de uma imagem desde o último uso. 0 desativa o limite.
+            evict_interval: Intervalo, em segundos, entre passagens do evictor.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.evict_interval = evict_interval
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_INDEX)
+        self.total_bytes, self.files = self._conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM captures").fetchone()
+
+        # Contadores expostos para monitorização
+        self.deduplicated = 0
+        self.evicted = 0
+        self.evicted_bytes = 0
+
+        self._stop_event = Event()
+        self._evictor = None
+        if self.max_bytes or self.max_age_seconds:
+            self._evictor = Thread(target=self._evict_loop, name="capture-evictor", daemon=True)
+            self._evictor.start()
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.jpg")
+
+    def put(self, data: bytes, camera_id: Optional[int] = None, plate: Optional[str] = None) -> str:
+        """Guarda a imagem (se ainda não existir) e devolve o caminho do ficheiro."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM captures WHERE digest = ?", (digest,)).fetchone()
+            if row is not None and os.path.exists(path):
+                # Recorte idêntico a um já guardado: renova o último uso para não ser despejado já
+                self._conn.execute("UPDATE captures SET last_used = ? WHERE digest = ?", (now, digest))
+                self.deduplicated += 1
+                return path
+
+        # A escrita fica fora do lock para não bloquear os outros escritores nem o evictor.
+        # Dois escritores do mesmo recorte gravam o mesmo conteúdo, por isso basta um
+        # temporário por thread e o rename atómico
+        self._write(path, data)
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM captures WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                if not os.path.exists(path):
+                    # O evictor apagou a imagem e a linha antiga entre a escrita e o índice (raro)
+                    self._write(path, data)
+                self._conn.execute(
+                    "INSERT INTO captures (digest, size, camera_id, plate, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (digest, len(data), camera_id, plate, now),
+                )
+                self.total_bytes += len(data)
+                self.files += 1
+            else:
+                self._conn.execute("UPDATE captures SET last_used = ? WHERE digest = ?", (now, digest))
+        return path
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escreve para um ficheiro temporário e renomeia, para nunca expor imagens incompletas
+        tmp_path = f"{path}.{get_ident()}.tmp"
+        with open(tmp_path, "wb") as image_file:
+            image_file.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict_rows(self, rows: list):
+        for digest, size, _ in rows:
+            try:
+                os.remove(self.path_for(digest))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.error(f"Não foi possível apagar a imagem {digest}: {e}")
+                continue
+            self._conn.execute("DELETE FROM captures WHERE digest = ?", (digest,))
+            self.total_bytes -= size
+            self.files -= 1
+            self.evicted += 1
+            self.evicted_bytes += size
+
+    def evict(self):
+        """Apaga, das mais antigas para as mais recentes, as imagens fora da idade ou do orçamento."""
+        evicted_before = self.evicted
+        # Cada passagem avança pelo índice a partir da última linha vista (last_used, digest),
+        # para que as imagens que não se conseguem apagar não voltem a ser escolhidas até à
+        # passagem seguinte e o ciclo termine sempre
+        if self.max_age_seconds:
+            cutoff = time.time() - self.max_age_seconds
+            after = (-1.0, "")
+            while True:
+                with self._lock:
+                    rows = self._conn.execute(
+                        "SELECT digest, size, last_used FROM captures WHERE last_used < ? AND (last_used, digest) > (?, ?) "
+                        "ORDER BY last_used, digest LIMIT ?",
+                        (cutoff, after[0], after[1], _EVICT_CHUNK),
+                    ).fetchall()
+                    self._evict_rows(rows)
+                if len(rows) < _EVICT_CHUNK:
+                    break
+                after = (rows[-1][2], rows[-1][0])
+        if self.max_bytes:
+            after = (-1.0, "")
+            while self.total_bytes > self.max_bytes:
+                with self._lock:
+                    rows = self._conn.execute(
+                        "SELECT digest, size, last_used FROM captures WHERE (last_used, digest) > (?, ?) "
+                        "ORDER BY last_used, digest LIMIT ?",
+                        (after[0], after[1], _EVICT_CHUNK),
+                    ).fetchall()
+                    if not rows:
+                        break
+                    # Só o necessário para voltar ao orçamento
+                    excess = self.total_bytes - self.max_bytes
+                    selected = []
+                    for row in rows:
+                        if excess <= 0:
+                            break
+                        selected.append(row)
+                        excess -= row[1]
+                    self._evict_rows(selected)
+                after = (selected[-1][2], selected[-1][0])
+        if self.evicted > evicted_before:
+            self.logger.info(
+                f"Capturas: {self.evicted - evicted_before} imagens apagadas, "
+                f"{self.files} restantes ({self.total_bytes / 2**20:.0f} MiB)."
+            )
+
+    def _evict_loop(self):
+        while not self._stop_event.wait(self.evict_interval):
+            try:
+                self.evict()
+            except Exception as e:
+                self.logger.error(f"Erro inesperado ao despejar capturas: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "files": self.files,
+            "total_bytes": self.total_bytes,
+            "deduplicated": self.deduplicated,
+            "evicted": self.evicted,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+    def close(self):
+        self._stop_event.set()
+        if self._evictor is not None:
+            self._evictor.join(timeout=5)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import queue
+import time
+from threading import Thread
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from capture_store import CaptureStore
+from metrics import ENCODE_LATENCY
+from tracing import TRACER
+
+# Recebe o caminho da imagem e os bytes JPEG (None e None se o avistamento segue sem imagem)
+OnEncoded = Callable[[Optional[str], Optional[bytes]], None]
+
+
+class CaptureWriter:
+    """
+    Estágio assíncrono de codificação e gravação das imagens dos avistamentos.
+
+    Os recortes entram numa fila limitada e são tratados por um grupo de threads: cada recorte
+    é codificado uma única vez com `cv2.imencode`, os bytes são gravados no `CaptureStore` e
+    entregues ao callback (envio para o backend), que assim não volta a ler o ficheiro. O
+    `cv2.imencode` liberta o GIL, por isso as threads codificam em paralelo. Se a fila estiver
+    cheia, `submit` espera no máximo `submit_timeout` segundos; depois o recorte é descartado
+    (contado em `captures_dropped`) e o callback é chamado sem imagem, para o avistamento
+    seguir na mesma: o ciclo das câmeras nunca fica preso ao disco.
+    """
+
+    def __init__(
+        self,
+        store: CaptureStore,
+        workers: int = 2,
+        queue_size: int = 256,
+        jpeg_quality: int = 90,
+        submit_timeout: float = 0.05,
+    ):
+        self.store = store
+        self.jpeg_quality = jpeg_quality
+        self.submit_timeout = submit_timeout
+        self.logger = logging.getLogger(__name__)
+
+        # Contadores expostos para monitorização
+        self.captures_written = 0
+        self.captures_dropped = 0
+        self.encode_seconds = 0.0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._threads = [Thread(target=self._worker, name=f"capture-writer-{i}", daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, camera_id: int, plate_text: str, crop: np.ndarray, on_encoded: OnEncoded):
+        """Agenda a codificação e gravação do recorte; `on_encoded` é chamado no fim."""
+        try:
+            self._queue.put((camera_id, plate_text, crop, on_encoded), timeout=self.submit_timeout)
+        except queue.Full:
+            self.captures_dropped += 1
+            self.logger.error(f"Fila de gravação cheia. Avistamento da placa {plate_text} enviado sem imagem.")
+            on_encoded(None, None)
+
+    def _encode_and_write(self, camera_id: int, plate_text: str, crop: np.ndarray) -> Tuple[Optional[str], Optional[bytes]]:
+        start = time.perf_counter()
+        with TRACER.span("encode"):
+            ok, buffer = cv2.imencode(".jpg", crop, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        elapsed = time.perf_counter() - start
+        self.encode_seconds += elapsed
+        ENCODE_LATENCY.labels(camera_id=str(camera_id)).observe(elapsed)
+        if not ok:
+            self.logger.error(f"Falha ao codificar a imagem da placa {plate_text}.")
+            return None, None
+        image_bytes = buffer.tobytes()
+        try:
+            with TRACER.span("store"):
+                image_path = self.store.put(image_bytes, camera_id=camera_id, plate=plate_text)
+            self.captures_written += 1
+        except OSError as e:
+            # A imagem segue na mesma em memória para o backend, com o nome que teria no disco
+            self.logger.error(f"Falha ao gravar a imagem da placa {plate_text}: {e}")
+            image_path = self.store.path_for(hashlib.sha256(image_bytes).hexdigest())
+        return image_path, image_bytes
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            camera_id, plate_text, crop, on_encoded = item
+            try:
+                with TRACER.span("capture", camera=camera_id):
+                    on_encoded(*self._encode_and_write(camera_id, plate_text, crop))
+            except Exception as e:
+                self.logger.error(f"Erro inesperado ao gravar a imagem da placa {plate_text}: {e}")
+            finally:
+                self._queue.task_done()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: float = 10.0):
+        """Espera (até `timeout`) que as imagens pendentes sejam gravadas e para as threads."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
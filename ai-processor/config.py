@@ -0,0 +1,121 @@
+import os
+
+# Configuração do AI-Processor, lida a partir das variáveis de ambiente (.env)
+API_BASE_URL = os.getenv("API_BASE_URL", "http://gt-vision-backend:8000")
+
+# Cliente HTTP do backend: pool keep-alive, timeouts e novas tentativas com jitter
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+API_TIMEOUT_SECONDS = float(os.getenv("API_TIMEOUT_SECONDS", "5"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+API_BACKOFF_SECONDS = float(os.getenv("API_BACKOFF_SECONDS", "0.5"))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+UPLOAD_QUEUE_SIZE = int(os.getenv("UPLOAD_QUEUE_SIZE", "1000"))
+# Envio em lote: o lote parte quando atinge UPLOAD_BATCH_SIZE ou ao fim de UPLOAD_BATCH_WAIT_SECONDS
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "50"))
+UPLOAD_BATCH_WAIT_SECONDS = float(os.getenv("UPLOAD_BATCH_WAIT_SECONDS", "1"))
+
+# Transporte dos avistamentos: "http" (endpoint em lote) ou "amqp" (RabbitMQ com confirmação)
+SIGHTINGS_TRANSPORT = os.getenv("SIGHTINGS_TRANSPORT", "http")
+# RabbitMQ: avistamentos (modo "amqp") e comandos de câmeras vindos do backend
+RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "gt-vision-rabbitmq")
+RABBITMQ_DEFAULT_USER = os.getenv("RABBITMQ_DEFAULT_USER", "user")
+RABBITMQ_DEFAULT_PASS = os.getenv("RABBITMQ_DEFAULT_PASS", "password")
+
+# Outbox persistente para os avistamentos que não chegam ao backend (vazio desativa)
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "/app/outbox/sightings.db")
+OUTBOX_REPLAY_CONCURRENCY = int(os.getenv("OUTBOX_REPLAY_CONCURRENCY", "2"))
+OUTBOX_REPLAY_INTERVAL_SECONDS = float(os.getenv("OUTBOX_REPLAY_INTERVAL_SECONDS", "5"))
+
+# Detector de veículos: "ultralytics" (torch, modelo .pt) ou "onnx" (ONNX Runtime, modelo .onnx).
+# O torch e o ultralytics estão em requirements-ultralytics.txt. A imagem Docker traz o yolov8n.onnx
+# exportado na construção e indica-o em DETECTOR_ONNX_MODEL
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "ultralytics")
+DETECTOR_ONNX_MODEL = os.getenv("DETECTOR_ONNX_MODEL", "yolov8n.onnx")
+DETECTOR_MODEL = os.getenv("DETECTOR_MODEL", DETECTOR_ONNX_MODEL if DETECTOR_BACKEND == "onnx" else "yolov8n.pt")
+DETECTOR_INTRA_OP_THREADS = int(os.getenv("DETECTOR_INTRA_OP_THREADS", "0"))
+DETECTOR_INTER_OP_THREADS = int(os.getenv("DETECTOR_INTER_OP_THREADS", "0"))
+
+# Agendador de inferência partilhado por todas as câmeras
+DETECTOR_MAX_BATCH_SIZE = int(os.getenv("DETECTOR_MAX_BATCH_SIZE", "8"))
+DETECTOR_MAX_WAIT_MS = float(os.getenv("DETECTOR_MAX_WAIT_MS", "20"))
+
+# OCR dos recortes de cada lote do agendador, em blocos de até OCR_MAX_BATCH_SIZE placas
+OCR_MAX_BATCH_SIZE = int(os.getenv("OCR_MAX_BATCH_SIZE", "32"))
+
+# Localizador de placas (YOLOv8 ONNX de uma classe) sobre os recortes de veículos; vazio desativa
+PLATE_LOCALIZER_MODEL = os.getenv("PLATE_LOCALIZER_MODEL", "")
+PLATE_LOCALIZER_CONF = float(os.getenv("PLATE_LOCALIZER_CONF", "0.4"))
+PLATE_LOCALIZER_BATCH_SIZE = int(os.getenv("PLATE_LOCALIZER_BATCH_SIZE", "16"))
+
+# Fonte dos frames: "opencv" (cv2.VideoCapture) ou "ffmpeg" (processo ffmpeg com vídeo bruto
+# num pipe). As opções FFMPEG_*/FRAME_* só se aplicam ao ffmpeg; FRAME_GRAYSCALE só serve
+# modelos de OCR em tons de cinzento (o detector volta a expandir para 3 canais)
+FRAME_SOURCE = os.getenv("FRAME_SOURCE", "opencv")
+FFMPEG_RTSP_TRANSPORT = os.getenv("FFMPEG_RTSP_TRANSPORT", "tcp")
+FFMPEG_TIMEOUT_SECONDS = float(os.getenv("FFMPEG_TIMEOUT_SECONDS", "10"))
+FFMPEG_DECODE_THREADS = int(os.getenv("FFMPEG_DECODE_THREADS", "1"))
+FRAME_SCALE_WIDTH = int(os.getenv("FRAME_SCALE_WIDTH", "0"))
+FRAME_GRAYSCALE = os.getenv("FRAME_GRAYSCALE", "false").lower() in ("1", "true", "yes")
+FRAME_KEYFRAMES_ONLY = os.getenv("FRAME_KEYFRAMES_ONLY", "false").lower() in ("1", "true", "yes")
+
+# Em sobrecarga (fração de frames descartados numa janela acima do limiar), a câmera passa
+# a descodificar só keyframes durante OVERLOAD_KEYFRAME_HOLD_SECONDS; 0 desativa
+OVERLOAD_DROP_RATIO = float(os.getenv("OVERLOAD_DROP_RATIO", "0"))
+OVERLOAD_WINDOW_SECONDS = float(os.getenv("OVERLOAD_WINDOW_SECONDS", "10"))
+OVERLOAD_KEYFRAME_HOLD_SECONDS = float(os.getenv("OVERLOAD_KEYFRAME_HOLD_SECONDS", "60"))
+
+# Descodificação multi-processo: 0 mantém as câmeras em threads no processo principal
+DECODE_WORKERS = int(os.getenv("DECODE_WORKERS", "0"))
+SHM_RING_SLOTS = int(os.getenv("SHM_RING_SLOTS", "3"))
+SHM_MAX_FRAME_HEIGHT = int(os.getenv("SHM_MAX_FRAME_HEIGHT", "1080"))
+SHM_MAX_FRAME_WIDTH = int(os.getenv("SHM_MAX_FRAME_WIDTH", "1920"))
+
+# Controlo de carga: em sobrecarga do detector (fila ou latência acima do alvo) limita os
+# frames/s de cada câmera em proporção do seu priority_weight, nunca abaixo de GOVERNOR_MIN_FPS
+LOAD_GOVERNOR_ENABLED = os.getenv("LOAD_GOVERNOR_ENABLED", "true").lower() in ("1", "true", "yes")
+GOVERNOR_MIN_FPS = float(os.getenv("GOVERNOR_MIN_FPS", "2"))
+GOVERNOR_MAX_FPS = float(os.getenv("GOVERNOR_MAX_FPS", "0"))
+GOVERNOR_TARGET_QUEUE_DEPTH = int(os.getenv("GOVERNOR_TARGET_QUEUE_DEPTH", "0"))
+GOVERNOR_TARGET_LATENCY_MS = float(os.getenv("GOVERNOR_TARGET_LATENCY_MS", "500"))
+
+# Porta do endpoint Prometheus (/metrics); 0 desativa
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+# Perfil por etapas em formato Chrome trace / Perfetto, capturado a pedido (SIGUSR1 ou
+# HTTP em TRACE_PORT; 0 desativa o HTTP). Cada frame/lote é registado com probabilidade
+# TRACE_SAMPLE_RATE; a captura por SIGUSR1 pára sozinha após TRACE_DURATION_SECONDS
+# (0 = até ao sinal seguinte) e é gravada em TRACE_DIR
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_MAX_EVENTS = int(os.getenv("TRACE_MAX_EVENTS", "200000"))
+TRACE_DURATION_SECONDS = float(os.getenv("TRACE_DURATION_SECONDS", "30"))
+TRACE_DIR = os.getenv("TRACE_DIR", "/app/traces")
+TRACE_PORT = int(os.getenv("TRACE_PORT", "0"))
+
+# Filtro de movimento antes do detector (valores por omissão; cada câmera pode
+# sobrepor 'motion_sensitivity' e 'motion_region' nos seus dados)
+MOTION_GATE_ENABLED = os.getenv("MOTION_GATE_ENABLED", "true").lower() in ("1", "true", "yes")
+MOTION_SENSITIVITY = float(os.getenv("MOTION_SENSITIVITY", "0.01"))
+MOTION_REGION = os.getenv("MOTION_REGION", "")
+
+# Tracking de veículos: emite um avistamento quando a fusão de TRACK_STABLE_READS
+# leituras atinge TRACK_STABLE_CONFIDENCE ou quando o veículo desaparece há
+# TRACK_MAX_AGE_SECONDS
+TRACK_MAX_AGE_SECONDS = float(os.getenv("TRACK_MAX_AGE_SECONDS", "2"))
+TRACK_STABLE_READS = int(os.getenv("TRACK_STABLE_READS", "5"))
+TRACK_STABLE_CONFIDENCE = float(os.getenv("TRACK_STABLE_CONFIDENCE", "0.8"))
+
+# Gravação das imagens dos avistamentos, fora do ciclo das câmeras
+CAPTURES_DIR = os.getenv("CAPTURES_DIR", "/app/captures")
+CAPTURE_WRITER_WORKERS = int(os.getenv("CAPTURE_WRITER_WORKERS", "2"))
+CAPTURE_WRITER_QUEUE_SIZE = int(os.getenv("CAPTURE_WRITER_QUEUE_SIZE", "256"))
+# Espera máxima por lugar na fila antes de o avistamento seguir sem imagem
+CAPTURE_WRITER_SUBMIT_TIMEOUT_MS = float(os.getenv("CAPTURE_WRITER_SUBMIT_TIMEOUT_MS", "50"))
+CAPTURE_JPEG_QUALITY = int(os.getenv("CAPTURE_JPEG_QUALITY", "90"))
+# Limites do armazenamento das imagens, aplicados pelo evictor (0 desativa cada limite)
+CAPTURE_STORE_MAX_BYTES = int(os.getenv("CAPTURE_STORE_MAX_BYTES", str(20 * 2**30)))
+CAPTURE_STORE_MAX_AGE_HOURS = float(os.getenv("CAPTURE_STORE_MAX_AGE_HOURS", "0"))
+CAPTURE_STORE_EVICT_INTERVAL_SECONDS = float(os.getenv("CAPTURE_STORE_EVICT_INTERVAL_SECONDS", "60"))
+
+# Deduplicação de avistamentos (câmera, placa) antes do envio
+DEDUP_TTL_SECONDS = float(os.getenv("DEDUP_TTL_SECONDS", "30"))
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "10000"))
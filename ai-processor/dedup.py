@@ -0,0 +1,94 @@
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+
+_NON_ALNUM = re.compile(r"[^0-9A-Z]")
+
+
+def normalize_plate(plate: str) -> str:
+    return _NON_ALNUM.sub("", plate.upper())
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """True se `a` e `b` diferem no máximo por uma substituição, inserção ou remoção."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+class SightingDeduplicator:
+    """
+    Cache TTL em memória que evita enviar repetidamente a mesma placa da mesma câmera.
+
+    A chave é (câmera, placa normalizada). Uma leitura que difira de uma placa já vista no
+    máximo num carácter conta como repetição. Cada repetição renova o prazo, por isso um
+    veículo que continua em cena não volta a ser enviado. O número de entradas é limitado e,
+    quando cheio, são despejadas as usadas há mais tempo (LRU).
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10_000, fuzzy: bool = True):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.fuzzy = fuzzy
+        self._entries: "OrderedDict[Tuple[int, str], float]" = OrderedDict()
+        self._by_camera: Dict[int, Set[str]] = {}
+        self._lock = Lock()
+
+        # Contador exposto para monitorização
+        self.suppressed = 0
+
+    def _remove(self, key: Tuple[int, str]):
+        del self._entries[key]
+        plates = self._by_camera.get(key[0])
+        if plates is not None:
+            plates.discard(key[1])
+            if not plates:
+                del self._by_camera[key[0]]
+
+    def _find(self, camera_id: int, plate: str) -> Optional[Tuple[int, str]]:
+        key = (camera_id, plate)
+        if key in self._entries:
+            return key
+        if not self.fuzzy:
+            return None
+        for known in self._by_camera.get(camera_id, ()):
+            if within_one_edit(plate, known):
+                return (camera_id, known)
+        return None
+
+    def should_send(self, camera_id: int, plate: str, now: Optional[float] = None) -> bool:
+        """Regista a leitura e devolve False se for um duplicado recente."""
+        now = time.monotonic() if now is None else now
+        plate = normalize_plate(plate)
+        with self._lock:
+            # As entradas mais antigas estão no início do OrderedDict
+            while self._entries:
+                oldest_key, seen_at = next(iter(self._entries.items()))
+                if now - seen_at <= self.ttl:
+                    break
+                self._remove(oldest_key)
+
+            match = self._find(camera_id, plate)
+            if match is not None:
+                self._entries[match] = now
+                self._entries.move_to_end(match)
+                self.suppressed += 1
+                return False
+
+            key = (camera_id, plate)
+            self._entries[key] = now
+            self._by_camera.setdefault(camera_id, set()).add(plate)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
@@ -1,49 +1,195 @@
-import cv2
-import os
 import logging
-from ultralytics import YOLO
+import time
+from collections import Counter
+from typing import Optional
 from fast_plate_ocr.inference.plate_recognizer import LicensePlateRecognizer # Nome da classe corrigido
+import cv2
 import numpy as np
 
+from metrics import OCR_LATENCY, OCR_PLATES
+from onnx_yolo import OnnxYolo
+from plate_localizer import PlateLocalizer
+from roi import RegionOfInterest
+from tracing import TRACER
+
+# Classes COCO dos veículos que podem ter placa: 2 (carro) e 7 (camião)
+VEHICLE_CLASSES = [2, 7]
+VEHICLE_CONF = 0.5
+VEHICLE_IOU = 0.45
+
+
+def _clip_box(box: tuple, shape: tuple) -> Optional[tuple]:
+    """Limita a caixa (x1, y1, x2, y2) à imagem; devolve None se ficar sem área (recorte vazio)."""
+    h, w = shape[:2]
+    x1, y1, x2, y2 = max(box[0], 0), max(box[1], 0), min(box[2], w), min(box[3], h)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2, y2
+
+class VehicleDetector:
+    """
+    Primeiro estágio da deteção: caixas dos veículos num lote de frames.
+
+    O backend "ultralytics" carrega o modelo `.pt` com o torch; o backend "onnx" corre um
+    YOLOv8 exportado para `.onnx` no ONNX Runtime (letterbox e NMS em numpy), sem importar o
+    torch, com o número de threads configurável.
+    """
+
+    def __init__(self, model_path: str, backend: str = "ultralytics", intra_op_threads: int = 0, inter_op_threads: int = 0):
+        self.backend = backend
+        if backend == "onnx":
+            self.model = OnnxYolo(model_path, intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads)
+        elif backend == "ultralytics":
+            # Importado só aqui para que o backend ONNX não carregue (nem precise) do torch
+            try:
+                from ultralytics import YOLO
+            except ImportError as e:
+                raise ImportError(
+                    "O backend 'ultralytics' precisa do torch e do ultralytics: pip install -r requirements-ultralytics.txt"
+                ) from e
+            self.model = YOLO(model_path)
+        else:
+            raise ValueError(f"Backend de detecção desconhecido: '{backend}'. Use 'ultralytics' ou 'onnx'.")
+
+    def detect(self, frames: list) -> list:
+        """Devolve, para cada frame, as caixas (x1, y1, x2, y2) inteiras dos veículos."""
+        if self.backend == "onnx":
+            results = self.model.predict(frames, conf_threshold=VEHICLE_CONF, iou_threshold=VEHICLE_IOU, classes=VEHICLE_CLASSES)
+            return [[tuple(int(v) for v in box) for box in boxes] for boxes, _, _ in results]
+        # O ultralytics espera frames BGR
+        frames = [cv2.cvtColor(f, cv2.COLOR_GRAY2BGR) if f.ndim == 2 or f.shape[2] == 1 else f for f in frames]
+        results = self.model(frames, classes=VEHICLE_CLASSES, conf=VEHICLE_CONF, iou=VEHICLE_IOU, verbose=False)
+        return [[tuple(map(int, box.xyxy[0])) for box in result.boxes] for result in results]
+
 class PlateDetector:
-    def __init__(self, model_path: str):
-        self.model = YOLO(model_path)
+    def __init__(
+        self,
+        model_path: str,
+        ocr_max_batch_size: int = 32,
+        plate_localizer: Optional[PlateLocalizer] = None,
+        backend: str = "ultralytics",
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ):
+        """
+        Args:
+            model_path: Modelo do detector de veículos: `.pt` para o backend "ultralytics" ou um
+                YOLOv8 exportado para `.onnx` para o backend "onnx".
+            ocr_max_batch_size: Máximo de placas por chamada ao modelo de OCR.
+            backend: "ultralytics" (torch) ou "onnx" (ONNX Runtime, sem torch).
+            intra_op_threads: Threads do ONNX Runtime dentro de cada operador (0 = automático).
+            inter_op_threads: Threads do ONNX Runtime entre operadores (0 = automático).
+        """
+        self.vehicle_detector = VehicleDetector(model_path, backend, intra_op_threads, inter_op_threads)
         # Instanciação corrigida, utilizando um modelo padrão do hub
         self.plate_recognizer = LicensePlateRecognizer(hub_ocr_model="cct-xs-v1-global-model")
+        self.ocr_max_batch_size = ocr_max_batch_size
+        # Chamadas ao modelo de OCR por tamanho de lote (métricas e benchmark)
+        self.ocr_batch_sizes: Counter = Counter()
+        # Segundo estágio opcional: caixa da placa dentro de cada veículo, para o OCR
+        self.plate_localizer = plate_localizer
         self.logger = logging.getLogger(__name__)
-        self.captures_dir = "/app/captures"
-        os.makedirs(self.captures_dir, exist_ok=True)
-
-    def detect_and_recognize(self, frame: np.ndarray, camera_id: int) -> list:
-        detections = []
-        # As classes para 'license_plate' na COCO são geralmente a 2 ou 7
-        results = self.model(frame, classes=[2, 7], conf=0.5, verbose=False)
-
-        plate_crops = []
-        for result in results:
-            for box in result.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                crop = frame[y1:y2, x1:x2]
-                plate_crops.append(crop)
-        
-        if not plate_crops:
+
+    def detect_and_recognize(self, frame: np.ndarray, camera_id: int, roi: Optional[RegionOfInterest] = None) -> list:
+        return self.detect_and_recognize_batch([frame], [camera_id], [roi])[0]
+
+    def detect_and_recognize_batch(self, frames: list, camera_ids: list, rois: Optional[list] = None) -> list:
+        """
+        Corre o detector uma única vez sobre um lote de frames (possivelmente de câmeras
+        diferentes) e devolve, para cada frame, a lista dos veículos detectados com a caixa
+        ('bbox'), o recorte ('crop'), a leitura da placa ('plate', vazia se não houver) e a
+        confiança do OCR em cada carácter ('char_probs'). Com `plate_localizer`, o OCR corre só
+        sobre a placa encontrada em cada veículo ('plate_bbox', em coordenadas do frame); os
+        veículos sem placa visível não passam pelo OCR.
+
+        `rois` indica, por frame, a zona de deteção da câmera (ou None): o detector só vê o
+        retângulo que a envolve e os veículos fora do polígono são descartados antes do
+        recorte e do OCR. As caixas devolvidas estão sempre em coordenadas do frame inteiro.
+        """
+        rois = rois or [None] * len(frames)
+        detector_inputs, offsets = [], []
+        for frame, roi in zip(frames, rois):
+            detector_input, offset = roi.crop(frame) if roi else (frame, (0, 0))
+            detector_inputs.append(detector_input)
+            offsets.append(offset)
+
+        detections = [[] for _ in frames]
+        vehicle_crops = []
+        with TRACER.span("detect.vehicles"):
+            vehicle_boxes = self.vehicle_detector.detect(detector_inputs)
+            vehicle_boxes = [
+                roi.filter(boxes, frame.shape, offset) if roi else boxes
+                for frame, roi, offset, boxes in zip(frames, rois, offsets, vehicle_boxes)
+            ]
+        with TRACER.span("crop"):
+            for frame_idx, (frame, boxes) in enumerate(zip(frames, vehicle_boxes)):
+                for box in boxes:
+                    # Caixas fora do frame ou sem área dariam recortes vazios que o OCR não aceita
+                    box = _clip_box(box, frame.shape)
+                    if box is None:
+                        continue
+                    x1, y1, x2, y2 = box
+                    crop = frame[y1:y2, x1:x2]
+                    vehicle_crops.append(crop)
+                    detections[frame_idx].append({
+                        "bbox": (x1, y1, x2, y2),
+                        "crop": crop,
+                        "plate": "",
+                    })
+
+        if not vehicle_crops:
             return detections
 
+        flat_detections = [d for frame_detections in detections for d in frame_detections]
+        flat_cameras = [camera_id for camera_id, frame_detections in zip(camera_ids, detections) for _ in frame_detections]
+        if self.plate_localizer is None:
+            ocr_targets = list(zip(flat_detections, vehicle_crops))
+            ocr_cameras = flat_cameras
+        else:
+            # Um único lote do localizador para os veículos de todos os frames
+            ocr_targets, ocr_cameras = [], []
+            with TRACER.span("localize", crops=len(vehicle_crops)):
+                plate_boxes = self.plate_localizer.localize(vehicle_crops)
+            for detection, crop, plate_box, camera_id in zip(flat_detections, vehicle_crops, plate_boxes, flat_cameras):
+                if plate_box is not None:
+                    plate_box = _clip_box(plate_box, crop.shape)
+                if plate_box is None:
+                    continue
+                px1, py1, px2, py2 = plate_box
+                x1, y1 = detection["bbox"][:2]
+                detection["plate_bbox"] = (x1 + px1, y1 + py1, x1 + px2, y1 + py2)
+                ocr_targets.append((detection, crop[py1:py2, px1:px2]))
+                ocr_cameras.append(camera_id)
+
+        start = time.perf_counter()
+        # O agendador já junta os frames de todas as câmeras: os recortes do lote vão ao modelo
+        # de OCR de uma vez, em blocos de `ocr_max_batch_size`, sem esperar por outros pedidos
+        with TRACER.span("ocr", plates=len(ocr_targets)):
+            for i in range(0, len(ocr_targets), self.ocr_max_batch_size):
+                self._recognize(ocr_targets[i:i + self.ocr_max_batch_size])
+        if ocr_targets:
+            OCR_LATENCY.observe(time.perf_counter() - start)
+            for camera_id, plates in Counter(ocr_cameras).items():
+                OCR_PLATES.labels(camera_id=str(camera_id)).inc(plates)
+
+        return detections
+
+    def _recognize(self, targets: list):
         try:
-            # O método de reconhecimento se chama 'run'
-            # Ele retorna uma lista de strings diretamente
-            recognized_plates_text = self.plate_recognizer.run(plate_crops)
-            
-            for i, plate_text in enumerate(recognized_plates_text):
-                if plate_text:
-                    image_filename = f"capture_{camera_id}_{plate_text}_{cv2.getTickCount()}.jpg"
-                    image_path = os.path.join(self.captures_dir, image_filename)
-                    cv2.imwrite(image_path, plate_crops[i])
-                    detections.append({
-                        "plate": plate_text,
-                        "image_path": image_path
-                    })
+            plates, probs = self.plate_recognizer.run([crop for _, crop in targets], return_confidence=True)
         except Exception as e:
-            self.logger.error(f"Erro ao reconhecer matrículas: {e}")
+            if len(targets) == 1:
+                self.logger.error(f"Erro ao reconhecer a matrícula do veículo {targets[0][0]['bbox']}: {e}")
+                return
+            # Os erros tratam-se por recorte: um recorte inválido só faz perder a sua própria placa
+            for target in targets:
+                self._recognize([target])
+            return
+        self.ocr_batch_sizes[len(targets)] += 1
+        for (detection, _), plate, char_probs in zip(targets, plates, probs):
+            # As confidências por carácter alimentam a fusão temporal no tracker
+            detection["plate"], detection["char_probs"] = plate, char_probs
 
-        return detections
\ No newline at end of file
+    @property
+    def pad_char(self) -> str:
+        return self.plate_recognizer.config.pad_char
@@ -11,14 +11,18 @@ import click
 import keras
 import numpy as np
 from numpy.typing import DTypeLike
+from rich.console import Console
+from rich.table import Table
 
 from fast_plate_ocr.cli.utils import requires
 from fast_plate_ocr.core.types import TensorDataFormat
 from fast_plate_ocr.core.utils import log_time_taken
+from fast_plate_ocr.train.data.dataset import PlateRecognitionPyDataset
 from fast_plate_ocr.train.model.config import (
     PlateOCRConfig,
     load_plate_config_from_yaml,
 )
+from fast_plate_ocr.train.model.metric import cat_acc_metric, plate_acc_metric
 from fast_plate_ocr.train.utilities.utils import load_keras_model
 
 logging.basicConfig(
@@ -166,6 +170,166 @@ def export_onnx(
     logging.info("Saved ONNX model to %s", out_file)
 
 
+def _to_onnx_input(
+    x: np.ndarray, onnx_input_dtype: str, onnx_data_format: TensorDataFormat
+) -> np.ndarray:
+    """Convert a NxHxWxC uint8 batch (as yielded by the dataset) to the exported model input."""
+    if onnx_data_format == "channels_first":
+        x = x.transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(x, dtype=onnx_input_dtype)
+
+
+def _evaluate_onnx(
+    onnx_path: pathlib.Path,
+    dataset: PlateRecognitionPyDataset,
+    plate_config: PlateOCRConfig,
+    onnx_input_dtype: str,
+    onnx_data_format: TensorDataFormat,
+) -> dict[str, float]:
+    """Compute the training `plate_acc` and `cat_acc` metrics of an ONNX model over a dataset."""
+    import onnxruntime as rt  # noqa: PLC0415
+
+    sess = rt.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+    input_name = sess.get_inputs()[0].name
+    y_true, y_pred = [], []
+    for i in range(len(dataset)):
+        x, y = dataset[i]
+        y_true.append(y)
+        y_pred.append(
+            sess.run(None, {input_name: _to_onnx_input(x, onnx_input_dtype, onnx_data_format)})[0]
+        )
+    y_true_arr = np.concatenate(y_true).astype(np.float32)
+    y_pred_arr = np.concatenate(y_pred).astype(np.float32)
+    metric_fns = {
+        "plate_acc": plate_acc_metric(plate_config.max_plate_slots, plate_config.vocabulary_size),
+        "cat_acc": cat_acc_metric(plate_config.max_plate_slots, plate_config.vocabulary_size),
+    }
+    return {
+        name: float(keras.ops.convert_to_numpy(fn(y_true_arr, y_pred_arr)))
+        for name, fn in metric_fns.items()
+    }
+
+
+@requires("onnx", "onnxruntime")
+def quantize_onnx_int8(  # noqa: PLR0913
+    float_model_path: pathlib.Path,
+    out_file: pathlib.Path,
+    *,
+    plate_config: PlateOCRConfig,
+    plate_config_file: pathlib.Path,
+    annotations: pathlib.Path,
+    num_calibration_samples: int = 256,
+    dynamic_batch: bool = True,
+    onnx_input_dtype: str = "uint8",
+    onnx_data_format: TensorDataFormat = "channels_last",
+    benchmark_iters: int = 500,
+) -> dict[str, dict[str, float]]:
+    """
+    Post-training static INT8 quantization of an exported ONNX model.
+
+    Activations are calibrated (MinMax) on a random sample of the annotations CSV, then the
+    weights (per channel) and activations are quantized to 8 bits in QDQ format. Both models are
+    evaluated with the training `plate_acc`/`cat_acc` metrics on the whole annotations file and
+    benchmarked with `LicensePlateRecognizer.benchmark`, and a comparison table is printed.
+
+    :return: Metrics of the float and the quantized model, keyed by "float32" and "int8".
+    """
+    import onnx  # noqa: PLC0415
+    from onnxruntime.quantization import (  # noqa: PLC0415
+        CalibrationDataReader,
+        CalibrationMethod,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process  # noqa: PLC0415
+
+    # Calibrate one image at a time so that fixed batch (batch_size=1) models work too
+    calibration_dataset = PlateRecognitionPyDataset(
+        annotations_file=annotations, plate_config=plate_config, batch_size=1, shuffle=True
+    )
+    num_calibration_samples = min(num_calibration_samples, len(calibration_dataset))
+
+    class _CalibrationReader(CalibrationDataReader):
+        def __init__(self, input_name: str):
+            self.input_name = input_name
+            self.index = 0
+
+        def get_next(self) -> dict[str, np.ndarray] | None:
+            if self.index >= num_calibration_samples:
+                return None
+            x, _ = calibration_dataset[self.index]
+            self.index += 1
+            return {self.input_name: _to_onnx_input(x, onnx_input_dtype, onnx_data_format)}
+
+        def rewind(self) -> None:
+            self.index = 0
+
+    input_name = onnx.load(float_model_path).graph.input[0].name
+    logging.info("Calibrating INT8 quantization on %d samples ...", num_calibration_samples)
+    with NamedTemporaryFile(suffix=".onnx") as tmp:
+        # Shape inference + graph optimizations, recommended before static quantization
+        quant_pre_process(str(float_model_path), tmp.name, skip_symbolic_shape=True)
+        quantize_static(
+            tmp.name,
+            str(out_file),
+            _CalibrationReader(input_name),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=CalibrationMethod.MinMax,
+        )
+    logging.info("Saved INT8 ONNX model to %s", out_file)
+
+    eval_dataset = PlateRecognitionPyDataset(
+        annotations_file=annotations,
+        plate_config=plate_config,
+        batch_size=32 if dynamic_batch else 1,
+        shuffle=False,
+    )
+    report: dict[str, dict[str, float]] = {}
+    for name, path in (("float32", float_model_path), ("int8", out_file)):
+        metrics = _evaluate_onnx(
+            path, eval_dataset, plate_config, onnx_input_dtype, onnx_data_format
+        )
+        metrics["size_mb"] = path.stat().st_size / 1e6
+        # The benchmark feeds uint8 NxHxWxC tensors, the default export layout
+        if onnx_input_dtype == "uint8" and onnx_data_format == "channels_last":
+            from fast_plate_ocr.inference.plate_recognizer import LicensePlateRecognizer  # noqa: PLC0415
+
+            recognizer = LicensePlateRecognizer(
+                onnx_model_path=path, plate_config_path=plate_config_file, device="cpu"
+            )
+            metrics.update(
+                recognizer.benchmark(
+                    n_iter=benchmark_iters,
+                    warmup=min(benchmark_iters, 50),
+                    print_results=False,
+                )
+            )
+        report[name] = metrics
+
+    _print_quantization_report(report)
+    return report
+
+
+def _print_quantization_report(report: dict[str, dict[str, float]]) -> None:
+    table = Table(title="Float32 vs INT8", border_style="bright_blue")
+    table.add_column("Metric", justify="center", style="cyan", no_wrap=True)
+    table.add_column("Float32", justify="center", style="magenta")
+    table.add_column("INT8", justify="center", style="magenta")
+    table.add_column("Change", justify="center", style="green")
+    for metric in report["float32"]:
+        float_value, int8_value = report["float32"][metric], report["int8"][metric]
+        if metric.endswith("_acc"):
+            change = f"{(int8_value - float_value) * 100:+.2f} pp"
+        else:
+            change = f"{int8_value / float_value:.2f}x" if float_value else "-"
+        table.add_row(metric, f"{float_value:.4f}", f"{int8_value:.4f}", change)
+    Console().print(table)
+
+
 @requires("tensorflow")
 def export_tflite(
     model: keras.Model,
@@ -346,6 +510,36 @@ def export_coreml(
         "'channels_last' (NHWC) or 'channels_first' (NCHW)."
     ),
 )
+@click.option(
+    "--quantize",
+    type=click.Choice(["int8"], case_sensitive=False),
+    default=None,
+    help=(
+        "Also write a post-training statically quantized copy of the ONNX model (*.int8.onnx) and "
+        "report its accuracy and latency against the float model. Requires --annotations."
+    ),
+)
+@click.option(
+    "-a",
+    "--annotations",
+    required=False,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path),
+    help="Annotations CSV used to calibrate and evaluate the quantized model.",
+)
+@click.option(
+    "--calibration-samples",
+    default=256,
+    show_default=True,
+    type=int,
+    help="Number of randomly sampled annotated plates used for calibration.",
+)
+@click.option(
+    "--benchmark-iters",
+    default=500,
+    show_default=True,
+    type=int,
+    help="Timed iterations used to compare the float and quantized model latency.",
+)
 def export(  # noqa: PLR0913
     model_path: pathlib.Path,
     export_format: str,
@@ -356,10 +550,19 @@ def export(  # noqa: PLR0913
     skip_validation: bool,
     onnx_input_dtype: str,
     onnx_data_format: TensorDataFormat,
+    *,
+    quantize: str | None,
+    annotations: pathlib.Path | None,
+    calibration_samples: int,
+    benchmark_iters: int,
 ) -> None:
     """
     Export Keras models to other formats.
     """
+    if quantize and export_format != "onnx":
+        raise click.UsageError("--quantize is only supported with --format onnx.")
+    if quantize and annotations is None:
+        raise click.UsageError("--quantize requires --annotations for calibration.")
 
     plate_config = load_plate_config_from_yaml(plate_config_file)
     model = load_keras_model(model_path, plate_config)
@@ -376,6 +579,19 @@ def export(  # noqa: PLR0913
             onnx_input_dtype=onnx_input_dtype,
             onnx_data_format=onnx_data_format,
         )
+        if quantize == "int8":
+            quantize_onnx_int8(
+                float_model_path=out_file,
+                out_file=_make_output_path(model_path, save_dir, ".int8.onnx"),
+                plate_config=plate_config,
+                plate_config_file=plate_config_file,
+                annotations=annotations,
+                num_calibration_samples=calibration_samples,
+                dynamic_batch=dynamic_batch,
+                onnx_input_dtype=onnx_input_dtype,
+                onnx_data_format=onnx_data_format,
+                benchmark_iters=benchmark_iters,
+            )
     elif export_format == "tflite":
         out_file = _make_output_path(model_path, save_dir, ".tflite")
         # TFLite doesn't seem to support dynamic batch size
@@ -4,7 +4,13 @@ ONNX inference module.
 
 import logging
 import pathlib
-from collections.abc import Sequence
+import queue
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from contextlib import AbstractContextManager, nullcontext
 from typing import Literal
 
 import numpy as np
@@ -123,7 +129,7 @@ class LicensePlateRecognizer:
     ONNX inference class for performing license plates OCR.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913  # pylint: disable=too-many-arguments
         self,
         hub_ocr_model: OcrModel | None = None,
         device: Literal["cuda", "cpu", "auto"] = "auto",
@@ -132,6 +138,10 @@ class LicensePlateRecognizer:
         onnx_model_path: PathLike | None = None,
         plate_config_path: PathLike | None = None,
         force_download: bool = False,
+        *,
+        max_batch_size: int = 32,
+        max_latency_ms: float = 5.0,
+        span_factory: Callable[[str], AbstractContextManager] | None = None,
     ) -> None:
         """
         Initializes the `LicensePlateRecognizer` with the specified OCR model and inference device.
@@ -162,6 +172,13 @@ class LicensePlateRecognizer:
             onnx_model_path: Path to ONNX model file to use (In case you want to use a custom one).
             plate_config_path: Path to config file to use (In case you want to use a custom one).
             force_download: Force and download the model, even if it already exists.
+            max_batch_size: Maximum number of plates grouped into a single model call by
+                `submit`.
+            max_latency_ms: Maximum time (in milliseconds) `submit` waits for more requests to
+                fill a batch after the first one arrives.
+            span_factory: Optional callable returning a context manager for a named stage
+                (`ocr.batch`, `ocr.preprocess`, `ocr.onnx_run`, `ocr.postprocess`) of the
+                `submit` worker, used to plug in an external tracer.
         Returns:
             None.
         """
@@ -205,13 +222,26 @@ class LicensePlateRecognizer:
             onnx_model_path, providers=self.providers, sess_options=sess_options
         )
 
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size should be >= 1. Got {max_batch_size}.")
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self.batch_sizes: Counter[int] = Counter()
+        """Number of model calls made by the `submit` worker, keyed by achieved batch size."""
+        self._pending: queue.Queue[tuple[BatchArray, bool, Future]] = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+        self._shutdown = threading.Event()
+        self.span_factory = span_factory
+
     def benchmark(
         self,
         n_iter: int = 2_500,
         batch_size: int = 1,
         include_processing: bool = False,
         warmup: int = 250,
-    ) -> None:
+        print_results: bool = True,
+    ) -> dict[str, float]:
         """
         Run an inference benchmark and pretty print the results.
 
@@ -228,6 +258,11 @@ class LicensePlateRecognizer:
             include_processing: Indicates whether the benchmark should include preprocessing and
                 postprocessing times in the measurement.
             warmup: Number of warmup iterations to run before the benchmark.
+            print_results: Whether to pretty print the results table.
+
+        Returns:
+            Dictionary with the average latency per batch (`avg_time_ms`) and the throughput
+            (`pps`), so the results can be compared programmatically (e.g. float vs quantized).
         """
         x = np.random.randint(
             0,
@@ -260,6 +295,9 @@ class LicensePlateRecognizer:
 
         avg_time_ms = cum_time / n_iter if n_iter else 0.0
         pps = (1_000 / avg_time_ms) * batch_size if n_iter else 0.0
+        results = {"avg_time_ms": avg_time_ms, "pps": pps}
+        if not print_results:
+            return results
 
         console = Console()
         model_info = Panel(
@@ -279,6 +317,7 @@ class LicensePlateRecognizer:
         table.add_row("Average Time / batch (ms)", f"{avg_time_ms:.4f}")
         table.add_row("Plates per Second (PPS)", f"{pps:.4f}")
         console.print(table)
+        return results
 
     def run(
         self,
@@ -319,3 +358,104 @@ class LicensePlateRecognizer:
             self.config.alphabet,
             return_confidence=return_confidence,
         )
+
+    def submit(
+        self, source: ImgLike, return_confidence: bool = False
+    ) -> "Future[str | tuple[str, npt.NDArray]]":
+        """
+        Schedules OCR for a single plate image and returns immediately.
+
+        Requests coming from any number of threads are grouped by a background worker into one
+        model call, of at most `max_batch_size` plates, waiting at most `max_latency_ms` after the
+        first pending request. This is thread-safe and amortizes the cost of running many small
+        batches.
+
+        Args:
+            source: A single image, either a file path or a NumPy array with shape (H, W),
+                (H, W, 1) or (H, W, 3). It is resized in the caller's thread.
+            return_confidence: Whether the result should include the per-character confidence
+                scores.
+
+        Returns:
+            A future resolving to the recognized plate. If `return_confidence` is True, it resolves
+            to a `(plate, probs)` tuple, where `probs` has shape `(plate_slots,)`.
+        """
+        if isinstance(source, np.ndarray) and source.ndim == 4:
+            raise ValueError("submit() expects a single image, use run() for batches.")
+
+        frame = _frame_from(source, self.config)
+        future: Future[str | tuple[str, npt.NDArray]] = Future()
+        # Checking the flag and enqueueing under the lock means `shutdown()` either rejects the
+        # request or finds it in the queue and cancels it; a future is never left unresolved.
+        with self._worker_lock:
+            if self._shutdown.is_set():
+                raise RuntimeError("Cannot submit after shutdown().")
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._batch_loop, name="plate-ocr-batcher", daemon=True
+                )
+                self._worker.start()
+            self._pending.put((frame, return_confidence, future))
+        return future
+
+    def shutdown(self) -> None:
+        """
+        Stops the `submit` worker. Requests still pending are cancelled and later calls to
+        `submit` raise `RuntimeError`.
+        """
+        with self._worker_lock:
+            self._shutdown.set()
+        if self._worker is not None:
+            self._worker.join()
+        while not self._pending.empty():
+            self._pending.get_nowait()[2].cancel()
+
+    def _get_pending(self, timeout: float) -> tuple[BatchArray, bool, Future] | None:
+        try:
+            return self._pending.get(timeout=max(timeout, 0))
+        except queue.Empty:
+            return None
+
+    def _next_batch(self) -> list[tuple[BatchArray, bool, Future]]:
+        first = self._get_pending(0.1)
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_latency_ms / 1_000
+        while len(batch) < self.max_batch_size:
+            item = self._get_pending(deadline - time.perf_counter())
+            if item is None:
+                break
+            batch.append(item)
+        return batch
+
+    def _span(self, name: str) -> AbstractContextManager:
+        return self.span_factory(name) if self.span_factory is not None else nullcontext()
+
+    def _batch_loop(self) -> None:
+        while not self._shutdown.is_set():
+            batch = [item for item in self._next_batch() if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                with self._span("ocr.batch"):
+                    with self._span("ocr.preprocess"):
+                        x = preprocess_image(np.stack([frame for frame, _, _ in batch], axis=0))
+                    with self._span("ocr.onnx_run"):
+                        y: list[npt.NDArray] = self.model.run(None, {"input": x})
+                    with self._span("ocr.postprocess"):
+                        plates, probs = postprocess_output(
+                            y[0],
+                            self.config.max_plate_slots,
+                            self.config.alphabet,
+                            return_confidence=True,
+                        )
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batch_sizes[len(batch)] += 1
+            for i, (_, return_confidence, future) in enumerate(batch):
+                future.set_result((plates[i], probs[i]) if return_confidence else plates[i])
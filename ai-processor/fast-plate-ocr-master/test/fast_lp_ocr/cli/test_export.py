@@ -166,3 +166,60 @@ def test_export_to_coreml(
     assert result.exit_code == 0, result.output
     exported_path = model_save_path.with_suffix(".mlpackage")
     assert exported_path.exists(), f"Expected exported CoreML file at {exported_path}"
+
+
+@pytest.mark.parametrize("model_config_path", MODEL_CONFIG_PATHS)
+def test_export_to_onnx_int8(
+    model_config_path: Path,
+    dummy_dataset: Path,
+    tmp_path: Path,
+) -> None:
+    plate_config_path = LATIN_VOCAB_PLATE_CONFIG
+    runner = CliRunner()
+    # Build and save the Keras model
+    model_save_path, _ = _build_and_save_keras_model(model_config_path, plate_config_path, tmp_path)
+    # Export with static INT8 quantization calibrated on the dummy dataset
+    args = [
+        "-m",
+        str(model_save_path),
+        "--plate-config-file",
+        str(plate_config_path),
+        "--format",
+        "onnx",
+        "--quantize",
+        "int8",
+        "--annotations",
+        str(dummy_dataset),
+        "--calibration-samples",
+        "2",
+        "--benchmark-iters",
+        "5",
+    ]
+    result = runner.invoke(export_cli, args)
+    assert result.exit_code == 0, result.output
+
+    # The float model is kept next to the quantized one
+    assert model_save_path.with_suffix(".onnx").exists()
+    quantized_path = model_save_path.with_suffix(".int8.onnx")
+    assert quantized_path.exists(), f"Expected quantized ONNX file at {quantized_path}"
+
+    op_types = {node.op_type for node in onnx.load(str(quantized_path)).graph.node}
+    assert {"QuantizeLinear", "DequantizeLinear"} <= op_types, "Expected a QDQ quantized graph"
+
+
+def test_export_quantize_requires_annotations(tmp_path: Path) -> None:
+    runner = CliRunner()
+    model_save_path, _ = _build_and_save_keras_model(
+        MODEL_CONFIG_PATHS[0], LATIN_VOCAB_PLATE_CONFIG, tmp_path
+    )
+    args = [
+        "-m",
+        str(model_save_path),
+        "--plate-config-file",
+        str(LATIN_VOCAB_PLATE_CONFIG),
+        "--quantize",
+        "int8",
+    ]
+    result = runner.invoke(export_cli, args)
+    assert result.exit_code != 0
+    assert "--annotations" in result.output
@@ -3,8 +3,11 @@ Tests for ONNX inference module.
 """
 
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 import cv2
+import numpy as np
 import numpy.typing as npt
 import pytest
 
@@ -50,3 +53,55 @@ def test_result_from_different_image_sources(
 ) -> None:
     actual_plate_count = len(onnx_model.run(input_image))
     assert actual_plate_count == expected_plate_count
+
+
+def test_submit_matches_run(onnx_model: LicensePlateRecognizer) -> None:
+    images = [
+        cv2.imread(str(ASSETS_DIR / "test_plate_1.png"), cv2.IMREAD_GRAYSCALE),
+        cv2.imread(str(ASSETS_DIR / "test_plate_2.png"), cv2.IMREAD_GRAYSCALE),
+    ]
+    expected = onnx_model.run(images)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = list(pool.map(onnx_model.submit, images * 4))
+    assert [f.result() for f in futures] == expected * 4
+    assert sum(size * count for size, count in onnx_model.batch_sizes.items()) >= len(futures)
+
+
+def test_submit_return_confidence(onnx_model: LicensePlateRecognizer) -> None:
+    plate, probs = onnx_model.submit(
+        ASSETS_DIR / "test_plate_1.png", return_confidence=True
+    ).result()
+    assert isinstance(plate, str)
+    assert probs.shape == (onnx_model.config.max_plate_slots,)
+
+
+def test_submit_rejects_batches(onnx_model: LicensePlateRecognizer) -> None:
+    batch = np.zeros((2, 70, 140, 1), dtype=np.uint8)
+    with pytest.raises(ValueError, match="single image"):
+        onnx_model.submit(batch)
+
+
+def test_submit_reports_stage_spans() -> None:
+    stages: list[str] = []
+
+    @contextmanager
+    def record(name: str) -> Iterator[None]:
+        yield
+        stages.append(name)
+
+    model = LicensePlateRecognizer(
+        "argentinian-plates-cnn-model", device="cpu", span_factory=record
+    )
+    model.submit(ASSETS_DIR / "test_plate_1.png").result()
+    model.shutdown()
+    assert stages == ["ocr.preprocess", "ocr.onnx_run", "ocr.postprocess", "ocr.batch"]
+
+
+def test_shutdown_resolves_pending_futures() -> None:
+    model = LicensePlateRecognizer("argentinian-plates-cnn-model", device="cpu")
+    image = cv2.imread(str(ASSETS_DIR / "test_plate_1.png"), cv2.IMREAD_GRAYSCALE)
+    futures = [model.submit(image) for _ in range(64)]
+    model.shutdown()
+    assert all(future.done() for future in futures)
+    with pytest.raises(RuntimeError, match="after shutdown"):
+        model.submit(image)
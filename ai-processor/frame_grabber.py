@@ -0,0 +1,181 @@
+import logging
+import time
+from threading import Condition, Event, Thread
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from frame_source import OpenCVSource
+from tracing import TRACER
+
+
+class FrameGrabber(Thread):
+    """
+    Thread de descodificação de uma câmera.
+
+    Lê o stream continuamente e guarda apenas o frame mais recente. Se o consumidor
+    (inferência) não acompanhar o FPS da câmera, os frames antigos são descartados em vez
+    de se acumularem no buffer do RTSP/FFmpeg.
+    """
+
+    def __init__(
+        self,
+        rtsp_url: str,
+        camera_name: str,
+        reconnect_delay: float = 10.0,
+        source_factory: Optional[Callable[[str], object]] = None,
+        overload_drop_ratio: float = 0.0,
+        overload_window: float = 10.0,
+        overload_hold: float = 60.0,
+    ):
+        """
+        Args:
+            source_factory: Cria a fonte de frames a partir do URL (ver `frame_source`); por
+                omissão usa o `cv2.VideoCapture`.
+            overload_drop_ratio: Fração de frames descartados numa janela de `overload_window`
+                segundos a partir da qual a câmera passa a descodificar só keyframes, se a fonte
+                o suportar (0 desativa). Volta à descodificação completa após `overload_hold`
+                segundos.
+        """
+        super().__init__(name=f"grabber-{camera_name}", daemon=True)
+        self.rtsp_url = rtsp_url
+        self.camera_name = camera_name
+        self.reconnect_delay = reconnect_delay
+        self.source = (source_factory or OpenCVSource)(rtsp_url)
+        self.overload_drop_ratio = overload_drop_ratio
+        self.overload_window = overload_window
+        self.overload_hold = overload_hold
+        self.logger = logging.getLogger(__name__)
+
+        self._cond = Condition()
+        self._stop_event = Event()
+        self._frame: Optional[np.ndarray] = None
+        self._captured_at = 0.0
+        self._window_start = time.monotonic()
+        self._window_counts = (0, 0)
+        self._keyframes_since = 0.0
+
+        # Contadores expostos para monitorização
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+        self.keyframe_switches = 0
+
+    def _set_keyframes_only(self, enabled: bool):
+        self.source.keyframes_only = enabled
+        self.source.close()
+        if enabled:
+            self.keyframe_switches += 1
+            self._keyframes_since = time.monotonic()
+            self.logger.warning(
+                f"Câmera {self.camera_name} sobrecarregada: a descodificar só keyframes durante "
+                f"{self.overload_hold:g} segundos."
+            )
+        else:
+            self.logger.info(f"Câmera {self.camera_name} de volta à descodificação completa.")
+        if not self.source.open():
+            # A fonte fica fechada e a leitura seguinte devolve None: segue o caminho de reconexão
+            self.source.close()
+            self.logger.error(
+                f"Falha ao reabrir o stream da câmera {self.camera_name}. "
+                f"Tentando reconectar em {self.reconnect_delay:g} segundos."
+            )
+
+    def _check_overload(self):
+        """Passa a câmera para keyframes quando a inferência não acompanha, e volta mais tarde."""
+        now = time.monotonic()
+        if self.source.keyframes_only:
+            if self._keyframes_since and now - self._keyframes_since >= self.overload_hold:
+                self._keyframes_since = 0.0
+                self._reset_window(now)
+                self._set_keyframes_only(False)
+            return
+        if now - self._window_start < self.overload_window:
+            return
+        decoded = self.frames_decoded - self._window_counts[0]
+        dropped = self.frames_dropped - self._window_counts[1]
+        self._reset_window(now)
+        if decoded and dropped / decoded >= self.overload_drop_ratio:
+            self._set_keyframes_only(True)
+
+    def _reset_window(self, now: float):
+        self._window_start = now
+        self._window_counts = (self.frames_decoded, self.frames_dropped)
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.logger.error(f"Erro inesperado na leitura da câmera {self.camera_name}: {e!r}")
+        finally:
+            # Sem isto o consumidor ficaria à espera de frames de uma thread que já morreu
+            self.source.close()
+            self.stop()
+
+    def _run(self):
+        if not self.source.open():
+            self.logger.error(f"Não foi possível abrir o stream de vídeo para a câmera {self.camera_name}.")
+            return
+
+        while not self._stop_event.is_set():
+            with TRACER.span("decode", camera=self.camera_name):
+                frame = self.source.read()
+            if frame is None:
+                self.logger.warning(
+                    f"Stream da câmera {self.camera_name} terminou. "
+                    f"Tentando reconectar em {self.reconnect_delay:g} segundos."
+                )
+                self.source.close()
+                if self._stop_event.wait(self.reconnect_delay):
+                    break
+                self.reconnects += 1
+                if not self.source.open():
+                    self.logger.error(f"Falha ao reconectar à câmera {self.camera_name}. Encerrando thread.")
+                    break
+                continue
+
+            with self._cond:
+                self.frames_decoded += 1
+                # O frame anterior nunca foi consumido: é descartado
+                if self._frame is not None:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._captured_at = time.time()
+                self._cond.notify()
+            # Larga a referência local para a fonte poder reutilizar o buffer depois de consumido
+            del frame
+
+            if self.overload_drop_ratio > 0 and self.source.supports_keyframes_only and not self._stop_event.is_set():
+                self._check_overload()
+
+    def read(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Devolve o frame mais recente ainda não consumido e o instante (epoch) em que foi
+        capturado. Bloqueia até `timeout` segundos; devolve None se não houver frame novo.
+        """
+        with self._cond:
+            if self._frame is None and not self._stop_event.is_set():
+                self._cond.wait(timeout)
+            if self._frame is None:
+                return None
+            frame, captured_at = self._frame, self._captured_at
+            self._frame = None
+            return frame, captured_at
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def stats(self) -> dict:
+        return {
+            "frames_decoded": self.frames_decoded,
+            "frames_dropped": self.frames_dropped,
+            "reconnects": self.reconnects,
+            "keyframe_switches": self.keyframe_switches,
+            "keyframes_only": self.source.keyframes_only,
+        }
@@ -0,0 +1,197 @@
+import logging
+import os
+import subprocess
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class OpenCVSource:
+    """Fonte de frames através do `cv2.VideoCapture` (comportamento original)."""
+
+    supports_keyframes_only = False
+
+    def __init__(self, rtsp_url: str):
+        self.rtsp_url = rtsp_url
+        self.keyframes_only = False
+        self._cap: Optional[cv2.VideoCapture] = None
+
+    def open(self) -> bool:
+        self._cap = cv2.VideoCapture(self.rtsp_url)
+        return self._cap.isOpened()
+
+    def read(self) -> Optional[np.ndarray]:
+        # Fonte fechada (ex.: reabertura falhada): o chamador trata como fim do stream
+        if self._cap is None:
+            return None
+        ret, frame = self._cap.read()
+        return frame if ret else None
+
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class ImageFolderSource:
+    """Fonte de frames que lê, por ordem alfabética, as imagens de uma pasta (testes offline)."""
+
+    supports_keyframes_only = False
+    extensions = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.keyframes_only = False
+        self._files: List[str] = []
+
+    def open(self) -> bool:
+        if not os.path.isdir(self.path):
+            return False
+        names = sorted(name for name in os.listdir(self.path) if name.lower().endswith(self.extensions))
+        self._files = [os.path.join(self.path, name) for name in names]
+        self._files.reverse()
+        return bool(self._files)
+
+    def read(self) -> Optional[np.ndarray]:
+        while self._files:
+            frame = cv2.imread(self._files.pop())
+            if frame is not None:
+                return frame
+        return None
+
+    def close(self):
+        self._files = []
+
+
+class FFmpegSource:
+    """
+    Fonte de frames que lê vídeo bruto do stdout de um processo `ffmpeg`.
+
+    Ao contrário do `cv2.VideoCapture`, permite escolher o transporte RTSP (TCP/UDP), o timeout
+    do socket e as threads do descodificador, redimensionar na descodificação (`scale_width`,
+    mantendo a proporção), pedir frames em tons de cinzento (forma (h, w, 1)) e descodificar
+    apenas os keyframes (`-skip_frame nokey`), o que reduz o custo a uma fração do stream.
+
+    Cada frame é lido diretamente (sem cópia) para um array numpy novo. Os frames não são
+    reaproveitados porque o consumidor os pode passar a outras threads (agendador, gravação de
+    recortes) sem saber quando deixam de ser usados; a alocação custa pouco ao pé da descodificação.
+    """
+
+    supports_keyframes_only = True
+
+    def __init__(
+        self,
+        rtsp_url: str,
+        transport: str = "tcp",
+        timeout: float = 10.0,
+        decode_threads: int = 1,
+        scale_width: int = 0,
+        grayscale: bool = False,
+        keyframes_only: bool = False,
+        ffmpeg_path: str = "ffmpeg",
+        ffprobe_path: str = "ffprobe",
+    ):
+        self.rtsp_url = rtsp_url
+        self.transport = transport
+        self.timeout = timeout
+        self.decode_threads = decode_threads
+        self.scale_width = scale_width
+        self.grayscale = grayscale
+        self.keyframes_only = keyframes_only
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.logger = logging.getLogger(__name__)
+
+        self._proc: Optional[subprocess.Popen] = None
+        self._shape: Optional[Tuple[int, int, int]] = None
+
+    def _network_options(self) -> List[str]:
+        if not self.rtsp_url.startswith("rtsp"):
+            return []
+        # Timeout do socket em microssegundos
+        return ["-rtsp_transport", self.transport, "-timeout", str(int(self.timeout * 1_000_000))]
+
+    def _probe_size(self) -> Optional[Tuple[int, int]]:
+        command = [
+            self.ffprobe_path, "-v", "error", *self._network_options(),
+            "-select_streams", "v:0", "-show_entries", "stream=width,height", "-of", "csv=p=0:s=x",
+            self.rtsp_url,
+        ]
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout + 5, check=True).stdout
+            width, height = output.strip().splitlines()[0].split("x")[:2]
+            return int(width), int(height)
+        except (subprocess.SubprocessError, OSError, ValueError, IndexError) as e:
+            self.logger.error(f"ffprobe não conseguiu ler a resolução de {self.rtsp_url}: {e}")
+            return None
+
+    def _output_shape(self, width: int, height: int) -> Tuple[int, int, int]:
+        if self.scale_width and self.scale_width < width:
+            # Altura par, como exigido pela maioria dos filtros/formatos do ffmpeg
+            height = max(int(round(height * self.scale_width / width / 2)) * 2, 2)
+            width = self.scale_width
+        return height, width, 1 if self.grayscale else 3
+
+    def command(self) -> List[str]:
+        height, width, _ = self._shape
+        command = [self.ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostdin", *self._network_options()]
+        if self.decode_threads:
+            command += ["-threads", str(self.decode_threads)]
+        if self.keyframes_only:
+            # Opção do descodificador: os frames que não são keyframes nem chegam a ser descodificados
+            command += ["-skip_frame", "nokey"]
+        command += ["-i", self.rtsp_url, "-an", "-sn", "-dn", "-vf", f"scale={width}:{height}"]
+        command += ["-pix_fmt", "gray" if self.grayscale else "bgr24", "-fps_mode", "passthrough", "-f", "rawvideo", "pipe:1"]
+        return command
+
+    def open(self) -> bool:
+        size = self._probe_size()
+        if size is None:
+            return False
+        self._shape = self._output_shape(*size)
+        try:
+            # O stderr fica ligado ao do processo para os erros do ffmpeg aparecerem nos logs
+            self._proc = subprocess.Popen(self.command(), stdout=subprocess.PIPE, stdin=subprocess.DEVNULL)
+        except OSError as e:
+            self.logger.error(f"Não foi possível iniciar o ffmpeg para {self.rtsp_url}: {e}")
+            return False
+        return True
+
+    def read(self) -> Optional[np.ndarray]:
+        # Fonte fechada (ex.: reabertura falhada): o chamador trata como fim do stream
+        if self._proc is None:
+            return None
+        buffer = np.empty(self._shape, dtype=np.uint8)
+        view = memoryview(buffer.reshape(-1))
+        filled = 0
+        while filled < len(view):
+            n = self._proc.stdout.readinto(view[filled:])
+            if not n:
+                # Fim do stream ou o ffmpeg terminou (ligação perdida, timeout)
+                return None
+            filled += n
+        return buffer
+
+    def close(self):
+        if self._proc is None:
+            return
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc.stdout.close()
+        self._proc = None
+
+
+def create_frame_source(rtsp_url: str, backend: str = "opencv", **options):
+    """Cria a fonte de frames de uma câmera. As `options` só se aplicam ao backend "ffmpeg"."""
+    if backend == "ffmpeg":
+        return FFmpegSource(rtsp_url, **options)
+    if backend == "opencv":
+        return OpenCVSource(rtsp_url)
+    if backend == "images":
+        return ImageFolderSource(rtsp_url)
+    raise ValueError(f"Fonte de frames desconhecida: '{backend}'. Use 'opencv', 'ffmpeg' ou 'images'.")
@@ -0,0 +1,128 @@
+import logging
+import queue
+import time
+from concurrent.futures import Future
+from threading import Event, Thread
+from typing import Optional
+
+import numpy as np
+
+from detection import PlateDetector
+from metrics import DETECT_LATENCY, INFERENCE_BATCH_LATENCY, INFERENCE_BATCH_SIZE
+from roi import RegionOfInterest
+from tracing import TRACER
+
+
+class InferenceScheduler:
+    """
+    Agendador central de inferência.
+
+    As threads das câmeras submetem frames e recebem um Future com as detecções. Uma única
+    thread de trabalho junta os pedidos pendentes de todas as câmeras em lotes de até
+    `max_batch_size` frames (esperando no máximo `max_wait_ms` pelo lote encher) e corre o
+    detector uma vez por lote. Assim o modelo YOLO só é usado por uma thread.
+    """
+
+    def __init__(self, detector: PlateDetector, max_batch_size: int = 8, max_wait_ms: float = 20.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size deve ser >= 1.")
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._stop_event = Event()
+        self._worker = Thread(target=self._run, name="inference-scheduler", daemon=True)
+
+        # Contadores expostos para monitorização
+        self.batches_run = 0
+        self.frames_processed = 0
+        # Média móvel (EWMA) do tempo entre a submissão e o resultado de um frame, em segundos.
+        # Só muda quando sai um resultado: `last_result_at` diz se ainda é atual
+        self.latency = 0.0
+        self.last_result_at = time.monotonic()
+
+    def start(self):
+        self._worker.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._worker.join(timeout=5)
+        # Cancela os pedidos que ficaram por processar para não bloquear as câmeras
+        while True:
+            try:
+                _, _, future, _, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+
+    def submit(self, frame: np.ndarray, camera_id: int, roi: Optional[RegionOfInterest] = None) -> Future:
+        """
+        Agenda um frame para detecção e devolve um Future com a lista de detecções. Com `roi`,
+        só os veículos dentro da zona de deteção chegam ao recorte e ao OCR.
+        """
+        future: Future = Future()
+        self._queue.put((frame, camera_id, future, time.monotonic(), roi))
+        return future
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.frames_processed / self.batches_run if self.batches_run else 0.0
+
+    def _collect_batch(self) -> list:
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            # Ignora pedidos cujo chamador já desistiu
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            frames = [frame for frame, _, _, _, _ in batch]
+            camera_ids = [camera_id for _, camera_id, _, _, _ in batch]
+            rois = [roi for _, _, _, _, roi in batch]
+            start = time.perf_counter()
+            try:
+                with TRACER.span("detect", frames=len(batch), cameras=sorted(set(camera_ids))):
+                    results = self.detector.detect_and_recognize_batch(frames, camera_ids, rois)
+            except Exception as e:
+                self.logger.error(f"Erro na inferência do lote de {len(batch)} frames: {e}")
+                for _, _, future, _, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.frames_processed += len(batch)
+            INFERENCE_BATCH_LATENCY.observe(time.perf_counter() - start)
+            INFERENCE_BATCH_SIZE.observe(len(batch))
+            now = time.monotonic()
+            self.last_result_at = now
+            for (_, camera_id, future, submitted_at, _), detections in zip(batch, results):
+                future.set_result(detections)
+                self.latency += 0.1 * ((now - submitted_at) - self.latency)
+                DETECT_LATENCY.labels(camera_id=str(camera_id)).observe(now - submitted_at)
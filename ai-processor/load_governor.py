@@ -0,0 +1,191 @@
+import logging
+import time
+from threading import Event, Lock, Thread
+from typing import Dict, Optional
+
+from inference_scheduler import InferenceScheduler
+
+
+class LoadGovernor:
+    """
+    Controla quantos frames por segundo cada câmera pode enviar ao detector partilhado.
+
+    A cada `interval` segundos compara a fila e a latência do agendador com os alvos. Em
+    sobrecarga reduz o orçamento total de frames/s (decréscimo multiplicativo, a partir do
+    débito medido do detector); com folga volta a aumentá-lo aos poucos (acréscimo
+    multiplicativo) e só remove o limite quando o orçamento chega a `release_ratio` vezes o
+    débito que o detector tinha ao entrar em sobrecarga. Uma quebra momentânea do débito não
+    levanta o limite de uma vez. O orçamento é repartido pelas câmeras em proporção
+    do seu 'priority_weight', garantindo sempre `min_fps` a cada uma: ao adicionar câmeras
+    todas abrandam de forma ordenada em vez de se atrasarem em conjunto.
+
+    As câmeras perguntam `should_process` por cada frame lido; os frames fora do passo
+    atribuído são ignorados antes do filtro de movimento e do detector.
+    """
+
+    def __init__(
+        self,
+        scheduler: InferenceScheduler,
+        min_fps: float = 2.0,
+        max_fps: float = 0.0,
+        target_queue_depth: int = 0,
+        target_latency_ms: float = 500.0,
+        interval: float = 1.0,
+        decrease: float = 0.8,
+        increase: float = 1.1,
+        release_ratio: float = 2.0,
+    ):
+        """
+        Args:
+            min_fps: Mínimo garantido a cada câmera, mesmo em sobrecarga.
+            max_fps: Máximo por câmera mesmo sem sobrecarga (0 = sem limite).
+            target_queue_depth: Frames em espera no agendador a partir dos quais há sobrecarga
+                (0 = o tamanho máximo de um lote do agendador).
+            target_latency_ms: Latência média (submissão -> resultado) a partir da qual há
+                sobrecarga.
+            release_ratio: Múltiplo do débito medido ao entrar em sobrecarga que o orçamento
+                tem de atingir, a crescer aos poucos, para o limite ser removido.
+        """
+        self.scheduler = scheduler
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.target_queue_depth = target_queue_depth or scheduler.max_batch_size
+        self.target_latency = target_latency_ms / 1000
+        self.interval = interval
+        self.decrease = decrease
+        self.increase = increase
+        self.release_ratio = release_ratio
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = Lock()
+        self._cameras: Dict[int, dict] = {}
+        self._intervals: Dict[int, float] = {}
+        self._last_processed: Dict[int, float] = {}
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run, name="load-governor", daemon=True)
+        # Orçamento total em frames/s; None = sem limite
+        self.budget: Optional[float] = None
+        # Orçamento a partir do qual o limite é removido, fixado ao entrar em sobrecarga
+        self._release_budget = 0.0
+        self._last_frames = 0
+        self._last_tick = time.monotonic()
+
+        # Contadores expostos para monitorização
+        self.frames_skipped = 0
+        self.overloaded_intervals = 0
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+
+    def register(self, camera_info: dict):
+        """Regista uma câmera. O dicionário é lido a cada ajuste, por isso as alterações de
+        'priority_weight' feitas em tempo real são seguidas."""
+        with self._lock:
+            self._cameras[camera_info.get("id")] = camera_info
+            self._allocate()
+
+    def unregister(self, camera_id: int):
+        with self._lock:
+            self._cameras.pop(camera_id, None)
+            self._intervals.pop(camera_id, None)
+            self._last_processed.pop(camera_id, None)
+            self._allocate()
+
+    def should_process(self, camera_id: int, now: Optional[float] = None) -> bool:
+        """Devolve True se o frame desta câmera deve seguir para o detector."""
+        now = time.monotonic() if now is None else now
+        interval = self._intervals.get(camera_id, 0.0)
+        last = self._last_processed.get(camera_id)
+        if interval and last is not None and now - last < interval:
+            self.frames_skipped += 1
+            return False
+        self._last_processed[camera_id] = now
+        return True
+
+    def camera_fps(self, camera_id: int) -> float:
+        """Frames/s atribuídos a uma câmera (0 = sem limite)."""
+        interval = self._intervals.get(camera_id, 0.0)
+        return 1 / interval if interval else 0.0
+
+    def _weight(self, camera_info: dict) -> float:
+        weight = camera_info.get("priority_weight") or 1.0
+        return max(float(weight), 0.0)
+
+    def _allocate(self):
+        """Reparte o orçamento: `min_fps` a cada câmera e o resto em proporção do peso."""
+        if not self._cameras:
+            return
+        if self.budget is None:
+            fps = {camera_id: self.max_fps for camera_id in self._cameras}
+        else:
+            spare = max(self.budget - self.min_fps * len(self._cameras), 0.0)
+            weights = {camera_id: self._weight(info) for camera_id, info in self._cameras.items()}
+            total = sum(weights.values()) or 1.0
+            fps = {}
+            for camera_id, weight in weights.items():
+                fps[camera_id] = self.min_fps + spare * weight / total
+                if self.max_fps:
+                    fps[camera_id] = min(fps[camera_id], self.max_fps)
+        self._intervals = {camera_id: 1 / value if value else 0.0 for camera_id, value in fps.items()}
+
+    def _adjust(self):
+        now = time.monotonic()
+        elapsed = max(now - self._last_tick, 1e-6)
+        frames = self.scheduler.frames_processed
+        throughput = (frames - self._last_frames) / elapsed
+        self._last_tick, self._last_frames = now, frames
+
+        latency = self.scheduler.latency
+        if now - self.scheduler.last_result_at > elapsed:
+            # A EWMA só muda quando saem resultados e está desatualizada: sem frames em espera
+            # as câmeras estão paradas; com frames em espera o detector está preso, há pelo
+            # menos este tempo
+            latency = now - self.scheduler.last_result_at if self.scheduler.queue_depth else 0.0
+        overloaded = (
+            self.scheduler.queue_depth > self.target_queue_depth
+            or latency > self.target_latency
+        )
+        previous = self.budget
+        if overloaded:
+            self.overloaded_intervals += 1
+            if self.budget is None:
+                self._release_budget = max(throughput, self.min_fps * len(self._cameras)) * self.release_ratio
+            # Nunca acima do que o detector conseguiu de facto processar
+            reference = throughput if self.budget is None else min(self.budget, throughput)
+            self.budget = max(reference * self.decrease, self.min_fps * len(self._cameras))
+        elif self.budget is not None:
+            self.budget *= self.increase
+            if self.budget >= self._release_budget:
+                # O orçamento já ficou muito acima do que o detector aguentava: não é preciso limite
+                self.budget = None
+
+        with self._lock:
+            self._allocate()
+        if (previous is None) != (self.budget is None):
+            if self.budget is None:
+                self.logger.info("Carga normalizada: limite de frames por câmera removido.")
+            else:
+                self.logger.warning(
+                    f"Detector sobrecarregado (fila={self.scheduler.queue_depth}, "
+                    f"latência={latency * 1000:.0f} ms): "
+                    f"a limitar as câmeras a {self.budget:.1f} frames/s no total."
+                )
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._adjust()
+            except Exception as e:
+                self.logger.error(f"Erro ao ajustar a carga das câmeras: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "budget_fps": round(self.budget, 1) if self.budget is not None else None,
+            "frames_skipped": self.frames_skipped,
+            "overloaded_intervals": self.overloaded_intervals,
+            "camera_fps": {camera_id: round(self.camera_fps(camera_id), 2) for camera_id in self._cameras},
+        }
@@ -1,62 +1,237 @@
 import logging
+import signal
 import time
-from threading import Thread
-import cv2
+from functools import partial
+from threading import Event, Thread
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+import config
 from api_client import APIClient
+from camera_commands import CameraCommandConsumer
+from camera_manager import CameraManager
+from camera_shards import CameraShardPool
+from capture_store import CaptureStore
+from capture_writer import CaptureWriter
+from dedup import SightingDeduplicator
 from detection import PlateDetector
+from frame_grabber import FrameGrabber
+from frame_source import create_frame_source
+from inference_scheduler import InferenceScheduler
+from load_governor import LoadGovernor
+from metrics import FRAMES_SKIPPED, PipelineCollector, start_metrics_server
+from motion_gate import MotionGate, parse_region
+from outbox import SightingOutbox
+from plate_localizer import PlateLocalizer
+from roi import RegionOfInterest, build_roi
+from sighting_publisher import SightingPublisher
+from tracker import Track, VehicleTracker
+from tracing import TRACER, start_trace_server
 
-API_BASE_URL = "http://gt-vision-backend:8000"
+STATS_LOG_INTERVAL = 60
 
-def process_camera_stream(camera_info: dict, detector: PlateDetector, api_client: APIClient):
+def build_grabber_options() -> dict:
+    """Opções dos `FrameGrabber` (fonte de frames e passagem a keyframes em sobrecarga)."""
+    if config.FRAME_SOURCE == "ffmpeg":
+        source_factory = partial(
+            create_frame_source,
+            backend="ffmpeg",
+            transport=config.FFMPEG_RTSP_TRANSPORT,
+            timeout=config.FFMPEG_TIMEOUT_SECONDS,
+            decode_threads=config.FFMPEG_DECODE_THREADS,
+            scale_width=config.FRAME_SCALE_WIDTH,
+            grayscale=config.FRAME_GRAYSCALE,
+            keyframes_only=config.FRAME_KEYFRAMES_ONLY,
+        )
+    else:
+        source_factory = partial(create_frame_source, backend=config.FRAME_SOURCE)
+    return {
+        "source_factory": source_factory,
+        "overload_drop_ratio": config.OVERLOAD_DROP_RATIO,
+        "overload_window": config.OVERLOAD_WINDOW_SECONDS,
+        "overload_hold": config.OVERLOAD_KEYFRAME_HOLD_SECONDS,
+    }
+
+def build_motion_gate(camera_info: dict, roi: RegionOfInterest = None):
+    if not config.MOTION_GATE_ENABLED:
+        return None
+    # Sem região própria, o movimento é procurado na zona de deteção da câmera
+    region = camera_info.get("motion_region") or (roi.bounds if roi else None) or parse_region(config.MOTION_REGION)
+    sensitivity = camera_info.get("motion_sensitivity", config.MOTION_SENSITIVITY)
+    return MotionGate(sensitivity=sensitivity, region=region)
+
+def log_camera_stats(camera_name: str, grabber, motion_gate, fps_limit: float = 0.0):
+    skipped = motion_gate.frames_skipped if motion_gate else 0
+    limit = f", limitada a {fps_limit:.1f} frames/s" if fps_limit else ""
+    logging.info(
+        f"Câmera {camera_name}: {grabber.frames_decoded} frames descodificados, "
+        f"{grabber.frames_dropped} descartados, {skipped} ignorados sem movimento{limit}."
+    )
+
+def emit_sighting(track: Track, camera_info: dict, api_client: APIClient, deduplicator: SightingDeduplicator, capture_writer: CaptureWriter):
+    camera_id = camera_info.get("id")
+    camera_name = camera_info.get("name", f"Câmera {camera_id}")
+    plate_text = track.plate
+    # A mesma placa lida há pouco por esta câmera não volta a ser gravada nem enviada
+    if deduplicator and not deduplicator.should_send(camera_id, plate_text):
+        return
+    logging.info(
+        f"Placa detectada pela câmera {camera_name}: {plate_text} "
+        f"(track {track.track_id}, {track.fusion.reads} leituras, confiança {track.confidence:.2f}, "
+        f"latência {time.time() - track.first_seen:.2f}s)"
+    )
+    # A imagem é codificada e gravada fora desta thread; o envio parte com os bytes já em memória
+    capture_writer.submit(
+        camera_id,
+        plate_text,
+        track.best_crop,
+        lambda image_path, image_bytes: api_client.send_sighting_to_api(
+            plate=plate_text,
+            image_filename=image_path,
+            camera_id=camera_id,
+            image_bytes=image_bytes,
+            captured_at=track.first_seen,
+        ),
+    )
+
+def process_camera_stream(camera_info: dict, scheduler: InferenceScheduler, api_client: APIClient, grabber=None, deduplicator=None, capture_writer=None, governor: LoadGovernor = None):
     rtsp_url = camera_info.get("rtsp_url")
     camera_id = camera_info.get("id")
     camera_name = camera_info.get("name", f"Câmera {camera_id}")
     
     logging.info(f"Iniciando processamento para a câmera: {camera_name} ({rtsp_url})")
+    detector = scheduler.detector
     
-    cap = cv2.VideoCapture(rtsp_url)
-    if not cap.isOpened():
-        logging.error(f"Não foi possível abrir o stream de vídeo para a câmera {camera_name}.")
-        return
+    # A descodificação corre numa thread própria que guarda só o frame mais recente,
+    # para que a latência não cresça quando a inferência é mais lenta que a câmera.
+    # Em modo multi-processo o leitor de memória partilhada já vem criado.
+    if grabber is None:
+        grabber = FrameGrabber(rtsp_url, camera_name, **build_grabber_options())
+    grabber.start()
+    roi_polygon = camera_info.get("roi_polygon")
+    roi = build_roi(camera_info)
+    motion_gate = build_motion_gate(camera_info, roi)
+    # Um avistamento por veículo, e não um por frame em que o veículo aparece
+    tracker = VehicleTracker(
+        max_age=config.TRACK_MAX_AGE_SECONDS,
+        stable_reads=config.TRACK_STABLE_READS,
+        stable_confidence=config.TRACK_STABLE_CONFIDENCE,
+        pad_char=detector.pad_char,
+    )
+    last_stats_log = time.monotonic()
+    if governor:
+        governor.register(camera_info)
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
-            logging.warning(f"Stream da câmera {camera_name} terminou. Tentando reconectar em 10 segundos.")
-            cap.release()
-            time.sleep(10)
-            cap = cv2.VideoCapture(rtsp_url)
-            if not cap.isOpened():
-                logging.error(f"Falha ao reconectar à câmera {camera_name}. Encerrando thread.")
+        item = grabber.read(timeout=1.0)
+        if item is None:
+            if grabber.stopped:
                 break
             continue
+        frame, captured_at = item
+
+        # A zona de deteção pode ser alterada em tempo real (comando 'update' do backend)
+        if camera_info.get("roi_polygon") != roi_polygon:
+            roi_polygon = camera_info.get("roi_polygon")
+            roi = build_roi(camera_info)
+            motion_gate = build_motion_gate(camera_info, roi)
+            logging.info(f"Zona de deteção da câmera {camera_name} atualizada.")
+
+        if time.monotonic() - last_stats_log >= STATS_LOG_INTERVAL:
+            last_stats_log = time.monotonic()
+            log_camera_stats(camera_name, grabber, motion_gate, governor.camera_fps(camera_id) if governor else 0.0)
+
+        # Em sobrecarga cada câmera só envia ao detector os frames/s que lhe foram atribuídos
+        if governor and not governor.should_process(camera_id):
+            FRAMES_SKIPPED.labels(camera_id=str(camera_id), reason="governor").inc()
+            continue
+
+        with TRACER.span("frame", camera=camera_id):
+            # Cena estática: não vale a pena ocupar o detector com este frame, mas os
+            # veículos que já saíram de cena têm de expirar
+            with TRACER.span("motion"):
+                static = motion_gate is not None and not motion_gate.has_motion(frame)
+            if static:
+                FRAMES_SKIPPED.labels(camera_id=str(camera_id), reason="motion").inc()
+                for track in tracker.update([], captured_at):
+                    emit_sighting(track, camera_info, api_client, deduplicator, capture_writer)
+                continue
 
-        try:
-            detections = detector.detect_and_recognize(frame, camera_id)
-            for detection in detections:
-                plate_text = detection.get("plate")
-                image_path = detection.get("image_path")
-                if plate_text and image_path:
-                    logging.info(f"Placa detectada pela câmera {camera_name}: {plate_text}")
-                    api_client.send_sighting_to_api(
-                        plate=plate_text,
-                        image_filename=image_path,
-                        camera_id=camera_id
-                    )
-        except Exception as e:
-            logging.error(f"Erro durante o processamento do frame da câmera {camera_name}: {e}")
-
-    cap.release()
+            try:
+                # O detector é partilhado: o frame entra no próximo lote do agendador, que só
+                # passa a zona de deteção ao modelo e descarta os veículos de fora antes do OCR
+                with TRACER.span("detect.wait"):
+                    detections = scheduler.submit(frame, camera_id, roi).result()
+                with TRACER.span("track"):
+                    finished_tracks = tracker.update(detections, captured_at)
+            except Exception as e:
+                logging.error(f"Erro durante o processamento do frame da câmera {camera_name}: {e}")
+                continue
+
+            for track in finished_tracks:
+                emit_sighting(track, camera_info, api_client, deduplicator, capture_writer)
+
+    for track in tracker.flush():
+        emit_sighting(track, camera_info, api_client, deduplicator, capture_writer)
+    if governor:
+        governor.unregister(camera_id)
+    grabber.stop()
     logging.info(f"Processamento para a câmera {camera_name} encerrado.")
 
 def main():
     logging.info("Iniciando o serviço AI-Processor...")
-    
-    api_client = APIClient(base_url=API_BASE_URL)
-    plate_detector = PlateDetector(model_path="yolov8n.pt")
+    TRACER.configure(
+        sample_rate=config.TRACE_SAMPLE_RATE,
+        max_events=config.TRACE_MAX_EVENTS,
+        output_dir=config.TRACE_DIR,
+    )
+
+    outbox = SightingOutbox(config.OUTBOX_PATH) if config.OUTBOX_PATH else None
+    if outbox and outbox.backlog:
+        logging.info(f"Outbox com {outbox.backlog} avistamentos pendentes de execuções anteriores.")
+    publisher = None
+    if config.SIGHTINGS_TRANSPORT == "amqp":
+        publisher = SightingPublisher(
+            host=config.RABBITMQ_HOST,
+            username=config.RABBITMQ_DEFAULT_USER,
+            password=config.RABBITMQ_DEFAULT_PASS,
+        )
+    api_client = APIClient(
+        base_url=config.API_BASE_URL,
+        pool_size=config.API_POOL_SIZE,
+        timeout=config.API_TIMEOUT_SECONDS,
+        max_retries=config.API_MAX_RETRIES,
+        backoff_base=config.API_BACKOFF_SECONDS,
+        upload_workers=config.UPLOAD_WORKERS,
+        upload_queue_size=config.UPLOAD_QUEUE_SIZE,
+        batch_max_size=config.UPLOAD_BATCH_SIZE,
+        batch_max_wait=config.UPLOAD_BATCH_WAIT_SECONDS,
+        outbox=outbox,
+        replay_concurrency=config.OUTBOX_REPLAY_CONCURRENCY,
+        replay_interval=config.OUTBOX_REPLAY_INTERVAL_SECONDS,
+        publisher=publisher,
+    )
+    plate_localizer = None
+    if config.PLATE_LOCALIZER_MODEL:
+        plate_localizer = PlateLocalizer(
+            config.PLATE_LOCALIZER_MODEL,
+            conf_threshold=config.PLATE_LOCALIZER_CONF,
+            max_batch_size=config.PLATE_LOCALIZER_BATCH_SIZE,
+        )
+        logging.info(f"Localizador de placas ativo: {config.PLATE_LOCALIZER_MODEL}")
+    plate_detector = PlateDetector(
+        model_path=config.DETECTOR_MODEL,
+        ocr_max_batch_size=config.OCR_MAX_BATCH_SIZE,
+        plate_localizer=plate_localizer,
+        backend=config.DETECTOR_BACKEND,
+        intra_op_threads=config.DETECTOR_INTRA_OP_THREADS,
+        inter_op_threads=config.DETECTOR_INTER_OP_THREADS,
+    )
+    scheduler = InferenceScheduler(
+        plate_detector,
+        max_batch_size=config.DETECTOR_MAX_BATCH_SIZE,
+        max_wait_ms=config.DETECTOR_MAX_WAIT_MS,
+    )
 
     while not api_client.check_api_health():
         logging.info("Aguardando a API do backend... tentando novamente em 5 segundos.")
@@ -67,20 +242,127 @@ def main():
     cameras = api_client.get_cameras_from_api()
 
     if not cameras:
-        logging.warning("Nenhuma câmera encontrada para processar. O serviço vai terminar.")
-        return
+        logging.warning("Nenhuma câmera encontrada para processar. A aguardar comandos de novas câmeras.")
 
-    threads = []
+    active_cameras = []
     for camera in cameras:
         if camera.get("is_active"):
-            thread = Thread(target=process_camera_stream, args=(camera, plate_detector, api_client))
-            threads.append(thread)
-            thread.start()
+            active_cameras.append(camera)
         else:
             logging.info(f"Câmera '{camera.get('name')}' está inativa e não será processada.")
 
-    for thread in threads:
-        thread.join()
+    # Com DECODE_WORKERS > 0 a descodificação é repartida por vários processos e os frames
+    # chegam a este processo por memória partilhada
+    grabber_options = build_grabber_options()
+    shard_pool = None
+    readers = {}
+    if config.DECODE_WORKERS > 0 and active_cameras:
+        shard_pool = CameraShardPool(
+            active_cameras,
+            workers=config.DECODE_WORKERS,
+            slots=config.SHM_RING_SLOTS,
+            max_shape=(config.SHM_MAX_FRAME_HEIGHT, config.SHM_MAX_FRAME_WIDTH, 3),
+            grabber_options=grabber_options,
+        )
+        readers = shard_pool.start()
+
+    deduplicator = SightingDeduplicator(
+        ttl_seconds=config.DEDUP_TTL_SECONDS,
+        max_entries=config.DEDUP_MAX_ENTRIES,
+    )
+    capture_store = CaptureStore(
+        config.CAPTURES_DIR,
+        max_bytes=config.CAPTURE_STORE_MAX_BYTES,
+        max_age_seconds=config.CAPTURE_STORE_MAX_AGE_HOURS * 3600,
+        evict_interval=config.CAPTURE_STORE_EVICT_INTERVAL_SECONDS,
+    )
+    capture_writer = CaptureWriter(
+        capture_store,
+        workers=config.CAPTURE_WRITER_WORKERS,
+        queue_size=config.CAPTURE_WRITER_QUEUE_SIZE,
+        jpeg_quality=config.CAPTURE_JPEG_QUALITY,
+        submit_timeout=config.CAPTURE_WRITER_SUBMIT_TIMEOUT_MS / 1000,
+    )
+
+    scheduler.start()
+    governor = None
+    if config.LOAD_GOVERNOR_ENABLED:
+        governor = LoadGovernor(
+            scheduler,
+            min_fps=config.GOVERNOR_MIN_FPS,
+            max_fps=config.GOVERNOR_MAX_FPS,
+            target_queue_depth=config.GOVERNOR_TARGET_QUEUE_DEPTH,
+            target_latency_ms=config.GOVERNOR_TARGET_LATENCY_MS,
+        )
+        governor.start()
+    # Os pipelines são geridos em tempo real: o backend publica 'start', 'stop' e 'update'
+    # em camera_processing_queue quando uma câmera muda
+    manager = CameraManager(
+        partial(
+            process_camera_stream,
+            scheduler=scheduler,
+            api_client=api_client,
+            deduplicator=deduplicator,
+            capture_writer=capture_writer,
+            governor=governor,
+        ),
+        readers=readers,
+        grabber_options=grabber_options,
+    )
+    for camera in active_cameras:
+        manager.start_camera(camera)
+    command_consumer = CameraCommandConsumer(
+        host=config.RABBITMQ_HOST,
+        username=config.RABBITMQ_DEFAULT_USER,
+        password=config.RABBITMQ_DEFAULT_PASS,
+        manager=manager,
+    )
+    command_consumer.start()
+    if config.METRICS_PORT:
+        start_metrics_server(
+            config.METRICS_PORT,
+            PipelineCollector(
+                manager=manager,
+                scheduler=scheduler,
+                api_client=api_client,
+                capture_writer=capture_writer,
+                capture_store=capture_store,
+                governor=governor,
+            ),
+        )
+
+    # Perfil por etapas a pedido: SIGUSR1 liga e desliga a captura; também por HTTP
+    # (/trace?seconds=N) quando TRACE_PORT está definido
+    signal.signal(
+        signal.SIGUSR1,
+        lambda *_: Thread(target=TRACER.toggle, args=(config.TRACE_DURATION_SECONDS,), daemon=True).start(),
+    )
+    if config.TRACE_PORT:
+        start_trace_server(config.TRACE_PORT)
+
+    shutdown = Event()
+    signal.signal(signal.SIGTERM, lambda *_: shutdown.set())
+    signal.signal(signal.SIGINT, lambda *_: shutdown.set())
+    shutdown.wait()
+
+    logging.info("A encerrar o serviço AI-Processor...")
+    command_consumer.stop()
+    manager.stop_all()
+    if governor:
+        governor.stop()
+        logging.info(f"Frames ignorados pelo controlo de carga: {governor.frames_skipped}.")
+    scheduler.stop()
+    capture_writer.close()
+    capture_store.close()
+
+    logging.info(f"Avistamentos duplicados suprimidos: {deduplicator.suppressed}.")
+    outbox_stats = api_client.outbox_stats()
+    if outbox_stats:
+        logging.info(f"Outbox: {outbox_stats['pending']} avistamentos pendentes, {outbox_stats['replayed']} reenviados.")
+    api_client.close()
+
+    if shard_pool:
+        shard_pool.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
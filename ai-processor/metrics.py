@@ -0,0 +1,172 @@
+import logging
+
+from prometheus_client import REGISTRY, Counter, Histogram, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+# Latências de frames e lotes: de 5 ms a 10 s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+# Métricas observadas no momento em que o evento acontece (nos módulos do pipeline)
+DETECT_LATENCY = Histogram(
+    "aiprocessor_detect_latency_seconds",
+    "Tempo entre a submissão de um frame ao agendador e o resultado (fila + deteção + OCR).",
+    ["camera_id"],
+    buckets=LATENCY_BUCKETS,
+)
+INFERENCE_BATCH_LATENCY = Histogram(
+    "aiprocessor_inference_batch_seconds",
+    "Duração de um lote do agendador de inferência.",
+    buckets=LATENCY_BUCKETS,
+)
+INFERENCE_BATCH_SIZE = Histogram(
+    "aiprocessor_inference_batch_size",
+    "Frames por lote do agendador de inferência.",
+    buckets=BATCH_SIZE_BUCKETS,
+)
+# Os lotes do OCR e do envio juntam várias câmeras, por isso a sua latência não tem camera_id:
+# atribuí-la a uma câmera seria arbitrário. A parte de cada câmera no custo do OCR vê-se em
+# aiprocessor_ocr_plates; a latência de ponta a ponta por câmera em aiprocessor_detect_latency_seconds
+OCR_LATENCY = Histogram(
+    "aiprocessor_ocr_latency_seconds",
+    "Tempo do OCR de todas as placas de um lote de frames (várias câmeras, sem camera_id).",
+    buckets=LATENCY_BUCKETS,
+)
+OCR_PLATES = Counter(
+    "aiprocessor_ocr_plates",
+    "Placas enviadas ao OCR, por câmera.",
+    ["camera_id"],
+)
+ENCODE_LATENCY = Histogram(
+    "aiprocessor_capture_encode_seconds",
+    "Tempo de codificação JPEG de uma imagem de avistamento.",
+    ["camera_id"],
+    buckets=LATENCY_BUCKETS,
+)
+UPLOAD_LATENCY = Histogram(
+    "aiprocessor_upload_batch_seconds",
+    "Tempo de envio de um lote de avistamentos ao backend (várias câmeras, sem camera_id).",
+    ["transport"],
+    buckets=LATENCY_BUCKETS,
+)
+FRAMES_SKIPPED = Counter(
+    "aiprocessor_frames_skipped",
+    "Frames lidos que não foram ao detector, por motivo (motion, governor).",
+    ["camera_id", "reason"],
+)
+
+
+class PipelineCollector:
+    """
+    Exporta, no momento de cada scrape, os contadores que os componentes já mantêm
+    (leitores de frames, agendador, cliente da API, gravação de imagens, controlo de carga).
+    Assim o caminho dos frames não paga nada por estas métricas.
+    """
+
+    def __init__(self, manager=None, scheduler=None, api_client=None, capture_writer=None, capture_store=None, governor=None):
+        self.manager = manager
+        self.scheduler = scheduler
+        self.api_client = api_client
+        self.capture_writer = capture_writer
+        self.capture_store = capture_store
+        self.governor = governor
+
+    def describe(self):
+        # Sem descrição prévia, o registo não corre `collect` antes de os componentes arrancarem
+        return []
+
+    def _camera_metrics(self):
+        decoded = CounterMetricFamily("aiprocessor_frames_decoded", "Frames descodificados por câmera.", labels=["camera_id"])
+        dropped = CounterMetricFamily(
+            "aiprocessor_frames_dropped", "Frames descodificados que ninguém chegou a processar.", labels=["camera_id"]
+        )
+        reconnects = CounterMetricFamily("aiprocessor_stream_reconnects", "Reconexões ao stream da câmera.", labels=["camera_id"])
+        switches = CounterMetricFamily(
+            "aiprocessor_keyframe_switches", "Passagens a descodificação só de keyframes por sobrecarga.", labels=["camera_id"]
+        )
+        fps_limit = GaugeMetricFamily(
+            "aiprocessor_camera_fps_limit", "Frames/s atribuídos pelo controlo de carga (0 = sem limite).", labels=["camera_id"]
+        )
+        for camera_id, grabber in self.manager.grabbers.items():
+            labels = [str(camera_id)]
+            decoded.add_metric(labels, grabber.frames_decoded)
+            dropped.add_metric(labels, grabber.frames_dropped)
+            reconnects.add_metric(labels, grabber.reconnects)
+            switches.add_metric(labels, grabber.keyframe_switches)
+            if self.governor:
+                fps_limit.add_metric(labels, self.governor.camera_fps(camera_id))
+        yield from (decoded, dropped, reconnects, switches)
+        if self.governor:
+            yield fps_limit
+
+    def _scheduler_metrics(self):
+        yield GaugeMetricFamily("aiprocessor_inference_queue_depth", "Frames à espera do detector.", value=self.scheduler.queue_depth)
+        # Contagem de chamadas ao modelo de OCR por tamanho de lote, acumulada pelo detector
+        sizes = dict(self.scheduler.detector.ocr_batch_sizes)
+        buckets = [(str(bound), sum(count for size, count in sizes.items() if size <= bound)) for bound in BATCH_SIZE_BUCKETS]
+        yield HistogramMetricFamily(
+            "aiprocessor_ocr_batch_size",
+            "Placas por chamada ao modelo de OCR.",
+            buckets=buckets + [("+Inf", sum(sizes.values()))],
+            sum_value=sum(size * count for size, count in sizes.items()),
+        )
+        if self.governor:
+            yield GaugeMetricFamily(
+                "aiprocessor_governor_budget_fps",
+                "Orçamento total de frames/s do controlo de carga (0 = sem limite).",
+                value=self.governor.budget or 0.0,
+            )
+
+    def _upload_metrics(self):
+        api = self.api_client
+        sightings = CounterMetricFamily("aiprocessor_sightings", "Avistamentos por resultado do envio.", labels=["result"])
+        for result, value in (
+            ("sent", api.sightings_sent),
+            ("failed", api.sightings_failed),
+            ("rejected", api.sightings_rejected),
+            ("deferred", api.sightings_deferred),
+        ):
+            sightings.add_metric([result], value)
+        yield sightings
+        yield GaugeMetricFamily("aiprocessor_upload_queue_depth", "Avistamentos à espera de envio.", value=api.pending_uploads)
+        outbox = api.outbox_stats()
+        if outbox:
+            yield GaugeMetricFamily("aiprocessor_outbox_pending", "Avistamentos na outbox.", value=outbox["pending"])
+            yield GaugeMetricFamily("aiprocessor_outbox_pending_bytes", "Bytes de imagens na outbox.", value=outbox["pending_bytes"])
+            yield GaugeMetricFamily(
+                "aiprocessor_outbox_oldest_age_seconds", "Idade do avistamento mais antigo na outbox.", value=outbox["oldest_age_seconds"]
+            )
+
+    def _capture_metrics(self):
+        writer = self.capture_writer
+        yield GaugeMetricFamily("aiprocessor_capture_queue_depth", "Imagens à espera de codificação.", value=writer.pending)
+        captures = CounterMetricFamily("aiprocessor_captures", "Imagens de avistamentos por resultado.", labels=["result"])
+        captures.add_metric(["written"], writer.captures_written)
+        captures.add_metric(["dropped"], writer.captures_dropped)
+        yield captures
+        if self.capture_store:
+            stats = self.capture_store.stats()
+            yield GaugeMetricFamily("aiprocessor_capture_store_bytes", "Bytes ocupados pelas imagens.", value=stats["total_bytes"])
+            yield GaugeMetricFamily("aiprocessor_capture_store_files", "Imagens guardadas.", value=stats["files"])
+
+    def collect(self):
+        for enabled, metrics in (
+            (self.manager, self._camera_metrics),
+            (self.scheduler, self._scheduler_metrics),
+            (self.api_client, self._upload_metrics),
+            (self.capture_writer, self._capture_metrics),
+        ):
+            if not enabled:
+                continue
+            try:
+                yield from metrics()
+            except Exception as e:
+                # Um componente a meio de arrancar ou parar não pode estragar o scrape inteiro
+                logging.getLogger(__name__).warning(f"Métricas de {metrics.__name__} indisponíveis: {e}")
+
+
+def start_metrics_server(port: int, collector: PipelineCollector):
+    """Regista o coletor e serve /metrics numa thread do próprio prometheus_client."""
+    REGISTRY.register(collector)
+    start_http_server(port)
+    logging.getLogger(__name__).info(f"Métricas Prometheus disponíveis em :{port}/metrics.")
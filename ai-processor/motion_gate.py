@@ -0,0 +1,82 @@
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Filtro de movimento barato, por câmera, aplicado antes do detector.
+
+    Cada frame é reduzido para tons de cinza numa resolução pequena e comparado com um fundo
+    que se vai adaptando lentamente (média móvel). Se a fração de pixels alterados dentro da
+    região configurada ficar abaixo de `sensitivity`, o frame é considerado estático e o
+    detector não precisa de correr.
+    """
+
+    def __init__(
+        self,
+        sensitivity: float = 0.01,
+        region: Optional[Sequence[float]] = None,
+        downscale_width: int = 160,
+        pixel_threshold: int = 25,
+        learning_rate: float = 0.05,
+    ):
+        """
+        Args:
+            sensitivity: Fração mínima (0-1) de pixels alterados para considerar que há movimento.
+            region: Retângulo (x1, y1, x2, y2) em coordenadas normalizadas (0-1) onde se procura
+                movimento. Por omissão usa o frame inteiro.
+            downscale_width: Largura, em pixels, da imagem usada na comparação.
+            pixel_threshold: Diferença mínima de intensidade (0-255) para um pixel contar como alterado.
+            learning_rate: Velocidade com que o fundo absorve as mudanças da cena.
+        """
+        self.sensitivity = sensitivity
+        self.region = tuple(region) if region else (0.0, 0.0, 1.0, 1.0)
+        self.downscale_width = downscale_width
+        self.pixel_threshold = pixel_threshold
+        self.learning_rate = learning_rate
+        self._background: Optional[np.ndarray] = None
+
+        # Contadores expostos para monitorização
+        self.frames_checked = 0
+        self.frames_skipped = 0
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = self.region
+        roi = frame[int(y1 * h):int(y2 * h), int(x1 * w):int(x2 * w)]
+        if roi.ndim == 3 and roi.shape[2] == 3:
+            roi = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        roi_h, roi_w = roi.shape[:2]
+        scale = min(1.0, self.downscale_width / max(roi_w, 1))
+        small = cv2.resize(roi, (max(int(roi_w * scale), 1), max(int(roi_h * scale), 1)), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def has_motion(self, frame: np.ndarray) -> bool:
+        """Devolve True se o frame deve seguir para o detector."""
+        self.frames_checked += 1
+        gray = self._prepare(frame)
+
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray.astype(np.float32)
+            return True
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        changed = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+
+        if changed < self.sensitivity:
+            self.frames_skipped += 1
+            return False
+        return True
+
+
+def parse_region(value: Optional[str]) -> Optional[tuple]:
+    """Converte 'x1,y1,x2,y2' (valores normalizados) num tuplo, ou None se vazio."""
+    if not value:
+        return None
+    region = tuple(float(v) for v in value.split(","))
+    if len(region) != 4:
+        raise ValueError(f"Região de movimento inválida: '{value}'. Use 'x1,y1,x2,y2'.")
+    return region
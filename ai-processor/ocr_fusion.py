@@ -0,0 +1,48 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class PlateFusion:
+    """
+    Fusão temporal das leituras de OCR de um mesmo veículo.
+
+    Cada leitura contribui, em cada posição (slot) da placa, com um voto no carácter lido
+    pesado pela confiança que o modelo deu a esse carácter. O resultado é, slot a slot, o
+    carácter com mais peso acumulado. Assim várias leituras medianas chegam a uma placa
+    correta mesmo que nenhum frame isolado a leia por inteiro.
+    """
+
+    def __init__(self, pad_char: str = "_"):
+        self.pad_char = pad_char
+        self.reads = 0
+        self._votes: List[Dict[str, float]] = []
+
+    def add(self, plate: str, char_probs: Optional[Sequence[float]] = None):
+        """Acumula uma leitura. Sem confidências, cada carácter vale 1."""
+        if not plate:
+            return
+        if char_probs is None:
+            char_probs = [1.0] * len(plate)
+        while len(self._votes) < len(plate):
+            self._votes.append({})
+        for slot, (char, prob) in enumerate(zip(plate, char_probs)):
+            self._votes[slot][char] = self._votes[slot].get(char, 0.0) + float(prob)
+        self.reads += 1
+
+    def result(self) -> Tuple[Optional[str], float]:
+        """
+        Devolve a placa fundida (sem os caracteres de preenchimento) e uma confiança global
+        entre 0 e 1: a média, pelos slots, do peso do carácter vencedor dividido pelo número
+        de leituras.
+        """
+        if not self.reads:
+            return None, 0.0
+        chars = []
+        slot_confidences = []
+        for votes in self._votes:
+            char, weight = max(votes.items(), key=lambda item: item[1])
+            chars.append(char)
+            slot_confidences.append(weight / self.reads)
+        plate = "".join(chars).rstrip(self.pad_char)
+        if not plate:
+            return None, 0.0
+        return plate, sum(slot_confidences) / len(slot_confidences)
@@ -0,0 +1,167 @@
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+from tracing import TRACER
+
+
+def letterbox(image: np.ndarray, new_shape: Tuple[int, int], color: int = 114) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Redimensiona mantendo a proporção e completa com `color` até `new_shape` (altura, largura).
+    Devolve a imagem, a escala aplicada e o preenchimento (x, y) à esquerda/em cima.
+    """
+    h, w = image.shape[:2]
+    new_h, new_w = new_shape
+    scale = min(new_h / h, new_w / w)
+    resized_w, resized_h = max(int(round(w * scale)), 1), max(int(round(h * scale)), 1)
+    if (resized_w, resized_h) != (w, h):
+        image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (new_w - resized_w) // 2, (new_h - resized_h) // 2
+    padded = cv2.copyMakeBorder(
+        image,
+        pad_y,
+        new_h - resized_h - pad_y,
+        pad_x,
+        new_w - resized_w - pad_x,
+        cv2.BORDER_CONSTANT,
+        value=(color, color, color),
+    )
+    return padded, scale, (pad_x, pad_y)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Non-maximum suppression em numpy. `boxes` em (x1, y1, x2, y2); devolve os índices mantidos."""
+    order = scores.argsort()[::-1]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        x1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def decode_yolov8(
+    output: np.ndarray,
+    conf_threshold: float,
+    iou_threshold: float,
+    classes: Optional[Sequence[int]] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Descodifica a saída de uma imagem de um modelo YOLOv8 exportado para ONNX, com forma
+    (4 + n_classes, n_anchors) e caixas em (cx, cy, w, h). Devolve caixas (x1, y1, x2, y2),
+    scores e classes, já depois do NMS (por classe).
+    """
+    predictions = output.T
+    class_scores = predictions[:, 4:]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_ids)), class_ids]
+    mask = scores >= conf_threshold
+    if classes is not None:
+        mask &= np.isin(class_ids, classes)
+    if not mask.any():
+        return np.zeros((0, 4), dtype=np.float32), np.zeros((0,), dtype=np.float32), np.zeros((0,), dtype=np.int64)
+
+    cxcywh, scores, class_ids = predictions[mask, :4], scores[mask], class_ids[mask]
+    boxes = np.empty_like(cxcywh)
+    boxes[:, :2] = cxcywh[:, :2] - cxcywh[:, 2:] / 2
+    boxes[:, 2:] = cxcywh[:, :2] + cxcywh[:, 2:] / 2
+    # Desloca as caixas por classe para que o NMS nunca suprima caixas de classes diferentes
+    offsets = class_ids[:, None].astype(np.float32) * 4096
+    keep = nms(boxes + offsets, scores, iou_threshold)
+    return boxes[keep], scores[keep], class_ids[keep]
+
+
+class OnnxYolo:
+    """
+    Execução de um modelo YOLOv8 (formato de exportação do ultralytics) com o ONNX Runtime,
+    sem depender do torch: letterbox, inferência em lote e NMS em numpy. As caixas devolvidas
+    estão nas coordenadas da imagem original.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        providers: Optional[List[str]] = None,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        default_size: int = 640,
+    ):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=providers or ort.get_available_providers(),
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, width = model_input.shape
+        # Eixos dinâmicos aparecem como strings (ou None) no ONNX
+        self.input_size = (
+            height if isinstance(height, int) else default_size,
+            width if isinstance(width, int) else default_size,
+        )
+        self.fixed_batch = batch if isinstance(batch, int) else None
+
+    def _preprocess(self, images: List[np.ndarray]) -> Tuple[np.ndarray, list]:
+        blobs = []
+        transforms = []
+        for image in images:
+            padded, scale, pad = letterbox(image, self.input_size)
+            if padded.ndim == 2 or padded.shape[2] == 1:
+                # Frames em tons de cinzento: expande já à resolução da rede, que é mais barato
+                padded = cv2.cvtColor(padded, cv2.COLOR_GRAY2BGR)
+            blobs.append(padded)
+            transforms.append((scale, pad, image.shape[:2]))
+        # BGR -> RGB, HWC -> CHW, 0-255 -> 0-1
+        batch = np.ascontiguousarray(np.stack(blobs)[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32)
+        batch /= 255.0
+        return batch, transforms
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        if self.fixed_batch is None or self.fixed_batch == len(batch):
+            return self.session.run(None, {self.input_name: batch})[0]
+        # Modelo exportado com lote fixo (normalmente 1): corre em pedaços desse tamanho
+        outputs = []
+        for start in range(0, len(batch), self.fixed_batch):
+            chunk = batch[start:start + self.fixed_batch]
+            missing = self.fixed_batch - len(chunk)
+            if missing:
+                chunk = np.concatenate([chunk, np.zeros((missing, *chunk.shape[1:]), dtype=chunk.dtype)])
+            outputs.append(self.session.run(None, {self.input_name: chunk})[0][: self.fixed_batch - missing])
+        return np.concatenate(outputs)
+
+    def predict(
+        self,
+        images: List[np.ndarray],
+        conf_threshold: float = 0.25,
+        iou_threshold: float = 0.45,
+        classes: Optional[Sequence[int]] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Devolve, por imagem, (caixas x1y1x2y2, scores, classes)."""
+        if not images:
+            return []
+        with TRACER.span("yolo.preprocess", images=len(images)):
+            batch, transforms = self._preprocess(images)
+        with TRACER.span("yolo.onnx_run"):
+            outputs = self._run(batch)
+        results = []
+        with TRACER.span("yolo.postprocess"):
+            for output, (scale, (pad_x, pad_y), (h, w)) in zip(outputs, transforms):
+                boxes, scores, class_ids = decode_yolov8(output, conf_threshold, iou_threshold, classes)
+                boxes[:, [0, 2]] = np.clip((boxes[:, [0, 2]] - pad_x) / scale, 0, w)
+                boxes[:, [1, 3]] = np.clip((boxes[:, [1, 3]] - pad_y) / scale, 0, h)
+                results.append((boxes, scores, class_ids))
+        return results
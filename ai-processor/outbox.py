@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import List
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    plate TEXT NOT NULL,
+    camera_id INTEGER NOT NULL,
+    image_path TEXT NOT NULL,
+    image_bytes BLOB,
+    image_size INTEGER NOT NULL DEFAULT 0,
+    captured_at REAL NOT NULL,
+    queued_at REAL NOT NULL,
+    idempotency_key TEXT
+)
+"""
+
+
+class SightingOutbox:
+    """
+    Fila persistente (SQLite em modo WAL) dos avistamentos que não chegaram ao backend.
+
+    As linhas só são apagadas depois de o backend confirmar a inserção, por isso um reinício
+    do serviço a meio de uma falha não perde avistamentos. Os bytes da imagem são sempre
+    guardados na linha: o capture store despeja ficheiros por LRU e podia apagar a imagem de
+    um avistamento ainda por reenviar.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if "idempotency_key" not in columns:
+            # Outbox criada por uma versão anterior
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN idempotency_key TEXT")
+
+        # Contadores expostos para monitorização
+        self.appended = 0
+        self.replayed = 0
+
+    def append(self, sightings: List[dict]):
+        """Guarda avistamentos no formato usado pelo `APIClient` (ver `send_sighting_to_api`)."""
+        now = time.time()
+        rows = []
+        for s in sightings:
+            image_bytes = s.get("image_bytes")
+            if image_bytes is None and s["image_filename"]:
+                # O ficheiro está no capture store, que o pode despejar antes do reenvio: a
+                # outbox guarda a sua própria cópia da imagem
+                try:
+                    with open(s["image_filename"], "rb") as image_file:
+                        image_bytes = image_file.read()
+                except OSError:
+                    image_bytes = None
+            size = len(image_bytes) if image_bytes is not None else 0
+            rows.append((
+                s["plate"], s["camera_id"], s["image_filename"] or "", image_bytes, size, s["captured_at"], now,
+                s.get("idempotency_key"),
+            ))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO outbox (plate, camera_id, image_path, image_bytes, image_size, captured_at, queued_at, "
+                "idempotency_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.appended += len(rows)
+
+    def peek(self, limit: int) -> List[dict]:
+        """Devolve os `limit` avistamentos pendentes mais antigos, sem os retirar."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT id, plate, camera_id, image_path, image_bytes, captured_at, idempotency_key "
+                "FROM outbox ORDER BY id LIMIT ?",
+                (limit,),
+            )
+            rows = cursor.fetchall()
+        return [
+            {
+                "outbox_id": row[0],
+                "plate": row[1],
+                "camera_id": row[2],
+                "image_filename": row[3] or None,
+                "image_bytes": row[4],
+                "captured_at": row[5],
+                "idempotency_key": row[6],
+            }
+            for row in rows
+        ]
+
+    def remove(self, outbox_ids: List[int]):
+        if not outbox_ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in outbox_ids])
+            self.replayed += len(outbox_ids)
+
+    def stats(self) -> dict:
+        """Tamanho do backlog (linhas e bytes de imagem) e idade do avistamento mais antigo."""
+        with self._lock:
+            pending, pending_bytes, oldest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(image_size), 0), MIN(queued_at) FROM outbox"
+            ).fetchone()
+        return {
+            "pending": pending,
+            "pending_bytes": pending_bytes,
+            "oldest_age_seconds": time.time() - oldest if oldest is not None else 0.0,
+            "appended": self.appended,
+            "replayed": self.replayed,
+        }
+
+    @property
+    def backlog(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
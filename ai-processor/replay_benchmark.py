@@ -0,0 +1,362 @@
+"""
+Mede o pipeline completo de deteção (o mesmo `process_camera_stream` das câmeras) a partir de
+vídeos locais ou pastas de imagens, sem câmeras RTSP nem backend.
+
+Cada entrada faz de uma câmera. Os frames passam pelo filtro de movimento, pelo agendador de
+inferência, pelo detector, pelo OCR, pelo tracker e pela gravação das imagens (numa pasta
+temporária); o envio ao backend é substituído por um contador. No fim é impresso um relatório
+JSON com frames/s, placas/s, latência p50/p95/p99 por etapa e o pico de memória. Exemplo:
+
+    python replay_benchmark.py video1.mp4 video2.mp4 frames_dir/ --backend onnx --model yolov8n.onnx --output report.json
+
+Por omissão os frames são lidos tão depressa quanto o pipeline os consome (débito máximo, sem
+frames descartados, resultado reprodutível). Com --realtime cada entrada é lida ao ritmo de
+--fps e, como numa câmera real, os frames que o pipeline não chega a consumir são descartados.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from threading import Event, Lock, Thread
+from typing import Optional, Tuple
+
+import numpy as np
+
+import config
+from capture_store import CaptureStore
+from capture_writer import CaptureWriter
+from dedup import SightingDeduplicator
+from detection import PlateDetector
+from frame_source import create_frame_source
+from inference_scheduler import InferenceScheduler
+from main import process_camera_stream
+from plate_localizer import PlateLocalizer
+from tracing import TRACER
+
+
+class ReplayGrabber:
+    """
+    Leitor de frames de um ficheiro ou pasta com a mesma interface do `FrameGrabber`.
+
+    Os instantes dos frames seguem o tempo do vídeo (índice / `fps`) e não o relógio, para que
+    o tracker, e portanto os avistamentos, não dependam da velocidade da máquina. Em tempo real
+    são, como numa câmera, o instante em que o frame foi lido. Com `loop` a entrada recomeça
+    do início quando acaba.
+    """
+
+    def __init__(self, source, camera_name: str, fps: float = 25.0, realtime: bool = False, max_frames: int = 0, loop: bool = False):
+        self.source = source
+        self.camera_name = camera_name
+        self.fps = fps
+        self.realtime = realtime
+        self.max_frames = max_frames
+        self.loop = loop
+        self.logger = logging.getLogger(__name__)
+        # Em tempo real fica só o frame mais recente, como no FrameGrabber
+        self._queue: queue.Queue = queue.Queue(maxsize=1 if realtime else 8)
+        self._stop_event = Event()
+        self._done = Event()
+        self._thread = Thread(target=self._run, name=f"replay-{camera_name}", daemon=True)
+
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+        self.keyframe_switches = 0
+
+    def start(self):
+        self._thread.start()
+
+    def _put(self, item: Tuple[np.ndarray, float]):
+        while not self._stop_event.is_set():
+            if not self.realtime:
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.frames_dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        try:
+            if not self.source.open():
+                self.logger.error(f"Não foi possível abrir a entrada {self.camera_name}.")
+                return
+            base = time.time()
+            next_at = time.monotonic()
+            decoded_at_open = 0
+            while not self._stop_event.is_set() and not (self.max_frames and self.frames_decoded >= self.max_frames):
+                if self.realtime:
+                    next_at += 1 / self.fps
+                    self._stop_event.wait(max(next_at - time.monotonic(), 0))
+                with TRACER.span("decode", camera=self.camera_name):
+                    frame = self.source.read()
+                if frame is None:
+                    # Sem `loop`, ou uma entrada que já não deu nenhum frame: terminou
+                    if not self.loop or self.frames_decoded == decoded_at_open:
+                        break
+                    self.source.close()
+                    if not self.source.open():
+                        break
+                    decoded_at_open = self.frames_decoded
+                    continue
+                captured_at = time.time() if self.realtime else base + self.frames_decoded / self.fps
+                self._put((frame, captured_at))
+                self.frames_decoded += 1
+                del frame
+        finally:
+            self.source.close()
+            self._done.set()
+
+    def read(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, float]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._queue.get(timeout=0.05)
+            except queue.Empty:
+                # Sem esperar pelo timeout no fim da entrada, que contaria no tempo medido
+                if self._done.is_set() or self._stop_event.is_set():
+                    return None
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set() or (self._done.is_set() and self._queue.empty())
+
+    def stats(self) -> dict:
+        return {"frames_decoded": self.frames_decoded, "frames_dropped": self.frames_dropped}
+
+
+class OfflineAPIClient:
+    """Substitui o APIClient: conta os avistamentos em vez de os enviar."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.sightings = []
+
+    def send_sighting_to_api(self, plate: str, image_filename: Optional[str], camera_id: int, image_bytes: Optional[bytes] = None, captured_at: Optional[float] = None):
+        with self._lock:
+            self.sightings.append({"plate": plate, "camera_id": camera_id, "has_image": image_bytes is not None})
+
+
+class PlateCountingDetector:
+    """
+    Envolve o PlateDetector dado ao agendador e conta as placas efetivamente lidas (texto não
+    vazio) nos resultados do pipeline, ao contrário do número de recortes enviados ao OCR.
+    """
+
+    def __init__(self, detector):
+        self.detector = detector
+        # Só a thread do agendador chama o detector: não precisa de lock
+        self.plates_read = 0
+
+    def __getattr__(self, name: str):
+        # O resto do pipeline lê atributos do detector (pad_char, plate_recognizer...)
+        return getattr(self.detector, name)
+
+    def detect_and_recognize_batch(self, frames: list, camera_ids: list, rois: Optional[list] = None) -> list:
+        results = self.detector.detect_and_recognize_batch(frames, camera_ids, rois)
+        pad_char = self.detector.pad_char
+        self.plates_read += sum(1 for detections in results for d in detections if d["plate"].rstrip(pad_char))
+        return results
+
+
+def stage_latencies(trace: dict) -> dict:
+    """p50/p95/p99 (ms) de cada etapa a partir dos spans do trace."""
+    durations = {}
+    for event in trace["traceEvents"]:
+        if event["ph"] == "X":
+            durations.setdefault(event["name"], []).append(event["dur"] / 1000)
+    stages = {}
+    for name, values in sorted(durations.items()):
+        values = np.array(values)
+        stages[name] = {
+            "count": len(values),
+            "mean_ms": round(float(values.mean()), 3),
+            "p50_ms": round(float(np.percentile(values, 50)), 3),
+            "p95_ms": round(float(np.percentile(values, 95)), 3),
+            "p99_ms": round(float(np.percentile(values, 99)), 3),
+        }
+    return stages
+
+
+def build_detector(args) -> PlateDetector:
+    """Cria o detector com as opções da linha de comandos e aquece-o fora do tempo medido."""
+    plate_localizer = None
+    if args.plate_localizer:
+        plate_localizer = PlateLocalizer(
+            args.plate_localizer,
+            conf_threshold=config.PLATE_LOCALIZER_CONF,
+            max_batch_size=config.PLATE_LOCALIZER_BATCH_SIZE,
+        )
+    detector = PlateDetector(
+        model_path=args.model,
+        ocr_max_batch_size=args.ocr_batch_size,
+        plate_localizer=plate_localizer,
+        backend=args.backend,
+        intra_op_threads=args.intra_op_threads,
+        inter_op_threads=args.inter_op_threads,
+    )
+    # Os modelos só ficam prontos (e com a memória alocada) depois das primeiras chamadas
+    for _ in range(args.warmup):
+        detector.detect_and_recognize(np.zeros((args.warmup_height, args.warmup_width, 3), dtype=np.uint8), 0)
+    return detector
+
+
+def run(args) -> dict:
+    if args.no_motion_gate:
+        config.MOTION_GATE_ENABLED = False
+
+    load_start = time.perf_counter()
+    detector = build_detector(args)
+    load_seconds = time.perf_counter() - load_start
+    ocr_crops_warmup = sum(size * count for size, count in detector.ocr_batch_sizes.items())
+
+    counting_detector = PlateCountingDetector(detector)
+    scheduler = InferenceScheduler(counting_detector, max_batch_size=args.batch_size, max_wait_ms=args.max_wait_ms)
+    captures_dir = tempfile.mkdtemp(prefix="replay-captures-")
+    capture_store = CaptureStore(captures_dir)
+    capture_writer = CaptureWriter(capture_store, workers=config.CAPTURE_WRITER_WORKERS, jpeg_quality=config.CAPTURE_JPEG_QUALITY)
+    deduplicator = SightingDeduplicator(ttl_seconds=config.DEDUP_TTL_SECONDS)
+    api_client = OfflineAPIClient()
+
+    grabbers = []
+    for camera_id, path in enumerate(args.inputs, start=1):
+        name = os.path.basename(os.path.normpath(path))
+        source = create_frame_source(path, "images" if os.path.isdir(path) else args.frame_source)
+        grabbers.append((
+            {"id": camera_id, "name": name, "rtsp_url": path},
+            ReplayGrabber(source, name, fps=args.fps, realtime=args.realtime, max_frames=args.max_frames),
+        ))
+
+    # Todas as etapas registadas: as latências por etapa saem dos spans
+    TRACER.configure(sample_rate=1.0, max_events=args.max_trace_events, output_dir=TRACER.output_dir)
+    scheduler.start()
+    TRACER.start()
+    start = time.perf_counter()
+    threads = [
+        Thread(
+            target=process_camera_stream,
+            args=(camera_info,),
+            kwargs={
+                "scheduler": scheduler,
+                "api_client": api_client,
+                "grabber": grabber,
+                "deduplicator": deduplicator,
+                "capture_writer": capture_writer,
+            },
+            name=f"camera-{camera_info['id']}",
+        )
+        for camera_info, grabber in grabbers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # As últimas imagens ainda em codificação fazem parte do trabalho medido
+    capture_writer.close()
+    elapsed = time.perf_counter() - start
+    trace = TRACER.stop()
+
+    scheduler.stop()
+    capture_store.close()
+    shutil.rmtree(captures_dir, ignore_errors=True)
+    if args.trace:
+        with open(args.trace, "w") as f:
+            json.dump(trace, f)
+
+    frames_decoded = sum(grabber.frames_decoded for _, grabber in grabbers)
+    ocr_crops = sum(size * count for size, count in detector.ocr_batch_sizes.items()) - ocr_crops_warmup
+    plates_read = counting_detector.plates_read
+    return {
+        "inputs": args.inputs,
+        "backend": args.backend,
+        "model": args.model,
+        "plate_localizer": args.plate_localizer or None,
+        "realtime": args.realtime,
+        "motion_gate": config.MOTION_GATE_ENABLED,
+        "load_s": round(load_seconds, 3),
+        "elapsed_s": round(elapsed, 3),
+        "frames_decoded": frames_decoded,
+        "frames_dropped": sum(grabber.frames_dropped for _, grabber in grabbers),
+        "frames_detected": scheduler.frames_processed,
+        "fps": round(frames_decoded / elapsed, 2) if elapsed else 0.0,
+        "detector_fps": round(scheduler.frames_processed / elapsed, 2) if elapsed else 0.0,
+        "avg_detector_batch": round(scheduler.average_batch_size, 2),
+        "ocr_crops": ocr_crops,
+        "ocr_crops_per_s": round(ocr_crops / elapsed, 2) if elapsed else 0.0,
+        "plates_read": plates_read,
+        "plates_per_s": round(plates_read / elapsed, 2) if elapsed else 0.0,
+        "sightings": len(api_client.sightings),
+        "sightings_per_s": round(len(api_client.sightings) / elapsed, 2) if elapsed else 0.0,
+        "duplicates_suppressed": deduplicator.suppressed,
+        # ru_maxrss vem em KiB no Linux
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stages": stage_latencies(trace),
+        "stages_truncated": TRACER.buffer_full,
+    }
+
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser):
+    """Opções do detector, do OCR e da leitura dos frames (por omissão, as do config)."""
+    parser.add_argument("--model", default=config.DETECTOR_MODEL, help="Modelo do detector de veículos.")
+    parser.add_argument("--backend", default=config.DETECTOR_BACKEND, choices=("ultralytics", "onnx"))
+    parser.add_argument("--plate-localizer", default=config.PLATE_LOCALIZER_MODEL, help="Modelo ONNX do localizador de placas.")
+    parser.add_argument("--intra-op-threads", type=int, default=config.DETECTOR_INTRA_OP_THREADS)
+    parser.add_argument("--inter-op-threads", type=int, default=config.DETECTOR_INTER_OP_THREADS)
+    parser.add_argument("--batch-size", type=int, default=config.DETECTOR_MAX_BATCH_SIZE, help="Frames por lote do agendador.")
+    parser.add_argument("--max-wait-ms", type=float, default=config.DETECTOR_MAX_WAIT_MS)
+    parser.add_argument("--ocr-batch-size", type=int, default=config.OCR_MAX_BATCH_SIZE)
+    parser.add_argument("--frame-source", default="opencv", choices=("opencv", "ffmpeg"), help="Descodificador dos vídeos.")
+    parser.add_argument("--no-motion-gate", action="store_true", help="Envia todos os frames ao detector.")
+    parser.add_argument("--warmup", type=int, default=3, help="Chamadas ao detector antes de medir.")
+    parser.add_argument("--warmup-width", type=int, default=1280)
+    parser.add_argument("--warmup-height", type=int, default=720)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostra os logs do pipeline.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="Vídeos ou pastas de imagens; cada um faz de uma câmera.")
+    add_pipeline_arguments(parser)
+    parser.add_argument("--fps", type=float, default=25.0, help="Frames/s das entradas (instantes dos frames e ritmo com --realtime).")
+    parser.add_argument("--realtime", action="store_true", help="Lê ao ritmo de --fps e descarta os frames em atraso.")
+    parser.add_argument("--max-frames", type=int, default=0, help="Máximo de frames por entrada (0 = todos).")
+    parser.add_argument("--max-trace-events", type=int, default=2_000_000, help="Limite de spans guardados para as latências.")
+    parser.add_argument("--trace", default="", help="Grava também o trace completo (Chrome trace / Perfetto) neste ficheiro.")
+    parser.add_argument("--output", default="", help="Ficheiro onde gravar o relatório JSON (além do stdout).")
+    args = parser.parse_args()
+
+    missing = [path for path in args.inputs if not os.path.exists(path)]
+    if missing:
+        raise SystemExit(f"Entradas inexistentes: {', '.join(missing)}")
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
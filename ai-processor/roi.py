@@ -0,0 +1,61 @@
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+
+class RegionOfInterest:
+    """
+    Zona de deteção de uma câmera, definida por um polígono em coordenadas normalizadas (0-1).
+
+    O detector só recebe o retângulo que envolve o polígono (um recorte sem cópia do frame),
+    e as caixas cujo centro caia fora do polígono são descartadas logo a seguir, antes do
+    recorte dos veículos e do OCR. As caixas que ficam voltam a coordenadas do frame inteiro.
+    """
+
+    def __init__(self, polygon: Sequence[Sequence[float]]):
+        if len(polygon) < 3:
+            raise ValueError("O polígono da zona de deteção precisa de pelo menos 3 pontos.")
+        self.polygon = np.clip(np.asarray(polygon, dtype=np.float32), 0.0, 1.0)
+        # Conversões para pixels, por resolução do frame
+        self._cache: Dict[Tuple[int, int], Tuple[np.ndarray, Tuple[int, int, int, int]]] = {}
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """Retângulo (x1, y1, x2, y2) normalizado que envolve o polígono."""
+        x1, y1 = self.polygon.min(axis=0)
+        x2, y2 = self.polygon.max(axis=0)
+        return float(x1), float(y1), float(x2), float(y2)
+
+    def _pixels(self, shape: Tuple[int, ...]) -> Tuple[np.ndarray, Tuple[int, int, int, int]]:
+        h, w = shape[:2]
+        cached = self._cache.get((h, w))
+        if cached is None:
+            points = self.polygon * np.array([w, h], dtype=np.float32)
+            x1, y1, x2, y2 = self.bounds
+            box = (int(x1 * w), int(y1 * h), max(int(np.ceil(x2 * w)), int(x1 * w) + 1), max(int(np.ceil(y2 * h)), int(y1 * h) + 1))
+            cached = (points.reshape(-1, 1, 2), box)
+            self._cache[(h, w)] = cached
+        return cached
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """Devolve o recorte do frame a passar ao detector e o seu deslocamento (x, y)."""
+        _, (x1, y1, x2, y2) = self._pixels(frame.shape)
+        return frame[y1:y2, x1:x2], (x1, y1)
+
+    def filter(self, boxes: list, frame_shape: Tuple[int, ...], offset: Tuple[int, int]) -> list:
+        """Passa as caixas (x1, y1, x2, y2) do recorte para coordenadas do frame e mantém só as de dentro do polígono."""
+        points, _ = self._pixels(frame_shape)
+        ox, oy = offset
+        kept = []
+        for x1, y1, x2, y2 in boxes:
+            bbox = (x1 + ox, y1 + oy, x2 + ox, y2 + oy)
+            center = ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+            if cv2.pointPolygonTest(points, center, False) >= 0:
+                kept.append(bbox)
+        return kept
+
+
+def build_roi(camera_info: dict) -> Optional[RegionOfInterest]:
+    polygon = camera_info.get("roi_polygon")
+    return RegionOfInterest(polygon) if polygon else None
@@ -0,0 +1,235 @@
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Campos do cabeçalho global (int64)
+_LATEST_SEQ = 0
+_STOPPED = 1
+_FRAMES_DECODED = 2
+_FRAMES_DROPPED = 3
+_STOP_REQUESTED = 4
+_RECONNECTS = 5
+_KEYFRAME_SWITCHES = 6
+_HEADER_FIELDS = 7
+
+# Campos de metadados de cada slot (int64)
+_SLOT_SEQ = 0
+_SLOT_HEIGHT = 1
+_SLOT_WIDTH = 2
+_SLOT_CHANNELS = 3
+_SLOT_FIELDS = 4
+
+
+class SharedFrameRing:
+    """
+    Ring buffer de frames sobre `multiprocessing.shared_memory`.
+
+    Um único processo escreve (descodificação) e um único processo lê (inferência). Os frames
+    são copiados diretamente para a memória partilhada, sem pickle. O leitor só se interessa
+    pelo frame mais recente; o número de slots dá margem para o escritor avançar enquanto o
+    leitor ainda copia o slot anterior. Cada slot guarda a sua sequência, que o leitor volta a
+    verificar depois da cópia para detetar que o slot foi reescrito entretanto.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, max_shape: Tuple[int, int, int], owner: bool):
+        self.shm = shm
+        self.slots = slots
+        self.max_shape = max_shape
+        self.owner = owner
+        self.slot_bytes = int(np.prod(max_shape))
+
+        offset = 0
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self._header.nbytes
+        self._meta = np.ndarray((slots, _SLOT_FIELDS), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self._meta.nbytes
+        self._timestamps = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset += self._timestamps.nbytes
+        self._data = np.ndarray((slots, self.slot_bytes), dtype=np.uint8, buffer=shm.buf, offset=offset)
+
+        self._last_read_seq = 0
+        self._skipped = 0
+
+    @staticmethod
+    def required_size(slots: int, max_shape: Tuple[int, int, int]) -> int:
+        return 8 * _HEADER_FIELDS + 8 * slots * _SLOT_FIELDS + 8 * slots + slots * int(np.prod(max_shape))
+
+    @classmethod
+    def create(cls, slots: int, max_shape: Tuple[int, int, int]) -> "SharedFrameRing":
+        shm = shared_memory.SharedMemory(create=True, size=cls.required_size(slots, max_shape))
+        ring = cls(shm, slots, max_shape, owner=True)
+        ring._header[:] = 0
+        ring._meta[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, slots: int, max_shape: Tuple[int, int, int]) -> "SharedFrameRing":
+        # Os processos lançados com 'spawn' partilham o resource_tracker do processo pai,
+        # por isso o bloco só é removido quando o criador chama close().
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, slots, max_shape, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # region Escritor
+    def write(self, frame: np.ndarray, captured_at: float):
+        if frame.ndim == 2:
+            frame = frame[:, :, np.newaxis]
+        max_h, max_w, max_c = self.max_shape
+        h, w, c = frame.shape
+        if c > max_c:
+            raise ValueError(f"Frame com {c} canais não cabe num slot de {max_c} canais.")
+        if h > max_h or w > max_w:
+            # Reduz mantendo a proporção para caber no slot
+            scale = min(max_h / h, max_w / w)
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+            if frame.ndim == 2:
+                frame = frame[:, :, np.newaxis]
+            h, w, c = frame.shape
+
+        seq = int(self._header[_LATEST_SEQ]) + 1
+        slot = seq % self.slots
+        meta = self._meta[slot]
+        # Sequência negativa marca o slot como "em escrita"
+        meta[_SLOT_SEQ] = -seq
+        self._data[slot, : h * w * c] = frame.reshape(-1)
+        meta[_SLOT_HEIGHT], meta[_SLOT_WIDTH], meta[_SLOT_CHANNELS] = h, w, c
+        self._timestamps[slot] = captured_at
+        meta[_SLOT_SEQ] = seq
+        self._header[_LATEST_SEQ] = seq
+
+    def update_counters(self, frames_decoded: int, frames_dropped: int, reconnects: int = 0, keyframe_switches: int = 0):
+        self._header[_FRAMES_DECODED] = frames_decoded
+        self._header[_FRAMES_DROPPED] = frames_dropped
+        self._header[_RECONNECTS] = reconnects
+        self._header[_KEYFRAME_SWITCHES] = keyframe_switches
+
+    def mark_stopped(self):
+        self._header[_STOPPED] = 1
+
+    @property
+    def stop_requested(self) -> bool:
+        return bool(self._header[_STOP_REQUESTED])
+    # endregion
+
+    # region Leitor
+    def read_latest(self) -> Optional[Tuple[np.ndarray, float]]:
+        """Copia o frame mais recente, se ainda não tiver sido lido. Não bloqueia."""
+        seq = int(self._header[_LATEST_SEQ])
+        if seq == 0 or seq == self._last_read_seq:
+            return None
+        slot = seq % self.slots
+        meta = self._meta[slot]
+        if meta[_SLOT_SEQ] != seq:
+            return None
+        h, w, c = int(meta[_SLOT_HEIGHT]), int(meta[_SLOT_WIDTH]), int(meta[_SLOT_CHANNELS])
+        captured_at = float(self._timestamps[slot])
+        frame = self._data[slot, : h * w * c].reshape(h, w, c).copy()
+        if meta[_SLOT_SEQ] != seq:
+            # O escritor deu a volta ao ring durante a cópia
+            return None
+        if c == 1:
+            frame = frame[:, :, 0]
+        if self._last_read_seq:
+            # Frames que o escritor publicou mas que o leitor nunca chegou a ver
+            self._skipped += seq - self._last_read_seq - 1
+        self._last_read_seq = seq
+        return frame, captured_at
+
+    def request_stop(self):
+        """Pede ao escritor que deixe de descodificar esta câmera."""
+        self._header[_STOP_REQUESTED] = 1
+
+    @property
+    def stopped(self) -> bool:
+        return bool(self._header[_STOPPED])
+
+    @property
+    def frames_decoded(self) -> int:
+        return int(self._header[_FRAMES_DECODED])
+
+    @property
+    def frames_dropped(self) -> int:
+        return int(self._header[_FRAMES_DROPPED]) + self._skipped
+
+    @property
+    def reconnects(self) -> int:
+        return int(self._header[_RECONNECTS])
+
+    @property
+    def keyframe_switches(self) -> int:
+        return int(self._header[_KEYFRAME_SWITCHES])
+    # endregion
+
+    def close(self):
+        # As vistas numpy têm de ser libertadas antes de fechar o bloco
+        del self._header, self._meta, self._timestamps, self._data
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedFrameReader:
+    """
+    Adaptador do lado da inferência com a mesma interface de leitura do `FrameGrabber`
+    (`read`, `stop`, `stopped` e contadores), para que `process_camera_stream` funcione igual
+    com câmeras locais ou descodificadas noutro processo.
+    """
+
+    def __init__(self, ring: SharedFrameRing, is_producer_alive: Callable[[], bool], poll_interval: float = 0.005):
+        self.ring = ring
+        self.is_producer_alive = is_producer_alive
+        self.poll_interval = poll_interval
+        self._stopped = False
+
+    def start(self):
+        # A descodificação já corre no processo trabalhador
+        pass
+
+    def read(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, float]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            item = self.ring.read_latest()
+            if item is not None or self.stopped:
+                return item
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def stop(self):
+        self._stopped = True
+        self.ring.request_stop()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped or self.ring.stopped or not self.is_producer_alive()
+
+    @property
+    def frames_decoded(self) -> int:
+        return self.ring.frames_decoded
+
+    @property
+    def frames_dropped(self) -> int:
+        return self.ring.frames_dropped
+
+    @property
+    def reconnects(self) -> int:
+        return self.ring.reconnects
+
+    @property
+    def keyframe_switches(self) -> int:
+        return self.ring.keyframe_switches
+
+    def stats(self) -> dict:
+        return {
+            "frames_decoded": self.frames_decoded,
+            "frames_dropped": self.frames_dropped,
+            "reconnects": self.reconnects,
+            "keyframe_switches": self.keyframe_switches,
+        }
+
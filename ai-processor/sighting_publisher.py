@@ -0,0 +1,220 @@
+import json
+import logging
+from functools import partial
+from threading import Event, Lock, Thread
+from typing import Dict, List, Set
+
+import pika
+
+# Tem de coincidir com backend/app/messaging.py
+SIGHTINGS_EXCHANGE = "sightings"
+SIGHTINGS_QUEUE = "sightings_ingest_queue"
+SIGHTINGS_ROUTING_KEY = "sighting.created"
+
+
+class SightingPublisher:
+    """
+    Publica avistamentos numa exchange durável do RabbitMQ com confirmação do broker.
+
+    Cada avistamento é uma mensagem persistente; só conta como entregue depois de o broker a
+    confirmar (publisher confirms). Um lote é publicado de seguida e as confirmações são
+    esperadas uma única vez no fim: os acks/nacks chegam por delivery tag e são mapeados de
+    volta para as posições no lote. A ligação assíncrona do pika (`SelectConnection`) corre
+    numa thread própria com o seu ioloop; as publicações são lá agendadas com
+    `add_callback_threadsafe` e serializadas, e a ligação é refeita quando cai.
+    """
+
+    def __init__(self, host: str, username: str, password: str, confirm_timeout: float = 30.0):
+        self.parameters = pika.ConnectionParameters(
+            host=host,
+            credentials=pika.PlainCredentials(username, password),
+        )
+        self.confirm_timeout = confirm_timeout
+        self.logger = logging.getLogger(__name__)
+        self._connection = None
+        self._channel = None
+        self._thread = None
+        self._lock = Lock()
+        self._ready = Event()
+        self._done = Event()
+        self._error = None
+
+        # Estado das confirmações do lote em curso
+        self._delivery_tag = 0
+        self._unconfirmed: Dict[int, int] = {}
+        self._returned: Set[int] = set()
+        self._settled: Set[int] = set()
+        self._failed: Set[int] = set()
+
+    def _connect(self):
+        self._ready.clear()
+        self._error = None
+        self._connection = pika.SelectConnection(
+            self.parameters,
+            on_open_callback=self._on_connection_open,
+            on_open_error_callback=self._on_connection_error,
+            on_close_callback=self._on_connection_closed,
+        )
+        self._thread = Thread(target=self._connection.ioloop.start, name="sighting-publisher", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(self.confirm_timeout) or self._error is not None:
+            error = self._error or pika.exceptions.AMQPConnectionError("Tempo esgotado ao ligar ao RabbitMQ.")
+            self._disconnect()
+            raise error
+        self.logger.info("Conexão com o RabbitMQ estabelecida para publicar avistamentos.")
+
+    def _disconnect(self):
+        connection, thread = self._connection, self._thread
+        if connection is not None:
+            def close():
+                # O on_close_callback pára o ioloop quando a ligação acabar de fechar
+                if connection.is_open:
+                    connection.close()
+                elif not connection.is_closing:
+                    connection.ioloop.stop()
+
+            connection.ioloop.add_callback_threadsafe(close)
+            thread.join(self.confirm_timeout)
+            if not thread.is_alive():
+                connection.ioloop.close()
+        self._connection = None
+        self._channel = None
+        self._thread = None
+        # As delivery tags são do canal: as confirmações pendentes perderam-se com ele
+        self._delivery_tag = 0
+        self._unconfirmed.clear()
+        self._returned.clear()
+
+    def _fail(self, error):
+        if not isinstance(error, pika.exceptions.AMQPError):
+            error = pika.exceptions.AMQPConnectionError(error)
+        if self._error is None:
+            self._error = error
+        # Acorda quem espera pela ligação ou pelas confirmações do lote
+        self._ready.set()
+        self._done.set()
+
+    # Callbacks chamados na thread do ioloop
+
+    def _on_connection_open(self, connection):
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_error(self, connection, error):
+        self._fail(error)
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason):
+        self._fail(reason)
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        self._channel = channel
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.add_on_return_callback(self._on_return)
+        # A fila é declarada também deste lado para que nada se perca antes de o consumidor arrancar
+        channel.exchange_declare(
+            exchange=SIGHTINGS_EXCHANGE, exchange_type="direct", durable=True, callback=self._on_exchange_declared
+        )
+
+    def _on_exchange_declared(self, _frame):
+        self._channel.queue_declare(queue=SIGHTINGS_QUEUE, durable=True, callback=self._on_queue_declared)
+
+    def _on_queue_declared(self, _frame):
+        self._channel.queue_bind(
+            queue=SIGHTINGS_QUEUE,
+            exchange=SIGHTINGS_EXCHANGE,
+            routing_key=SIGHTINGS_ROUTING_KEY,
+            callback=self._on_queue_bound,
+        )
+
+    def _on_queue_bound(self, _frame):
+        # Os acks/nacks chegam ao callback sem bloquear a publicação das mensagens seguintes
+        self._channel.confirm_delivery(ack_nack_callback=self._on_confirm, callback=lambda _frame: self._ready.set())
+
+    def _on_channel_closed(self, channel, reason):
+        self._fail(reason)
+        if channel.connection.is_open:
+            channel.connection.close()
+
+    def _on_confirm(self, frame):
+        method = frame.method
+        if method.multiple:
+            tags = [tag for tag in self._unconfirmed if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag]
+        for tag in tags:
+            index = self._unconfirmed.pop(tag, None)
+            if index is None:
+                continue
+            self._settled.add(index)
+            if isinstance(method, pika.spec.Basic.Nack) or tag in self._returned:
+                self._failed.add(index)
+            self._returned.discard(tag)
+        if not self._unconfirmed:
+            self._done.set()
+
+    def _on_return(self, channel, method, properties, body):
+        # Mensagem sem fila de destino (mandatory): o broker confirma-a, mas não foi entregue
+        self._returned.add(int(properties.message_id))
+
+    def _publish(self, messages: List[dict], indices: List[int]):
+        try:
+            for index in indices:
+                self._delivery_tag += 1
+                self._unconfirmed[self._delivery_tag] = index
+                self._channel.basic_publish(
+                    exchange=SIGHTINGS_EXCHANGE,
+                    routing_key=SIGHTINGS_ROUTING_KEY,
+                    body=json.dumps(messages[index]),
+                    # A delivery tag identifica a mensagem se o broker a devolver
+                    properties=pika.BasicProperties(
+                        delivery_mode=2, content_type="application/json", message_id=str(self._delivery_tag)
+                    ),
+                    mandatory=True,
+                )
+        except pika.exceptions.AMQPError as e:
+            # Uma exceção aqui pararia o ioloop; a que não foi publicada fica por confirmar
+            self._unconfirmed.pop(self._delivery_tag, None)
+            self._fail(e)
+            return
+        if not self._unconfirmed:
+            self._done.set()
+
+    def _publish_all(self, messages: List[dict], indices: List[int]) -> bool:
+        """Publica as mensagens de seguida e espera pelas confirmações. False se o tempo esgotar."""
+        if self._channel is None or not self._channel.is_open or self._error is not None:
+            self._disconnect()
+            self._connect()
+        self._done.clear()
+        self._connection.ioloop.add_callback_threadsafe(partial(self._publish, messages, indices))
+        if not self._done.wait(self.confirm_timeout):
+            return False
+        if self._error is not None:
+            # O canal caiu a meio do lote: as mensagens sem confirmação são reenviadas
+            raise self._error
+        return True
+
+    def publish_batch(self, messages: List[dict]) -> List[int]:
+        """Publica as mensagens e devolve os índices das que o broker não confirmou."""
+        with self._lock:
+            self._settled, self._failed = set(), set()
+            pending = list(range(len(messages)))
+            # Uma ligação parada há muito tempo pode ter caído: refaz e tenta uma segunda vez
+            for attempt in range(2):
+                try:
+                    if not self._publish_all(messages, pending):
+                        self.logger.error(f"O RabbitMQ não confirmou {len(self._unconfirmed)} avistamentos a tempo.")
+                        self._disconnect()
+                    break
+                except pika.exceptions.AMQPError as e:
+                    self._disconnect()
+                    if attempt == 1:
+                        self.logger.error(f"Falha ao publicar avistamentos no RabbitMQ: {e!r}")
+                finally:
+                    # Só se reenviam as que o broker ainda não tinha confirmado nem recusado
+                    pending = [index for index in pending if index not in self._settled]
+            return sorted(self._failed.union(pending))
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
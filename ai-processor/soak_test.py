@@ -0,0 +1,274 @@
+"""
+Teste de carga com câmeras virtuais para saber quantas câmeras cabem por core nesta máquina.
+
+Cada câmera virtual repete um clip local ao seu ritmo nativo e passa pelo pipeline completo
+(`process_camera_stream`: filtro de movimento, agendador, detector, OCR, tracker e gravação
+das imagens), com o backend substituído por um contador, como no replay_benchmark. O número
+de câmeras sobe por degraus de --step-seconds até a latência p95 (frame lido -> frame
+processado) passar de --max-latency-ms ou a fração de frames descartados passar de
+--max-drop-rate. Exemplo:
+
+    python soak_test.py clip.mp4 --backend onnx --model yolov8n.onnx --start 2 --step 2 --output capacity.json
+
+O relatório JSON indica o último degrau dentro dos limites em câmeras e em câmeras por core,
+para o detector, o modelo de OCR e as threads escolhidos.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from threading import Lock, Thread
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+import config
+from capture_store import CaptureStore
+from capture_writer import CaptureWriter
+from dedup import SightingDeduplicator
+from frame_source import create_frame_source
+from inference_scheduler import InferenceScheduler
+from main import process_camera_stream
+from replay_benchmark import OfflineAPIClient, ReplayGrabber, add_pipeline_arguments, build_detector
+
+# O progresso dos degraus aparece mesmo sem --verbose
+logger = logging.getLogger("soak_test")
+logger.setLevel(logging.INFO)
+
+
+class LatencyProbe:
+    """Latências frame lido -> frame processado de todas as câmeras, recolhidas só durante a medição."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.measuring = False
+        self.latencies = []
+
+    def record(self, seconds: float):
+        if self.measuring:
+            with self._lock:
+                self.latencies.append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.latencies = []
+
+
+class VirtualCamera(ReplayGrabber):
+    """
+    Câmera virtual: repete o clip em tempo real. O pipeline só volta a chamar `read` depois de
+    acabar o frame anterior, por isso esse instante marca o fim do processamento do frame.
+    """
+
+    def __init__(self, source, camera_name: str, fps: float, probe: LatencyProbe):
+        super().__init__(source, camera_name, fps=fps, realtime=True, loop=True)
+        self.probe = probe
+        self._pending_at: Optional[float] = None
+
+    def read(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, float]]:
+        if self._pending_at is not None:
+            self.probe.record(time.time() - self._pending_at)
+            self._pending_at = None
+        item = super().read(timeout)
+        if item is not None:
+            self._pending_at = item[1]
+        return item
+
+
+def available_cores() -> int:
+    # Respeita a afinidade do processo (taskset, cpuset do contentor)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def clip_fps(path: str, default: float) -> float:
+    if os.path.isdir(path):
+        return default
+    capture = cv2.VideoCapture(path)
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    capture.release()
+    return fps if 0 < fps <= 240 else default
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_step(cameras: int, args, pipeline: dict, probe: LatencyProbe, fps: float) -> dict:
+    """Corre `cameras` câmeras virtuais durante um degrau e devolve as medidas do degrau."""
+    backend = "images" if os.path.isdir(args.clip) else args.frame_source
+    grabbers = [
+        VirtualCamera(create_frame_source(args.clip, backend), f"virtual-{i}", fps, probe)
+        for i in range(1, cameras + 1)
+    ]
+    threads = [
+        Thread(
+            target=process_camera_stream,
+            args=({"id": i, "name": grabber.camera_name, "rtsp_url": args.clip},),
+            kwargs={"grabber": grabber, **pipeline},
+            name=f"camera-{i}",
+        )
+        for i, grabber in enumerate(grabbers, start=1)
+    ]
+    for thread in threads:
+        thread.start()
+
+    # Deixa as filas estabilizarem antes de medir
+    time.sleep(args.settle_seconds)
+    scheduler = pipeline["scheduler"]
+    decoded = sum(g.frames_decoded for g in grabbers)
+    dropped = sum(g.frames_dropped for g in grabbers)
+    processed = scheduler.frames_processed
+    cpu_start, start = cpu_seconds(), time.perf_counter()
+    probe.reset()
+    probe.measuring = True
+    time.sleep(args.step_seconds)
+    probe.measuring = False
+    elapsed = time.perf_counter() - start
+    cpu = cpu_seconds() - cpu_start
+    decoded = sum(g.frames_decoded for g in grabbers) - decoded
+    dropped = sum(g.frames_dropped for g in grabbers) - dropped
+    processed = scheduler.frames_processed - processed
+    latencies = np.array(probe.latencies) * 1000
+
+    for grabber in grabbers:
+        grabber.stop()
+    for thread in threads:
+        thread.join()
+
+    def percentile(q: float) -> Optional[float]:
+        return round(float(np.percentile(latencies, q)), 1) if len(latencies) else None
+
+    return {
+        "cameras": cameras,
+        "offered_fps": round(cameras * fps, 1),
+        "decoded_fps": round(decoded / elapsed, 1),
+        "detector_fps": round(processed / elapsed, 1),
+        "drop_rate": round(dropped / decoded, 4) if decoded else 1.0,
+        "latency_p50_ms": percentile(50),
+        "latency_p95_ms": percentile(95),
+        "latency_p99_ms": percentile(99),
+        "inference_queue_depth": scheduler.queue_depth,
+        "cpu_utilization": round(cpu / (elapsed * available_cores()), 3),
+    }
+
+
+def step_limit(step: dict, args) -> Optional[str]:
+    """Devolve o limite ultrapassado no degrau, ou None se ficou dentro dos limites."""
+    if step["latency_p95_ms"] is None or step["latency_p95_ms"] > args.max_latency_ms:
+        return "latency"
+    if step["drop_rate"] > args.max_drop_rate:
+        return "drop_rate"
+    return None
+
+
+def run(args) -> dict:
+    if args.no_motion_gate:
+        config.MOTION_GATE_ENABLED = False
+    fps = args.fps or clip_fps(args.clip, 25.0)
+    cores = available_cores()
+
+    detector = build_detector(args)
+    scheduler = InferenceScheduler(detector, max_batch_size=args.batch_size, max_wait_ms=args.max_wait_ms)
+    captures_dir = tempfile.mkdtemp(prefix="soak-captures-")
+    capture_store = CaptureStore(captures_dir)
+    capture_writer = CaptureWriter(capture_store, workers=config.CAPTURE_WRITER_WORKERS, jpeg_quality=config.CAPTURE_JPEG_QUALITY)
+    pipeline = {
+        "scheduler": scheduler,
+        "api_client": OfflineAPIClient(),
+        "deduplicator": SightingDeduplicator(ttl_seconds=config.DEDUP_TTL_SECONDS),
+        "capture_writer": capture_writer,
+    }
+    probe = LatencyProbe()
+    scheduler.start()
+
+    steps = []
+    capacity = 0
+    limited_by = "max_cameras"
+    cameras = args.start
+    try:
+        while cameras <= args.max_cameras:
+            step = run_step(cameras, args, pipeline, probe, fps)
+            limit = step_limit(step, args)
+            step["within_limits"] = limit is None
+            steps.append(step)
+            logger.info(
+                f"{cameras} câmeras: latência p95 {step['latency_p95_ms']} ms, "
+                f"{step['drop_rate']:.1%} descartados, CPU {step['cpu_utilization']:.0%}"
+                + (f" -> limite de {limit} ultrapassado." if limit else ".")
+            )
+            if limit:
+                limited_by = limit
+                break
+            capacity = cameras
+            cameras += args.step
+    finally:
+        scheduler.stop()
+        capture_writer.close()
+        capture_store.close()
+        shutil.rmtree(captures_dir, ignore_errors=True)
+
+    return {
+        "clip": args.clip,
+        "clip_fps": fps,
+        "cores": cores,
+        "backend": args.backend,
+        "model": args.model,
+        "ocr_model": detector.plate_recognizer.model_name,
+        "plate_localizer": args.plate_localizer or None,
+        "intra_op_threads": args.intra_op_threads,
+        "inter_op_threads": args.inter_op_threads,
+        "detector_batch_size": args.batch_size,
+        "ocr_batch_size": args.ocr_batch_size,
+        "motion_gate": config.MOTION_GATE_ENABLED,
+        "max_latency_ms": args.max_latency_ms,
+        "max_drop_rate": args.max_drop_rate,
+        "max_cameras": capacity,
+        "cameras_per_core": round(capacity / cores, 2),
+        "limited_by": limited_by,
+        # ru_maxrss vem em KiB no Linux
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "steps": steps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clip", help="Vídeo ou pasta de imagens repetido por cada câmera virtual.")
+    add_pipeline_arguments(parser)
+    parser.add_argument("--fps", type=float, default=0.0, help="Frames/s de cada câmera (0 = os do clip, ou 25).")
+    parser.add_argument("--start", type=int, default=1, help="Câmeras no primeiro degrau.")
+    parser.add_argument("--step", type=int, default=1, help="Câmeras acrescentadas por degrau.")
+    parser.add_argument("--max-cameras", type=int, default=64)
+    parser.add_argument("--step-seconds", type=float, default=30.0, help="Duração da medição de cada degrau.")
+    parser.add_argument("--settle-seconds", type=float, default=5.0, help="Espera antes de medir cada degrau.")
+    parser.add_argument("--max-latency-ms", type=float, default=1000.0, help="Limite da latência p95.")
+    parser.add_argument("--max-drop-rate", type=float, default=0.1, help="Limite da fração de frames descartados.")
+    parser.add_argument("--output", default="", help="Ficheiro onde gravar o relatório JSON (além do stdout).")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.clip):
+        raise SystemExit(f"Clip inexistente: {args.clip}")
+    if args.start < 1 or args.step < 1:
+        raise SystemExit("--start e --step têm de ser >= 1.")
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
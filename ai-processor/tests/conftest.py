@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do ai-processor são importados pelo nome, como no contentor (WORKDIR /app)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
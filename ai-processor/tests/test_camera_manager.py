@@ -0,0 +1,70 @@
+"""Testes da gestão dos pipelines das câmeras e dos comandos recebidos do backend."""
+
+from threading import Event
+
+import pytest
+
+from camera_manager import CameraManager
+
+
+class FakeGrabber:
+    def __init__(self, *_args, **_kwargs):
+        self.stopped = Event()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def run_until_stopped(camera_info, grabber):
+    grabber.stopped.wait(5)
+
+
+@pytest.fixture(name="manager")
+def manager_fixture(monkeypatch):
+    monkeypatch.setattr("camera_manager.FrameGrabber", FakeGrabber)
+    manager = CameraManager(run_until_stopped, stop_timeout=1.0)
+    yield manager
+    manager.stop_all()
+
+
+def camera(version=None, **overrides):
+    info = {"id": 1, "name": "Entrada", "rtsp_url": "rtsp://camera/1"}
+    if version is not None:
+        info["version"] = version
+    info.update(overrides)
+    return info
+
+
+def test_stale_stop_does_not_stop_a_reactivated_camera(manager):
+    manager.handle_command("start", camera(version=1))
+    manager.handle_command("stop", camera(version=2))
+    manager.handle_command("start", camera(version=3))
+
+    # 'stop' antigo reentregue pela fila
+    manager.handle_command("stop", camera(version=2))
+
+    assert list(manager.running) == [1]
+
+
+def test_stale_start_does_not_restart_a_stopped_camera(manager):
+    manager.handle_command("start", camera(version=1))
+    manager.handle_command("stop", camera(version=2))
+
+    manager.handle_command("start", camera(version=1))
+
+    assert manager.running == {}
+
+
+def test_stop_with_the_current_version_is_applied(manager):
+    # Ao apagar uma câmera ativa, o backend envia 'stop' com a versão que ela já tinha
+    manager.start_camera(camera(version=4))
+    manager.handle_command("stop", camera(version=4))
+
+    assert manager.running == {}
+
+
+def test_commands_without_version_are_always_applied(manager):
+    manager.handle_command("start", camera(version=5))
+    manager.handle_command("stop", camera())
+
+    assert manager.running == {}
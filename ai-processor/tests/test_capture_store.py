@@ -0,0 +1,104 @@
+"""Testes do armazenamento das imagens e do seu despejo por orçamento de bytes e idade."""
+
+import os
+
+import pytest
+
+import capture_store
+from capture_store import CaptureStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def clock_fixture(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(capture_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(name="store")
+def store_fixture(tmp_path, clock):
+    store = CaptureStore(str(tmp_path), evict_interval=3600)
+    yield store
+    store.close()
+
+
+def image(i: int, size: int = 100) -> bytes:
+    return bytes([i]) * size
+
+
+def test_identical_images_are_stored_once(store):
+    first = store.put(image(1), camera_id=1, plate="ABC1234")
+    second = store.put(image(1), camera_id=2, plate="ABC1234")
+
+    assert first == second
+    assert os.path.exists(first)
+    assert store.stats()["files"] == 1
+    assert store.stats()["total_bytes"] == 100
+    assert store.deduplicated == 1
+
+
+def test_index_survives_reopening(tmp_path, store):
+    store.put(image(1))
+    store.put(image(2))
+    store.close()
+
+    reopened = CaptureStore(str(tmp_path))
+    assert (reopened.files, reopened.total_bytes) == (2, 200)
+    reopened.close()
+
+
+def test_byte_budget_evicts_least_recently_used(store):
+    paths = [store.put(image(i)) for i in range(5)]
+    # Voltar a ver a primeira imagem renova o seu último uso
+    store.put(image(0))
+
+    store.max_bytes = 300
+    store.evict()
+
+    assert store.total_bytes == 300
+    assert store.evicted == 2
+    assert [os.path.exists(p) for p in paths] == [True, False, False, True, True]
+
+
+def test_max_age_evicts_old_images(store, clock):
+    old = store.put(image(1))
+    clock.now += 100
+    recent = store.put(image(2))
+
+    store.max_age_seconds = 50
+    store.evict()
+
+    assert not os.path.exists(old)
+    assert os.path.exists(recent)
+    assert store.files == 1
+
+
+def test_eviction_ends_when_files_cannot_be_removed(store, monkeypatch):
+    paths = [store.put(image(i)) for i in range(6)]
+    monkeypatch.setattr(capture_store, "_EVICT_CHUNK", 2)
+    real_remove = os.remove
+    stuck = set(paths[:3])
+
+    def remove(path):
+        if path in stuck:
+            raise PermissionError(path)
+        real_remove(path)
+
+    monkeypatch.setattr(capture_store.os, "remove", remove)
+    store.max_bytes = 100
+    store.max_age_seconds = 1
+    store.evict()
+
+    # As imagens que não se apagam ficam no índice; as restantes saem para cumprir o orçamento
+    assert store.files == 3
+    assert all(os.path.exists(p) for p in stuck)
+    assert not any(os.path.exists(p) for p in paths[3:])
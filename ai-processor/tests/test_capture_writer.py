@@ -0,0 +1,40 @@
+"""Testes do estágio assíncrono de codificação e gravação das imagens."""
+
+import numpy as np
+import pytest
+
+from capture_store import CaptureStore
+from capture_writer import CaptureWriter
+
+
+@pytest.fixture(name="store")
+def store_fixture(tmp_path):
+    store = CaptureStore(str(tmp_path), evict_interval=3600)
+    yield store
+    store.close()
+
+
+def test_encoded_image_is_stored_and_handed_over(store):
+    writer = CaptureWriter(store)
+    results = []
+
+    writer.submit(1, "ABC1234", np.zeros((20, 40, 3), dtype=np.uint8), lambda *args: results.append(args))
+    writer.close()
+
+    ((image_path, image_bytes),) = results
+    assert image_bytes.startswith(b"\xff\xd8")
+    with open(image_path, "rb") as f:
+        assert f.read() == image_bytes
+
+
+def test_full_queue_sends_the_sighting_without_image(store):
+    # Sem threads ninguém esvazia a fila: o segundo recorte já não cabe
+    writer = CaptureWriter(store, workers=0, queue_size=1, submit_timeout=0.01)
+    results = []
+    crop = np.zeros((20, 40, 3), dtype=np.uint8)
+
+    writer.submit(1, "ABC1234", crop, lambda *args: results.append(args))
+    writer.submit(1, "XYZ9876", crop, lambda *args: results.append(args))
+
+    assert results == [(None, None)]
+    assert writer.captures_dropped == 1
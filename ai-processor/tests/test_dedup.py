@@ -0,0 +1,72 @@
+"""Testes do deduplicador de avistamentos (TTL, LRU e distância de edição 1)."""
+
+import pytest
+
+from dedup import SightingDeduplicator, normalize_plate, within_one_edit
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        ("ABC1234", "ABC1234", True),
+        ("ABC1234", "ABC1284", True),  # substituição
+        ("ABC1234", "ABC123", True),  # remoção
+        ("ABC1234", "ABXC1234", True),  # inserção
+        ("ABC1234", "ABC1289", False),
+        ("ABC1234", "ABC12", False),
+        ("ABC1234", "BAC1234", False),
+    ],
+)
+def test_within_one_edit(a, b, expected):
+    assert within_one_edit(a, b) is expected
+    assert within_one_edit(b, a) is expected
+
+
+def test_normalize_plate():
+    assert normalize_plate("abc-1234 ") == "ABC1234"
+
+
+def test_duplicates_within_ttl_are_suppressed():
+    dedup = SightingDeduplicator(ttl_seconds=30)
+    assert dedup.should_send(1, "ABC1234", now=0.0)
+    assert not dedup.should_send(1, "abc-1234", now=10.0)
+    # Um carácter de diferença conta como a mesma placa
+    assert not dedup.should_send(1, "ABC1284", now=20.0)
+    assert dedup.suppressed == 2
+
+
+def test_same_plate_on_another_camera_is_sent():
+    dedup = SightingDeduplicator(ttl_seconds=30)
+    assert dedup.should_send(1, "ABC1234", now=0.0)
+    assert dedup.should_send(2, "ABC1234", now=1.0)
+
+
+def test_plate_is_sent_again_after_ttl():
+    dedup = SightingDeduplicator(ttl_seconds=30)
+    assert dedup.should_send(1, "ABC1234", now=0.0)
+    assert dedup.should_send(1, "ABC1234", now=31.0)
+
+
+def test_repeated_sightings_renew_ttl():
+    dedup = SightingDeduplicator(ttl_seconds=30)
+    assert dedup.should_send(1, "ABC1234", now=0.0)
+    assert not dedup.should_send(1, "ABC1234", now=25.0)
+    assert not dedup.should_send(1, "ABC1234", now=50.0)
+
+
+def test_fuzzy_matching_can_be_disabled():
+    dedup = SightingDeduplicator(ttl_seconds=30, fuzzy=False)
+    assert dedup.should_send(1, "ABC1234", now=0.0)
+    assert dedup.should_send(1, "ABC1284", now=1.0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    dedup = SightingDeduplicator(ttl_seconds=30, max_entries=2, fuzzy=False)
+    assert dedup.should_send(1, "AAA1111", now=0.0)
+    assert dedup.should_send(1, "BBB2222", now=1.0)
+    # Renova a primeira: a menos usada passa a ser a segunda
+    assert not dedup.should_send(1, "AAA1111", now=2.0)
+    assert dedup.should_send(1, "CCC3333", now=3.0)
+
+    assert not dedup.should_send(1, "AAA1111", now=4.0)
+    assert dedup.should_send(1, "BBB2222", now=5.0)
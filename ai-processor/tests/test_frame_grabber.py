@@ -0,0 +1,61 @@
+"""Testes do FrameGrabber quando a fonte deixa de abrir."""
+
+import numpy as np
+
+from frame_grabber import FrameGrabber
+from frame_source import FFmpegSource
+
+
+class FlakySource:
+    """Fonte que suporta keyframes e só abre `opens` vezes; fechada, `read` devolve None."""
+
+    supports_keyframes_only = True
+
+    def __init__(self, opens: int):
+        self.keyframes_only = False
+        self.opens_left = opens
+        self.is_open = False
+
+    def open(self) -> bool:
+        self.is_open = self.opens_left > 0
+        self.opens_left -= 1
+        return self.is_open
+
+    def read(self):
+        return np.zeros((4, 4, 3), dtype=np.uint8) if self.is_open else None
+
+    def close(self):
+        self.is_open = False
+
+
+def test_failed_reopen_on_keyframe_switch_stops_grabber():
+    source = FlakySource(opens=1)
+    # Sem consumidor todos os frames menos o último são descartados: passa logo a keyframes
+    grabber = FrameGrabber(
+        "rtsp://camera", "camera", reconnect_delay=0.01,
+        source_factory=lambda url: source, overload_drop_ratio=0.5, overload_window=0.0,
+    )
+    grabber.start()
+    grabber.join(timeout=5)
+
+    assert not grabber.is_alive()
+    assert grabber.stopped
+    assert grabber.keyframe_switches == 1
+    assert grabber.reconnects == 1
+
+
+def test_grabber_stops_when_source_raises():
+    class BrokenSource(FlakySource):
+        def read(self):
+            raise RuntimeError("descodificador avariado")
+
+    grabber = FrameGrabber("rtsp://camera", "camera", source_factory=lambda url: BrokenSource(opens=1))
+    grabber.start()
+    grabber.join(timeout=5)
+
+    assert grabber.stopped
+    assert grabber.read(timeout=0.1) is None
+
+
+def test_closed_ffmpeg_source_reads_none():
+    assert FFmpegSource("rtsp://camera").read() is None
@@ -0,0 +1,49 @@
+"""Testes da fusão temporal das leituras de OCR."""
+
+import pytest
+
+from ocr_fusion import PlateFusion
+
+
+def test_votes_are_weighted_by_char_confidence():
+    fusion = PlateFusion()
+    fusion.add("ABC1234", [0.9] * 7)
+    # Leitura errada no último carácter, mas com pouca confiança nele
+    fusion.add("ABC1238", [0.9] * 6 + [0.2])
+    fusion.add("A8C1234", [0.9, 0.3] + [0.9] * 5)
+
+    plate, confidence = fusion.result()
+    assert plate == "ABC1234"
+    assert fusion.reads == 3
+    # Slots unânimes valem 0.9; os dois slots disputados valem 1.8 / 3
+    assert confidence == pytest.approx((5 * 0.9 + 2 * 0.6) / 7)
+
+
+def test_majority_wins_without_confidences():
+    fusion = PlateFusion()
+    for plate in ("XYZ987", "XYZ981", "XYZ987"):
+        fusion.add(plate)
+    assert fusion.result() == ("XYZ987", pytest.approx(5 / 6 + 1 / 6 * 2 / 3))
+
+
+def test_pad_chars_are_stripped():
+    fusion = PlateFusion(pad_char="_")
+    fusion.add("AB123__")
+    fusion.add("AB123__")
+    assert fusion.result() == ("AB123", pytest.approx(1.0))
+
+
+def test_reads_of_different_lengths():
+    fusion = PlateFusion()
+    fusion.add("AB12")
+    fusion.add("AB123")
+    fusion.add("AB123")
+    assert fusion.result()[0] == "AB123"
+
+
+@pytest.mark.parametrize("reads", [[], [""], ["___"]])
+def test_no_plate(reads):
+    fusion = PlateFusion(pad_char="_")
+    for plate in reads:
+        fusion.add(plate)
+    assert fusion.result() == (None, 0.0)
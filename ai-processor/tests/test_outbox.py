@@ -0,0 +1,62 @@
+"""Testes da outbox persistente de avistamentos."""
+
+import sqlite3
+
+from outbox import SightingOutbox
+
+
+def make_sighting(plate="ABC1234", **overrides):
+    sighting = {
+        "plate": plate,
+        "camera_id": 1,
+        "image_filename": "/nao/existe.jpg",
+        "image_bytes": None,
+        "captured_at": 1000.0,
+        "idempotency_key": f"key-{plate}",
+    }
+    sighting.update(overrides)
+    return sighting
+
+
+def test_peek_keeps_the_idempotency_key(tmp_path):
+    outbox = SightingOutbox(str(tmp_path / "outbox.db"))
+    outbox.append([make_sighting("ABC1234"), make_sighting("XYZ9876")])
+
+    pending = outbox.peek(10)
+
+    assert [s["idempotency_key"] for s in pending] == ["key-ABC1234", "key-XYZ9876"]
+    outbox.remove([s["outbox_id"] for s in pending])
+    assert outbox.backlog == 0
+
+
+def test_outbox_from_previous_version_is_migrated(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, plate TEXT NOT NULL, "
+        "camera_id INTEGER NOT NULL, image_path TEXT NOT NULL, image_bytes BLOB, "
+        "image_size INTEGER NOT NULL DEFAULT 0, captured_at REAL NOT NULL, queued_at REAL NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO outbox (plate, camera_id, image_path, captured_at, queued_at) VALUES ('OLD0001', 1, 'x.jpg', 1, 1)"
+    )
+    conn.commit()
+    conn.close()
+
+    outbox = SightingOutbox(path)
+    outbox.append([make_sighting()])
+
+    assert [s["idempotency_key"] for s in outbox.peek(10)] == [None, "key-ABC1234"]
+
+
+def test_image_survives_eviction_from_the_capture_store(tmp_path):
+    image = tmp_path / "capture.jpg"
+    image.write_bytes(b"jpeg")
+    outbox = SightingOutbox(str(tmp_path / "outbox.db"))
+    outbox.append([make_sighting(image_filename=str(image))])
+
+    image.unlink()
+
+    (pending,) = outbox.peek(10)
+    assert pending["image_bytes"] == b"jpeg"
+    assert outbox.stats()["pending_bytes"] == 4
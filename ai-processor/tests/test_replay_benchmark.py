@@ -0,0 +1,69 @@
+"""Testes do replay offline: o pipeline completo com o detector envolvido pelo contador de placas."""
+
+import cv2
+import numpy as np
+import pytest
+
+from capture_store import CaptureStore
+from capture_writer import CaptureWriter
+from frame_source import ImageFolderSource
+from inference_scheduler import InferenceScheduler
+from main import process_camera_stream
+from replay_benchmark import OfflineAPIClient, PlateCountingDetector, ReplayGrabber
+
+
+class FakePlateDetector:
+    """Lê sempre a mesma placa num veículo ao centro de cada frame."""
+
+    pad_char = "_"
+
+    def detect_and_recognize_batch(self, frames, camera_ids, rois=None):
+        return [
+            [{"bbox": (10, 10, 50, 50), "crop": frame[10:50, 10:50], "plate": "ABC1234__", "char_probs": [0.9] * 9}]
+            for frame in frames
+        ]
+
+
+@pytest.fixture(name="frames_dir")
+def frames_dir_fixture(tmp_path):
+    frames = tmp_path / "frames"
+    frames.mkdir()
+    for i in range(3):
+        cv2.imwrite(str(frames / f"{i:03d}.png"), np.full((64, 64, 3), i * 40, dtype=np.uint8))
+    return frames
+
+
+def test_counting_detector_delegates_to_wrapped_detector():
+    counting = PlateCountingDetector(FakePlateDetector())
+    assert counting.pad_char == "_"
+    with pytest.raises(AttributeError):
+        counting.missing_attribute
+
+
+def test_process_camera_stream_with_counting_detector(tmp_path, frames_dir, monkeypatch):
+    monkeypatch.setattr("config.MOTION_GATE_ENABLED", False)
+    detector = PlateCountingDetector(FakePlateDetector())
+    scheduler = InferenceScheduler(detector, max_batch_size=4, max_wait_ms=1)
+    store = CaptureStore(str(tmp_path / "captures"))
+    writer = CaptureWriter(store, workers=1)
+    api_client = OfflineAPIClient()
+    grabber = ReplayGrabber(ImageFolderSource(str(frames_dir)), "replay", fps=25)
+
+    scheduler.start()
+    try:
+        process_camera_stream(
+            {"id": 1, "name": "replay", "rtsp_url": str(frames_dir)},
+            scheduler=scheduler,
+            api_client=api_client,
+            grabber=grabber,
+            capture_writer=writer,
+        )
+        writer.close()
+    finally:
+        scheduler.stop()
+        store.close()
+
+    assert scheduler.frames_processed == 3
+    assert detector.plates_read == 3
+    assert [s["plate"] for s in api_client.sightings] == ["ABC1234"]
+    assert api_client.sightings[0]["has_image"]
@@ -0,0 +1,47 @@
+"""Testes da zona de deteção (polígono) de uma câmera."""
+
+import numpy as np
+import pytest
+
+from roi import RegionOfInterest, build_roi
+
+
+def test_crop_is_the_polygon_bounding_rectangle():
+    roi = RegionOfInterest([(0.25, 0.5), (0.75, 0.5), (0.75, 1.0), (0.25, 1.0)])
+    frame = np.zeros((200, 400, 3), dtype=np.uint8)
+
+    crop, offset = roi.crop(frame)
+
+    assert offset == (100, 100)
+    assert crop.shape == (100, 200, 3)
+    # Vista do frame, sem cópia
+    assert np.shares_memory(crop, frame)
+
+
+def test_filter_keeps_boxes_centered_inside_polygon():
+    # Triângulo na metade esquerda de baixo: (0, 0.5), (0.5, 1), (0, 1)
+    roi = RegionOfInterest([(0.0, 0.5), (0.5, 1.0), (0.0, 1.0)])
+    frame_shape = (100, 100, 3)
+    _, offset = roi.crop(np.zeros(frame_shape, dtype=np.uint8))
+    assert offset == (0, 50)
+
+    inside = (0, 30, 20, 50)  # centro (10, 90) no frame
+    outside = (30, 0, 50, 20)  # centro (40, 60): dentro do retângulo, fora do triângulo
+    kept = roi.filter([inside, outside], frame_shape, offset)
+
+    assert kept == [(0, 80, 20, 100)]
+
+
+def test_polygon_is_clipped_to_the_frame():
+    roi = RegionOfInterest([(-0.5, -0.5), (1.5, 0.0), (0.5, 1.5)])
+    assert roi.bounds == (0.0, 0.0, 1.0, 1.0)
+
+
+def test_polygon_needs_three_points():
+    with pytest.raises(ValueError):
+        RegionOfInterest([(0.0, 0.0), (1.0, 1.0)])
+
+
+def test_build_roi():
+    assert build_roi({"id": 1}) is None
+    assert build_roi({"roi_polygon": [(0, 0), (1, 0), (1, 1)]}) is not None
@@ -0,0 +1,72 @@
+"""Testes do tracker de veículos por IoU."""
+
+import numpy as np
+import pytest
+
+from tracker import VehicleTracker, iou_matrix
+
+
+def test_iou_matrix():
+    boxes_a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    boxes_b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=np.float32)
+    assert iou_matrix(boxes_a, boxes_b)[0] == pytest.approx([1.0, 50 / 150, 0.0])
+
+
+def test_overlapping_detections_keep_their_tracks():
+    tracker = VehicleTracker(iou_threshold=0.3)
+    tracker.update([{"bbox": (0, 0, 100, 100)}, {"bbox": (300, 300, 400, 400)}], timestamp=0.0)
+    ids = {t.bbox: t.track_id for t in tracker.tracks}
+
+    # Os dois veículos andam um pouco; a ordem das detecções troca
+    tracker.update([{"bbox": (310, 305, 410, 405)}, {"bbox": (10, 5, 110, 105)}], timestamp=0.1)
+
+    assert len(tracker.tracks) == 2
+    by_id = {t.track_id: t.bbox for t in tracker.tracks}
+    assert by_id[ids[(0, 0, 100, 100)]] == (10, 5, 110, 105)
+    assert by_id[ids[(300, 300, 400, 400)]] == (310, 305, 410, 405)
+    assert all(t.hits == 2 for t in tracker.tracks)
+
+
+def test_distant_detection_starts_new_track():
+    tracker = VehicleTracker(iou_threshold=0.3, max_centroid_shift=1.0)
+    tracker.update([{"bbox": (0, 0, 100, 100)}], timestamp=0.0)
+    tracker.update([{"bbox": (500, 500, 600, 600)}], timestamp=0.1)
+    assert [t.track_id for t in tracker.tracks] == [1, 2]
+
+
+def test_centroid_fallback_for_fast_vehicles():
+    tracker = VehicleTracker(iou_threshold=0.3, max_centroid_shift=1.0)
+    tracker.update([{"bbox": (0, 0, 100, 100)}], timestamp=0.0)
+    # Sem sobreposição, mas o centróide andou menos de uma diagonal
+    tracker.update([{"bbox": (110, 0, 210, 100)}], timestamp=0.1)
+    assert [t.track_id for t in tracker.tracks] == [1]
+
+
+def test_track_expires_and_is_emitted_once():
+    tracker = VehicleTracker(max_age=2.0, stable_reads=5)
+    assert tracker.update([{"bbox": (0, 0, 100, 100), "plate": "ABC1234"}], timestamp=0.0) == []
+
+    # Ainda dentro de max_age: nada a emitir
+    assert tracker.update([], timestamp=1.5) == []
+    emitted = tracker.update([], timestamp=2.5)
+
+    assert [t.plate for t in emitted] == ["ABC1234"]
+    assert tracker.tracks == []
+    assert tracker.update([], timestamp=5.0) == []
+
+
+def test_track_without_plate_expires_silently():
+    tracker = VehicleTracker(max_age=1.0)
+    tracker.update([{"bbox": (0, 0, 100, 100)}], timestamp=0.0)
+    assert tracker.update([], timestamp=2.0) == []
+    assert tracker.tracks == []
+
+
+def test_stable_track_is_emitted_before_expiring():
+    tracker = VehicleTracker(stable_reads=3, stable_confidence=0.8)
+    detection = {"bbox": (0, 0, 100, 100), "plate": "ABC1234", "char_probs": [0.9] * 7}
+    emitted = [tracker.update([detection], timestamp=i * 0.1) for i in range(4)]
+
+    assert [len(e) for e in emitted] == [0, 0, 1, 0]
+    assert emitted[2][0].confidence == pytest.approx(0.9)
+    assert tracker.flush() == []
@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread, Timer, current_thread, get_ident, local
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "sampled", "start")
+
+    def __init__(self, tracer: "SpanTracer", name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        state = self.tracer._local
+        depth = getattr(state, "depth", 0)
+        if depth == 0:
+            # A amostragem decide-se no span exterior de cada thread; os interiores seguem-no
+            state.sampled = random.random() < self.tracer.sample_rate
+        state.depth = depth + 1
+        self.sampled = state.sampled
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer._local.depth -= 1
+        if self.sampled:
+            self.tracer._record(self.name, self.start, end - self.start, self.args)
+        return False
+
+
+class SpanTracer:
+    """
+    Perfil por etapas do pipeline (descodificação, deteção, recorte, OCR, codificação, envio)
+    exportado em formato Chrome trace / Perfetto (abrir em ui.perfetto.dev ou chrome://tracing).
+
+    Fica desligado até ser pedido (SIGUSR1 ou HTTP): nesse estado cada `span` custa só uma
+    verificação. Durante uma captura, cada span exterior de uma thread (um frame de uma câmera,
+    um lote do detector, um lote do OCR...) é registado com probabilidade `sample_rate`, junto
+    com todos os spans aninhados. Os eventos ficam num buffer circular de `max_events`.
+    """
+
+    def __init__(self, sample_rate: float = 0.1, max_events: int = 200_000, output_dir: str = "traces"):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.logger = logging.getLogger(__name__)
+        self.active = False
+        self._events: deque = deque(maxlen=max_events)
+        self._threads: dict = {}
+        self._local = local()
+        self._origin = time.perf_counter_ns()
+        self._lock = Lock()
+        self._timer: Optional[Timer] = None
+
+    def configure(self, sample_rate: float, max_events: int, output_dir: str):
+        with self._lock:
+            self.sample_rate = sample_rate
+            self.output_dir = output_dir
+            self._events = deque(maxlen=max_events)
+
+    def span(self, name: str, **args):
+        """Context manager que mede uma etapa; `args` aparecem no detalhe do evento."""
+        if not self.active:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    @property
+    def buffer_full(self) -> bool:
+        """True se o buffer encheu e os spans mais antigos da captura se perderam."""
+        return len(self._events) == self._events.maxlen
+
+    def _record(self, name: str, start: int, duration: int, args: dict):
+        tid = get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = current_thread().name
+        self._events.append((name, start, duration, tid, args))
+
+    def start(self, seconds: float = 0.0) -> bool:
+        """
+        Começa uma captura. Com `seconds` > 0 pára sozinha ao fim desse tempo e grava o
+        ficheiro. Devolve False se já houver uma captura a decorrer.
+        """
+        with self._lock:
+            if self.active:
+                return False
+            self._events.clear()
+            self._threads.clear()
+            self._origin = time.perf_counter_ns()
+            self.active = True
+            if seconds > 0:
+                self._timer = Timer(seconds, self._stop_and_save)
+                self._timer.daemon = True
+                self._timer.start()
+        self.logger.info(f"Captura de trace iniciada (amostragem {self.sample_rate:.0%}).")
+        return True
+
+    def stop(self) -> Optional[dict]:
+        """Termina a captura e devolve o trace, ou None se não havia nenhuma a decorrer."""
+        with self._lock:
+            if not self.active:
+                return None
+            self.active = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return self.export()
+
+    def export(self) -> dict:
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "ai-processor"}}]
+        events += [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        for name, start, duration, tid, args in list(self._events):
+            event = {
+                "name": name,
+                "cat": name.split(".")[0],
+                "ph": "X",
+                "ts": (start - self._origin) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, trace: dict) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}"
+        path = os.path.join(self.output_dir, f"trace-{stamp}.json")
+        with open(path, "w") as f:
+            json.dump(trace, f)
+        spans = sum(1 for event in trace["traceEvents"] if event["ph"] == "X")
+        self.logger.info(f"Trace com {spans} spans gravado em {path}.")
+        return path
+
+    def _stop_and_save(self):
+        trace = self.stop()
+        if trace is not None:
+            self.save(trace)
+
+    def toggle(self, seconds: float = 0.0):
+        """Liga a captura ou, se já estiver ligada, termina-a e grava o ficheiro (SIGUSR1)."""
+        if self.active:
+            self._stop_and_save()
+        else:
+            self.start(seconds)
+
+
+# Partilhado por todos os módulos do pipeline, tal como as métricas
+TRACER = SpanTracer()
+
+
+class _TraceHandler(BaseHTTPRequestHandler):
+    tracer: SpanTracer = TRACER
+    default_seconds = 10.0
+
+    def _reply(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            seconds = float(parse_qs(url.query).get("seconds", ["0"])[0])
+        except ValueError:
+            self._reply(400, {"error": "Parâmetro 'seconds' inválido."})
+            return
+
+        if url.path == "/trace/start":
+            if not self.tracer.start(seconds):
+                self._reply(409, {"error": "Já há uma captura a decorrer."})
+                return
+            self._reply(200, {"tracing": True, "seconds": seconds or None})
+        elif url.path == "/trace/stop":
+            trace = self.tracer.stop()
+            if trace is None:
+                self._reply(409, {"error": "Nenhuma captura a decorrer."})
+                return
+            self.tracer.save(trace)
+            self._reply(200, trace)
+        elif url.path == "/trace":
+            # Captura durante `seconds` e devolve o trace na resposta (ex.: curl ... > trace.json)
+            if not self.tracer.start():
+                self._reply(409, {"error": "Já há uma captura a decorrer."})
+                return
+            time.sleep(seconds or self.default_seconds)
+            self._reply(200, self.tracer.stop() or {"traceEvents": []})
+        else:
+            self._reply(404, {"error": "Use /trace, /trace/start ou /trace/stop."})
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+
+def start_trace_server(port: int, tracer: SpanTracer = TRACER) -> ThreadingHTTPServer:
+    """Serve /trace, /trace/start e /trace/stop numa thread própria."""
+    handler = type("TraceHandler", (_TraceHandler,), {"tracer": tracer})
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, name="trace-server", daemon=True).start()
+    logging.getLogger(__name__).info(f"Captura de traces disponível em :{port}/trace.")
+    return server
@@ -0,0 +1,167 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ocr_fusion import PlateFusion
+
+
+@dataclass
+class Track:
+    """Um veículo seguido ao longo de vários frames de uma câmera."""
+
+    track_id: int
+    bbox: tuple
+    first_seen: float
+    last_seen: float
+    hits: int = 1
+    fusion: PlateFusion = field(default_factory=PlateFusion)
+    best_crop: Optional[np.ndarray] = None
+    best_crop_score: float = -1.0
+    emitted: bool = False
+
+    def add_read(self, plate: str, crop: Optional[np.ndarray], char_probs: Optional[Sequence[float]] = None):
+        if not plate:
+            return
+        self.fusion.add(plate, char_probs)
+        # Guarda o recorte da leitura em que o OCR teve mais confiança
+        score = float(np.mean(char_probs)) if char_probs is not None else 0.0
+        if crop is not None and (score > self.best_crop_score or self.best_crop is None):
+            # Cópia para não manter o frame inteiro em memória através da vista
+            self.best_crop = crop.copy()
+            self.best_crop_score = score
+
+    @property
+    def plate(self) -> Optional[str]:
+        """Placa resultante da fusão de todas as leituras deste track."""
+        return self.fusion.result()[0]
+
+    @property
+    def confidence(self) -> float:
+        return self.fusion.result()[1]
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """IoU entre todas as caixas (x1, y1, x2, y2) de `boxes_a` e de `boxes_b`."""
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+class VehicleTracker:
+    """
+    Tracker multi-objeto simples por IoU, com recurso à distância entre centróides.
+
+    As caixas vindas do `PlateDetector` são associadas aos tracks existentes de forma gulosa
+    (maior IoU primeiro). Quando a IoU não chega — por exemplo, carros rápidos em câmeras de
+    poucos FPS — aceita-se a caixa cujo centróide esteja a menos de `max_centroid_shift`
+    diagonais do track. Cada track funde as leituras de placa (ver `PlateFusion`) e é emitido
+    uma única vez: quando já tem `stable_reads` leituras com confiança fundida de pelo menos
+    `stable_confidence`, ou quando o veículo desaparece durante mais de `max_age` segundos.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_centroid_shift: float = 1.0,
+        max_age: float = 2.0,
+        stable_reads: int = 5,
+        stable_confidence: float = 0.8,
+        pad_char: str = "_",
+    ):
+        self.iou_threshold = iou_threshold
+        self.max_centroid_shift = max_centroid_shift
+        self.max_age = max_age
+        self.stable_reads = stable_reads
+        self.stable_confidence = stable_confidence
+        self.pad_char = pad_char
+        self.tracks: List[Track] = []
+        self._next_id = 1
+
+    def _match(self, boxes: np.ndarray) -> dict:
+        """Devolve {índice da detecção: track} para as detecções associadas."""
+        if not self.tracks or not len(boxes):
+            return {}
+
+        track_boxes = np.array([t.bbox for t in self.tracks], dtype=np.float32)
+        scores = iou_matrix(track_boxes, boxes)
+
+        # Distância entre centróides normalizada pela diagonal do track
+        track_centers = (track_boxes[:, :2] + track_boxes[:, 2:]) / 2
+        det_centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        diagonals = np.linalg.norm(track_boxes[:, 2:] - track_boxes[:, :2], axis=1)
+        shift = np.linalg.norm(track_centers[:, None] - det_centers[None], axis=2) / np.maximum(diagonals[:, None], 1e-9)
+        # Pares sem IoU suficiente mas próximos valem menos que qualquer par com IoU válida
+        fallback = (scores < self.iou_threshold) & (shift < self.max_centroid_shift)
+        scores = np.where(fallback, self.iou_threshold * (1 - shift / self.max_centroid_shift) * 0.99, scores)
+        scores = np.where((scores >= self.iou_threshold) | fallback, scores, 0)
+
+        matches = {}
+        used_tracks = set()
+        for flat_idx in np.argsort(scores, axis=None)[::-1]:
+            t_idx, d_idx = np.unravel_index(flat_idx, scores.shape)
+            if scores[t_idx, d_idx] <= 0:
+                break
+            if t_idx in used_tracks or d_idx in matches:
+                continue
+            used_tracks.add(t_idx)
+            matches[d_idx] = self.tracks[t_idx]
+        return matches
+
+    def update(self, detections: list, timestamp: float) -> List[Track]:
+        """
+        Atualiza os tracks com as detecções de um frame e devolve os tracks a emitir.
+
+        Cada detecção é um dict com 'bbox' (x1, y1, x2, y2) e, opcionalmente, 'plate', 'crop'
+        e 'char_probs' (confiança do OCR por carácter).
+        Pode ser chamado com uma lista vazia para fazer expirar tracks quando não há frames
+        processados (por exemplo, cena estática).
+        """
+        boxes = np.array([d["bbox"] for d in detections], dtype=np.float32).reshape(-1, 4)
+        matches = self._match(boxes)
+
+        for d_idx, detection in enumerate(detections):
+            track = matches.get(d_idx)
+            if track is None:
+                track = Track(
+                    track_id=self._next_id,
+                    bbox=tuple(detection["bbox"]),
+                    first_seen=timestamp,
+                    last_seen=timestamp,
+                    fusion=PlateFusion(self.pad_char),
+                )
+                self._next_id += 1
+                self.tracks.append(track)
+            else:
+                track.bbox = tuple(detection["bbox"])
+                track.last_seen = timestamp
+                track.hits += 1
+            track.add_read(detection.get("plate"), detection.get("crop"), detection.get("char_probs"))
+
+        to_emit = []
+        alive = []
+        for track in self.tracks:
+            expired = timestamp - track.last_seen > self.max_age
+            plate, confidence = track.fusion.result()
+            stable = track.fusion.reads >= self.stable_reads and confidence >= self.stable_confidence
+            if not track.emitted and plate and (expired or stable):
+                track.emitted = True
+                to_emit.append(track)
+            if not expired:
+                alive.append(track)
+        self.tracks = alive
+        return to_emit
+
+    def flush(self) -> List[Track]:
+        """Termina todos os tracks (fim do stream) e devolve os que ainda não foram emitidos."""
+        to_emit = [t for t in self.tracks if not t.emitted and t.plate]
+        for track in to_emit:
+            track.emitted = True
+        self.tracks = []
+        return to_emit
@@ -0,0 +1,11 @@
+import os
+from .config import settings
+
+def save_capture(filename: str, data: bytes) -> str:
+    """Grava uma imagem capturada em CAPTURES_DIR e devolve o nome com que ficou."""
+    # Apenas o nome do ficheiro, para não permitir escrever fora de CAPTURES_DIR
+    filename = os.path.basename(filename)
+    os.makedirs(settings.CAPTURES_DIR, exist_ok=True)
+    with open(os.path.join(settings.CAPTURES_DIR, filename), "wb") as f:
+        f.write(data)
+    return filename
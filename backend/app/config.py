@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -50,5 +51,16 @@ class Settings(BaseSettings):
     RABBITMQ_DEFAULT_PASS: str = "password"
     RABBITMQ_HOST: str = "gt-vision-rabbitmq"
 
+    # Chave partilhada com o AI-Processor para as rotas internas
+    ADMIN_API_KEY: Optional[str] = None
+
+    # Ingestão de avistamentos em lote
+    CAPTURES_DIR: str = "/app/captures"
+    SIGHTINGS_BULK_MAX_ITEMS: int = 500
+
+    # Consumidor de avistamentos do RabbitMQ: um INSERT por lote de mensagens
+    SIGHTINGS_CONSUMER_BATCH_SIZE: int = 200
+    SIGHTINGS_CONSUMER_BATCH_WAIT_SECONDS: float = 0.5
+
 # Instância única que será usada em toda a aplicação
 settings = Settings()
\ No newline at end of file
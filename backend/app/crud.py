@@ -1,8 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func
-from datetime import datetime, time
-from typing import Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime, time, timezone
+from typing import List, Optional
 
 from . import models, schemas, security
 
@@ -88,6 +89,7 @@ async def update_camera(db: AsyncSession, camera: models.Camera, update_data: sc
     update_data_dict = update_data.dict(exclude_unset=True)
     for key, value in update_data_dict.items():
         setattr(camera, key, value)
+    camera.version = models.Camera.version + 1
 
     await db.commit()
     await db.refresh(camera)
@@ -111,6 +113,37 @@ async def create_vehicle_sighting(db: AsyncSession, sighting: schemas.VehicleSig
     await db.refresh(db_sighting)
     return db_sighting
 
+async def create_vehicle_sightings_bulk(db: AsyncSession, sightings: List[schemas.VehicleSightingBulkItem]) -> int:
+    """
+    Insere um lote de detecções com um único INSERT multi-linha e um único commit. As linhas
+    cuja `idempotency_key` já existe são ignoradas; devolve o número de linhas inseridas.
+    """
+    if not sightings:
+        return 0
+    now = datetime.utcnow()
+    rows = []
+    for s in sightings:
+        timestamp = s.timestamp or now
+        # A coluna guarda UTC sem fuso horário
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        rows.append({
+            "license_plate": s.license_plate,
+            "image_filename": s.image_filename,
+            "camera_id": s.camera_id,
+            "timestamp": timestamp,
+            "idempotency_key": s.idempotency_key,
+        })
+    statement = pg_insert(models.VehicleSighting).values(rows).on_conflict_do_nothing(index_elements=["idempotency_key"])
+    result = await db.execute(statement)
+    await db.commit()
+    return result.rowcount
+
+async def get_existing_camera_ids(db: AsyncSession, camera_ids: List[int]) -> set:
+    """Devolve, de entre os IDs indicados, os que correspondem a câmeras existentes."""
+    result = await db.execute(select(models.Camera.id).filter(models.Camera.id.in_(camera_ids)))
+    return set(result.scalars().all())
+
 async def get_sightings_by_client(db: AsyncSession, client_id: int, skip: int = 0, limit: int = 100):
     """Lista as detecções de um cliente específico."""
     result = await db.execute(
@@ -1,6 +1,7 @@
-from typing import AsyncGenerator
+import secrets
+from typing import AsyncGenerator, Optional
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,6 +11,7 @@ from .database import SessionLocal # <-- CORRIGIDO AQUI
 from .config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as db: # <-- CORRIGIDO AQUI
@@ -40,4 +42,17 @@ async def get_current_user(
     user = await crud.get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    return user
+
+async def verify_internal_api_key(api_key: Optional[str] = Depends(api_key_header)) -> None:
+    """Protege as rotas usadas pelo AI-Processor; sem ADMIN_API_KEY configurada ficam fechadas."""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Internal API key is not configured",
+        )
+    if api_key is None or not secrets.compare_digest(api_key, settings.ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+        )
@@ -9,11 +9,19 @@ logger = logging.getLogger(__name__)
 
 QUEUE_NAME = 'camera_processing_queue'
 
+# Avistamentos publicados pelo AI-Processor e consumidos em lote pelo sightings_consumer
+SIGHTINGS_EXCHANGE = 'sightings'
+SIGHTINGS_QUEUE = 'sightings_ingest_queue'
+SIGHTINGS_ROUTING_KEY = 'sighting.created'
+
 def get_rabbitmq_connection():
     """Cria e retorna uma conexão com o RabbitMQ."""
     try:
         connection = pika.BlockingConnection(
-            pika.ConnectionParameters(host=settings.RABBITMQ_HOST)
+            pika.ConnectionParameters(
+                host=settings.RABBITMQ_HOST,
+                credentials=pika.PlainCredentials(settings.RABBITMQ_DEFAULT_USER, settings.RABBITMQ_DEFAULT_PASS),
+            )
         )
         logger.info("Conexão com RabbitMQ estabelecida com sucesso.")
         return connection
@@ -21,12 +29,18 @@ def get_rabbitmq_connection():
         logger.error(f"Falha ao conectar com o RabbitMQ: {e}")
         return None
 
+def declare_sightings_topology(channel):
+    """Declara a exchange e a fila duráveis dos avistamentos (operação idempotente)."""
+    channel.exchange_declare(exchange=SIGHTINGS_EXCHANGE, exchange_type='direct', durable=True)
+    channel.queue_declare(queue=SIGHTINGS_QUEUE, durable=True)
+    channel.queue_bind(queue=SIGHTINGS_QUEUE, exchange=SIGHTINGS_EXCHANGE, routing_key=SIGHTINGS_ROUTING_KEY)
+
 def publish_camera_command(action: str, camera: schemas.Camera):
     """
-    Publica um comando para iniciar ou parar o processamento de uma câmera.
+    Publica um comando para iniciar, parar ou atualizar o processamento de uma câmera.
 
     Args:
-        action (str): A ação a ser executada ('start' ou 'stop').
+        action (str): A ação a ser executada ('start', 'stop' ou 'update').
         camera (schemas.Camera): O objeto da câmera com seus dados.
     """
     connection = get_rabbitmq_connection()
@@ -46,7 +60,11 @@ def publish_camera_command(action: str, camera: schemas.Camera):
                 "id": camera.id,
                 "name": camera.name,
                 "rtsp_url": camera.rtsp_url,
-                "client_id": camera.client_id
+                "client_id": camera.client_id,
+                "roi_polygon": camera.roi_polygon,
+                "priority_weight": camera.priority_weight,
+                # O AI-Processor ignora comandos com versão anterior ao estado que já aplicou
+                "version": camera.version,
             }
         }
         
@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     Enum as SQLAlchemyEnum,
     Float,
+    JSON,
 )
 from sqlalchemy.orm import relationship
 from .database import Base  # <--- Certifique-se que esta linha está correta
@@ -49,6 +50,12 @@ class Camera(Base):
     is_active = Column(Boolean, default=True)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    # Polígono da zona de deteção, em coordenadas normalizadas [[x, y], ...]; nulo = frame inteiro
+    roi_polygon = Column(JSON, nullable=True)
+    # Peso relativo da câmera na divisão do detector quando o AI-Processor está sobrecarregado
+    priority_weight = Column(Float, nullable=False, default=1.0, server_default="1")
+    # Incrementada a cada alteração e enviada nos comandos, para o AI-Processor ignorar os antigos
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow)
 
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
@@ -61,6 +68,8 @@ class VehicleSighting(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     license_plate = Column(String, index=True)
     image_filename = Column(String)
+    # Chave gerada pelo AI-Processor: um reenvio do mesmo avistamento não cria nova linha
+    idempotency_key = Column(String, unique=True, nullable=True)
 
     camera_id = Column(Integer, ForeignKey("cameras.id"))
     camera = relationship("Camera", back_populates="sightings")
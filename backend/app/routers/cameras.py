@@ -47,7 +47,9 @@ async def update_camera(
 ):
     """
     Atualiza uma câmera.
-    Envia comandos 'start' ou 'stop' se o status 'is_active' for alterado.
+    Envia comandos 'start' ou 'stop' se o status 'is_active' for alterado, ou 'update' se
+    uma câmera ativa mudar de stream, de nome, de zona de deteção (roi_polygon) ou de
+    prioridade (priority_weight).
     """
     db_camera = await crud.get_camera_by_id(db, camera_id=camera_id)
     
@@ -55,6 +57,7 @@ async def update_camera(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Camera not found")
 
     old_status = db_camera.is_active
+    old_stream = (db_camera.rtsp_url, db_camera.name, db_camera.roi_polygon, db_camera.priority_weight)
     updated_camera = await crud.update_camera(db=db, camera=db_camera, update_data=camera_update)
     new_status = updated_camera.is_active
     
@@ -63,6 +66,12 @@ async def update_camera(
         action = "start" if new_status else "stop"
         camera_schema = schemas.Camera.from_orm(updated_camera)
         messaging.publish_camera_command(action=action, camera=camera_schema)
+    elif new_status and old_stream != (
+        updated_camera.rtsp_url, updated_camera.name, updated_camera.roi_polygon, updated_camera.priority_weight
+    ):
+        # O AI-Processor só reinicia o pipeline se o rtsp_url tiver mudado
+        camera_schema = schemas.Camera.from_orm(updated_camera)
+        messaging.publish_camera_command(action="update", camera=camera_schema)
         
     return updated_camera
 
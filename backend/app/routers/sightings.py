@@ -1,7 +1,13 @@
+import json
+import os
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from .. import crud, schemas, dependencies, models
+from ..captures import save_capture
+from ..config import settings
 
 router = APIRouter(prefix="/sightings", tags=["sightings"])
 
@@ -13,6 +19,56 @@ async def create_sighting(
     # Este endpoint pode permanecer público se for o AI-Processor a enviar dados.
     return await crud.create_vehicle_sighting(db=db, sighting=sighting)
 
+@router.post(
+    "/bulk",
+    response_model=schemas.VehicleSightingBulkResult,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(dependencies.verify_internal_api_key)],
+)
+async def create_sightings_bulk(
+    sightings: str = Form(..., description="Lista JSON de avistamentos."),
+    images: List[UploadFile] = File(default=[]),
+    db: AsyncSession = Depends(dependencies.get_db),
+):
+    """
+    Ingestão em lote usada pelo AI-Processor.
+
+    `sightings` é uma lista JSON de avistamentos. Cada `image_filename` pode corresponder a
+    uma das imagens enviadas em `images` (que é gravada em CAPTURES_DIR), ser apenas uma
+    referência a uma imagem já existente ou ser nulo (avistamento sem imagem). Todas as linhas são inseridas num único INSERT;
+    os avistamentos com uma `idempotency_key` já gravada (reenvios) são ignorados.
+
+    Avistamentos de câmeras inexistentes (ex.: apagadas entretanto) não impedem os restantes:
+    são ignorados e as suas posições na lista devolvidas em `rejected`.
+    """
+    try:
+        items = TypeAdapter(List[schemas.VehicleSightingBulkItem]).validate_python(json.loads(sightings))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid sightings payload: {e}")
+
+    if len(items) > settings.SIGHTINGS_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.SIGHTINGS_BULK_MAX_ITEMS} sightings per batch",
+        )
+
+    camera_ids = {item.camera_id for item in items}
+    known = await crud.get_existing_camera_ids(db, list(camera_ids))
+    rejected = [i for i, item in enumerate(items) if item.camera_id not in known]
+    valid = [item for item in items if item.camera_id in known]
+    for item in items:
+        if item.image_filename:
+            item.image_filename = os.path.basename(item.image_filename)
+
+    # As imagens que só servem avistamentos recusados não são gravadas
+    rejected_images = {items[i].image_filename for i in rejected} - {item.image_filename for item in valid}
+    for image in images:
+        if image.filename and os.path.basename(image.filename) not in rejected_images:
+            await run_in_threadpool(save_capture, image.filename, await image.read())
+
+    inserted = await crud.create_vehicle_sightings_bulk(db=db, sightings=valid)
+    return {"inserted": inserted, "rejected": rejected}
+
 # --- CORREÇÃO APLICADA AQUI ---
 # A rota foi alterada de "" para "/" para ser mais explícita e padrão.
 # A dependência de autenticação foi reintroduzida.
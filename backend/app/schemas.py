@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
+from typing import Annotated, List, Optional, Tuple
 from datetime import datetime
 from .models import UserRole
 
@@ -10,7 +10,8 @@ class CameraInSighting(BaseModel):
 # Schemas de Veículos (Sighting)
 class VehicleSightingBase(BaseModel):
     license_plate: str
-    image_filename: str
+    # None quando o AI-Processor não conseguiu gerar a imagem do avistamento
+    image_filename: Optional[str] = None
     camera_id: int
 
 class VehicleSightingCreate(VehicleSightingBase):
@@ -22,6 +23,21 @@ class VehicleSighting(VehicleSightingBase):
     class Config:
         from_attributes = True
 
+class VehicleSightingBulkItem(VehicleSightingBase):
+    # Instante da captura no AI-Processor; se omitido, usa-se o instante da ingestão
+    timestamp: Optional[datetime] = None
+    # Identifica o avistamento entre reenvios (novas tentativas, outbox, redelivery do RabbitMQ)
+    idempotency_key: Optional[str] = Field(default=None, max_length=64)
+
+class VehicleSightingMessage(VehicleSightingBulkItem):
+    # Mensagem publicada pelo AI-Processor no RabbitMQ; a imagem segue em base64
+    image_base64: Optional[str] = None
+
+class VehicleSightingBulkResult(BaseModel):
+    inserted: int
+    # Posições, na lista enviada, dos avistamentos recusados (câmera inexistente)
+    rejected: List[int] = []
+
 # --- NOVO SCHEMA PARA A RESPOSTA DO FRONTEND ---
 class VehicleSightingResponse(BaseModel):
     id: int
@@ -30,12 +46,24 @@ class VehicleSightingResponse(BaseModel):
     timestamp: datetime
 
 # Schemas de Câmera
+def _validate_roi_polygon(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    if len(points) < 3:
+        raise ValueError("roi_polygon needs at least 3 points")
+    if any(not 0.0 <= coord <= 1.0 for point in points for coord in point):
+        raise ValueError("roi_polygon coordinates must be normalized between 0 and 1")
+    return points
+
+# Zona de deteção em coordenadas normalizadas (0-1) do frame: [[x, y], ...]
+RoiPolygon = Annotated[List[Tuple[float, float]], AfterValidator(_validate_roi_polygon)]
+
 class CameraBase(BaseModel):
     name: str
     rtsp_url: str
     is_active: bool = True
     latitude: float
     longitude: float
+    roi_polygon: Optional[RoiPolygon] = None
+    priority_weight: float = Field(1.0, gt=0)
 
 class CameraCreate(CameraBase):
     pass
@@ -46,11 +74,14 @@ class CameraUpdate(BaseModel):
     is_active: Optional[bool] = None
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    roi_polygon: Optional[RoiPolygon] = None
+    priority_weight: Optional[float] = Field(None, gt=0)
 
 
 class Camera(CameraBase):
     id: int
     client_id: int
+    version: int = 1
     class Config:
         from_attributes = True
 
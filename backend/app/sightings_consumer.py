@@ -0,0 +1,126 @@
+# backend/app/sightings_consumer.py
+"""
+Worker que consome os avistamentos publicados pelo AI-Processor no RabbitMQ.
+
+As mensagens são agrupadas em lotes (por tamanho ou por tempo), inseridas em
+`vehicle_sightings` com um único INSERT e só são confirmadas (ack) depois do commit.
+Mensagens inválidas são rejeitadas sem voltar à fila; se o disco ou a base de dados
+falharem, o lote volta para a fila. Executar com:
+
+    python -m app.sightings_consumer
+"""
+import asyncio
+import base64
+import binascii
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+import pika
+from pydantic import ValidationError
+from . import crud, messaging, schemas
+from .captures import save_capture
+from .config import settings
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 5
+
+async def store_sightings(items: List[schemas.VehicleSightingMessage]) -> Tuple[int, int]:
+    """Insere o lote e devolve (inseridos, descartados por câmera desconhecida)."""
+    async with SessionLocal() as db:
+        camera_ids = {item.camera_id for item in items}
+        known = await crud.get_existing_camera_ids(db, list(camera_ids))
+        valid = [item for item in items if item.camera_id in known]
+        inserted = await crud.create_vehicle_sightings_bulk(db=db, sightings=valid)
+    return inserted, len(items) - len(valid)
+
+def decode_message(body: bytes) -> Tuple[schemas.VehicleSightingMessage, Optional[bytes]]:
+    """Valida a mensagem e descodifica a imagem; levanta ValueError se nunca vai ser válida."""
+    item = schemas.VehicleSightingMessage.model_validate_json(body)
+    if item.image_filename:
+        item.image_filename = os.path.basename(item.image_filename)
+    image = None
+    if item.image_base64:
+        if not item.image_filename:
+            raise ValueError("image_base64 without image_filename")
+        image = base64.b64decode(item.image_base64, validate=True)
+        item.image_base64 = None
+    return item, image
+
+def flush_batch(channel, batch: list, loop: asyncio.AbstractEventLoop):
+    decoded = []
+    last_valid_tag = None
+    for delivery_tag, body in batch:
+        try:
+            decoded.append(decode_message(body))
+        except (ValidationError, binascii.Error, ValueError) as e:
+            # Mensagem que nunca vai ser válida: rejeita-a sem voltar a pôr na fila
+            logger.error(f"Mensagem de avistamento inválida descartada: {e}")
+            channel.basic_nack(delivery_tag=delivery_tag, requeue=False)
+            continue
+        last_valid_tag = delivery_tag
+
+    if last_valid_tag is None:
+        return
+
+    items = [item for item, _ in decoded]
+    try:
+        for item, image in decoded:
+            if image is not None:
+                save_capture(item.image_filename, image)
+        inserted, dropped = loop.run_until_complete(store_sightings(items))
+    except Exception as e:
+        # Falhas de disco ou da base de dados são transitórias: o lote volta para a fila
+        logger.error(f"Erro ao gravar lote de {len(items)} avistamentos. O lote volta para a fila: {e}")
+        channel.basic_nack(delivery_tag=last_valid_tag, multiple=True, requeue=True)
+        time.sleep(RECONNECT_DELAY_SECONDS)
+        return
+
+    # Confirma de uma vez todas as mensagens do lote, já gravadas
+    channel.basic_ack(delivery_tag=last_valid_tag, multiple=True)
+    if dropped:
+        logger.warning(f"{dropped} avistamentos descartados por referirem câmeras inexistentes.")
+    logger.info(f"Lote de {inserted} avistamentos gravado.")
+
+def consume(loop: asyncio.AbstractEventLoop):
+    connection = messaging.get_rabbitmq_connection()
+    if not connection:
+        raise pika.exceptions.AMQPConnectionError("Sem conexão com o RabbitMQ")
+
+    try:
+        channel = connection.channel()
+        messaging.declare_sightings_topology(channel)
+        # O broker entrega no máximo um lote de mensagens por confirmar
+        channel.basic_qos(prefetch_count=settings.SIGHTINGS_CONSUMER_BATCH_SIZE)
+        logger.info(f"À espera de avistamentos na fila '{messaging.SIGHTINGS_QUEUE}'.")
+
+        batch = []
+        deadline = None
+        for method, _properties, body in channel.consume(messaging.SIGHTINGS_QUEUE, inactivity_timeout=0.1):
+            if method is not None:
+                batch.append((method.delivery_tag, body))
+                if deadline is None:
+                    deadline = time.monotonic() + settings.SIGHTINGS_CONSUMER_BATCH_WAIT_SECONDS
+            if batch and (len(batch) >= settings.SIGHTINGS_CONSUMER_BATCH_SIZE or time.monotonic() >= deadline):
+                flush_batch(channel, batch, loop)
+                batch = []
+                deadline = None
+    finally:
+        if connection.is_open:
+            connection.close()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    loop = asyncio.new_event_loop()
+    while True:
+        try:
+            consume(loop)
+        except pika.exceptions.AMQPError as e:
+            logger.error(f"Ligação ao RabbitMQ perdida ({e}). Nova tentativa em {RECONNECT_DELAY_SECONDS}s.")
+            time.sleep(RECONNECT_DELAY_SECONDS)
+
+if __name__ == "__main__":
+    main()
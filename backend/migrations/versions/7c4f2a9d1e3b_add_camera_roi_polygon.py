@@ -0,0 +1,28 @@
+"""Add camera roi_polygon
+
+Revision ID: 7c4f2a9d1e3b
+Revises: 2e6764d14ad7
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4f2a9d1e3b'
+down_revision: Union[str, Sequence[str], None] = '2e6764d14ad7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cameras', sa.Column('roi_polygon', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cameras', 'roi_polygon')
@@ -0,0 +1,28 @@
+"""Add camera priority_weight
+
+Revision ID: b3e9d5c07a21
+Revises: 7c4f2a9d1e3b
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9d5c07a21'
+down_revision: Union[str, Sequence[str], None] = '7c4f2a9d1e3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cameras', sa.Column('priority_weight', sa.Float(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cameras', 'priority_weight')
@@ -0,0 +1,30 @@
+"""Add vehicle_sightings idempotency_key
+
+Revision ID: d81f6a3c2e94
+Revises: b3e9d5c07a21
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f6a3c2e94'
+down_revision: Union[str, Sequence[str], None] = 'b3e9d5c07a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('vehicle_sightings', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_unique_constraint('uq_vehicle_sightings_idempotency_key', 'vehicle_sightings', ['idempotency_key'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_vehicle_sightings_idempotency_key', 'vehicle_sightings', type_='unique')
+    op.drop_column('vehicle_sightings', 'idempotency_key')